@@ -801,8 +801,8 @@ def travels_payment_update(request, payment_id):
     
     if request.method == 'POST':
         try:
-            payment.status = request.POST.get('status')
-            payment.save()
+            from bookings import ledger
+            ledger.transition(payment, request.POST.get('status'))
             
             from django.contrib import messages
             messages.success(request, f'Payment status updated successfully!')
@@ -0,0 +1,42 @@
+"""
+Blog List Page Cache
+Caches the posts and total count behind each page of the blog list, keyed
+by page number and a version that is bumped whenever a post changes.
+"""
+
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache
+
+VERSION_KEY = 'blog_list_version'
+
+# View counts on the cards are refreshed at least this often
+TIMEOUT = 600
+
+
+def get_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def page_key(page_number: str) -> str:
+    return f"blog_list_{get_version()}_page_{page_number}"
+
+
+def fetch(page_number: str) -> Optional[Dict[str, Any]]:
+    return cache.get(page_key(page_number))
+
+
+def store(page_number: str, entry: Dict[str, Any]) -> None:
+    cache.set(page_key(page_number), entry, TIMEOUT)
+
+
+def invalidate() -> None:
+    """Drop every cached page by moving to a new version"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.view_counter import view_counter
+from tours.caching import is_shared_cache
+
+
+class Command(BaseCommand):
+    help = 'Write buffered blog view counts to the database (run from cron)'
+
+    def handle(self, *args, **options):
+        if not is_shared_cache():
+            # The web workers buffer views in their own memory; this process would see none
+            raise CommandError('Buffered views live in the web workers; configure a shared cache (REDIS_URL)')
+
+        total = view_counter.flush()
+        self.stdout.write(self.style.SUCCESS(f'Flushed {total} buffered blog views'))
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Weighted tsvector kept current by PostgreSQL itself (generated column), with a GIN index
+ADD_SEARCH_VECTOR = """
+ALTER TABLE blog_posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(excerpt, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'C')
+) STORED;
+CREATE INDEX blog_posts_search_vector_idx ON blog_posts USING GIN (search_vector);
+"""
+
+DROP_SEARCH_VECTOR = """
+DROP INDEX IF EXISTS blog_posts_search_vector_idx;
+ALTER TABLE blog_posts DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def add_search_vector(apps, schema_editor):
+    # Other databases use the in-process index in blog.search
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ADD_SEARCH_VECTOR)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,81 @@
+"""
+Related Posts Service
+Finds each published post's most similar posts by TF-IDF cosine similarity
+over its title and content. The whole map is computed when a post is
+saved or deleted and kept in the shared cache, so detail pages only read it.
+"""
+
+import logging
+import math
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from django.core.cache import cache
+
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'blog_related_posts'
+
+
+class RelatedPosts:
+    """Precomputed content-similarity neighbours of every published post"""
+
+    # Neighbours stored per post
+    limit = 4
+
+    def compute(self) -> Dict[int, List[int]]:
+        from .models import BlogPost
+
+        started = time.perf_counter()
+        documents = {
+            post['id']: Counter(tokenize(f"{post['title']} {post['content']}"))
+            for post in BlogPost.objects.filter(is_published=True).values('id', 'title', 'content')
+        }
+        total = len(documents)
+        frequencies = Counter(term for terms in documents.values() for term in terms)
+
+        # Unit-length TF-IDF vectors and an inverted index over them
+        vectors: Dict[int, Dict[str, float]] = {}
+        postings: Dict[str, List[tuple]] = defaultdict(list)
+        for post_id, terms in documents.items():
+            vector = {
+                term: (1 + math.log(count)) * math.log(total / frequencies[term])
+                for term, count in terms.items()
+                if frequencies[term] < total
+            }
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+            vectors[post_id] = {term: weight / norm for term, weight in vector.items()}
+            for term, weight in vectors[post_id].items():
+                postings[term].append((post_id, weight))
+
+        related = {}
+        for post_id, vector in vectors.items():
+            scores: Dict[int, float] = defaultdict(float)
+            for term, weight in vector.items():
+                for other_id, other_weight in postings[term]:
+                    if other_id != post_id:
+                        scores[other_id] += weight * other_weight
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+            related[post_id] = [other_id for other_id, _ in ranked[:self.limit]]
+
+        logger.info(f"Computed related posts for {total} posts in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return related
+
+    def publish(self) -> Dict[int, List[int]]:
+        related = self.compute()
+        cache.set(CACHE_KEY, related, None)
+        return related
+
+    def get(self, post_id: int) -> List[int]:
+        """Ids of the posts most similar to ``post_id``, best first"""
+        related = cache.get(CACHE_KEY)
+        if related is None:
+            related = self.publish()
+        return related.get(post_id, [])
+
+
+# Global service instance
+related_posts = RelatedPosts()
@@ -0,0 +1,169 @@
+"""
+Blog Search Service
+Full-text search over published posts (title, excerpt and content) with
+relevance ranking and highlighted snippets. On PostgreSQL it queries the
+GIN-indexed ``search_vector`` generated column; elsewhere (SQLite in
+development) it uses an in-process BM25 inverted index.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from tours.services.base import InMemoryIndex
+
+SEARCH_CONFIG = 'english'
+
+# Relevance weight of a term occurrence in each field (A, B and C in Postgres)
+FIELD_WEIGHTS = {'title': 3.0, 'excerpt': 2.0, 'content': 1.0}
+
+STOPWORDS = frozenset(
+    'a an and are as at be but by for from has have in is it its of on or that the this to was were '
+    'will with you your our we'.split()
+)
+
+re_word = re.compile(r'[a-z0-9]+')
+
+
+def stem(word: str) -> str:
+    """Light suffix stripping so 'hills', 'hill' and 'trekking', 'trek' meet"""
+    for suffix in ('ing', 'es', 's'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(word) for word in re_word.findall(text.lower()) if word not in STOPWORDS]
+
+
+class BlogSearchIndex(InMemoryIndex):
+    """BM25 inverted index over published posts, for databases without full-text search"""
+
+    name = 'blog_search'
+    k1 = 1.2
+    b = 0.75
+
+    def build(self) -> Dict[str, object]:
+        from .models import BlogPost
+
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        lengths: Dict[int, float] = {}
+        posts = BlogPost.objects.filter(is_published=True).values('id', 'title', 'excerpt', 'content')
+        for post in posts:
+            weighted: Counter = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(post[field] or ''):
+                    weighted[term] += weight
+            for term, frequency in weighted.items():
+                postings[term][post['id']] = frequency
+            lengths[post['id']] = sum(weighted.values())
+
+        average = sum(lengths.values()) / len(lengths) if lengths else 0.0
+        return {'postings': dict(postings), 'lengths': lengths, 'average_length': average}
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """Post ids and scores, best first; every query term must match"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        state = self.state
+        postings, lengths = state['postings'], state['lengths']
+        matches = [postings.get(term, {}) for term in terms]
+        if not all(matches):
+            return []
+
+        candidates = set.intersection(*(set(docs) for docs in matches))
+        total = len(lengths)
+        scores: Dict[int, float] = defaultdict(float)
+        for docs in matches:
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for post_id in candidates:
+                frequency = docs[post_id]
+                norm = self.k1 * (1 - self.b + self.b * lengths[post_id] / (state['average_length'] or 1))
+                scores[post_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+class RankedPosts(Sequence):
+    """Lazily loaded posts in ranked order; slicing fetches only that page"""
+
+    def __init__(self, post_ids: List[int]):
+        self.post_ids = post_ids
+
+    def __len__(self) -> int:
+        return len(self.post_ids)
+
+    def count(self) -> int:
+        return len(self.post_ids)
+
+    def __getitem__(self, index):
+        from .models import BlogPost
+
+        if isinstance(index, slice):
+            ids = self.post_ids[index]
+            posts = BlogPost.objects.select_related('author').in_bulk(ids)
+            return [posts[post_id] for post_id in ids if post_id in posts]
+        return self[index:index + 1][0]
+
+
+def use_postgres() -> bool:
+    backend = getattr(settings, 'BLOG_SEARCH_BACKEND', 'auto')
+    if backend == 'auto':
+        return connection.vendor == 'postgresql'
+    return backend == 'postgres'
+
+
+def search_posts(query: str):
+    """Published posts matching ``query``, most relevant first"""
+    from .models import BlogPost
+
+    if use_postgres():
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+        from django.db.models import F
+        from django.db.models.expressions import RawSQL
+
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        return (
+            BlogPost.objects.filter(is_published=True)
+            .select_related('author')
+            .annotate(document=RawSQL('blog_posts.search_vector', [], output_field=SearchVectorField()))
+            .filter(document=search_query)
+            .annotate(rank=SearchRank(F('document'), search_query))
+            .order_by('-rank', '-created_at')
+        )
+    return RankedPosts([post_id for post_id, _ in blog_search_index.search(query)])
+
+
+def highlight(text: str, query: str, length: int = 220) -> str:
+    """Escaped snippet of ``text`` around the first match with query terms in <mark>"""
+    terms = set(tokenize(query))
+    words = list(re.finditer(r'\w+', text))
+    hits = [match for match in words if stem(match.group().lower()) in terms]
+
+    start = max(0, hits[0].start() - length // 3) if hits else 0
+    if start:
+        # Begin the snippet on a word boundary
+        start = next((match.start() for match in words if match.start() >= start), start)
+    end = min(len(text), start + length)
+    snippet, parts, position = text[start:end], [], start
+    for match in hits:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(escape(text[position:match.start()]))
+        parts.append(f"<mark>{escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(escape(text[position:end]))
+    prefix = '&hellip;' if start else ''
+    suffix = '&hellip;' if end < len(text) else ''
+    return mark_safe(prefix + ''.join(parts).strip() + suffix) if snippet else ''
+
+
+# Global service instance
+blog_search_index = BlogSearchIndex()
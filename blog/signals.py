@@ -0,0 +1,39 @@
+"""
+Django Signals for the blog
+Keeps the buffered view counter's slug map, the search index, the list
+page cache and the related-posts map in step with published posts
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import list_cache
+from .models import BlogPost
+from .related import related_posts
+from .search import blog_search_index
+from .view_counter import view_counter
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def invalidate_view_counter_slugs(sender, **kwargs):
+    """Rebuild the slug map after a post is published, renamed or removed"""
+    # Write buffered views first; posts dropped from the map are no longer flushed
+    view_counter.flush()
+    view_counter.invalidate()
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def invalidate_blog_search_index(sender, **kwargs):
+    """Rebuild the in-process search index after a post changes"""
+    blog_search_index.invalidate()
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def refresh_blog_listings(sender, **kwargs):
+    """Drop cached list pages and recompute related posts once the change is committed"""
+    list_cache.invalidate()
+    transaction.on_commit(related_posts.publish)
@@ -0,0 +1,152 @@
+"""
+Tests for the blog app
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
+
+from blog.models import BlogPost
+from blog.related import related_posts
+from blog.search import blog_search_index, highlight, search_posts
+from blog.view_counter import FLUSH_MARKER_KEY, view_counter
+
+
+class ViewCounterTests(TestCase):
+    """Tests for the buffered blog view counter"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.post = BlogPost.objects.create(title='Ooty in Monsoon', slug='ooty-monsoon', content='...', is_published=True, views=10)
+        self.other = BlogPost.objects.create(title='Coorg Coffee Trail', slug='coorg-coffee', content='...', is_published=True)
+        # Hold off the opportunistic flush so the endpoint only buffers
+        cache.set(FLUSH_MARKER_KEY, 1, 60)
+
+    def test_endpoint_buffers_without_database_access(self):
+        view_counter.incr('ooty-monsoon')
+        with self.assertNumQueries(0):
+            response = self.client.post('/api/blog/ooty-monsoon/view/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(view_counter.pending(self.post.id), 2)
+        self.assertEqual(self.client.post('/api/blog/missing/view/').status_code, 404)
+
+    def test_flush_writes_deltas_in_one_query(self):
+        for _ in range(3):
+            view_counter.incr('ooty-monsoon')
+        view_counter.incr('coorg-coffee')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(view_counter.flush(), 4)
+
+        self.post.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.post.views, 13)
+        self.assertEqual(self.other.views, 1)
+        self.assertEqual(view_counter.pending(self.post.id), 0)
+        self.assertEqual(view_counter.flush(), 0)
+
+    def test_flush_command_needs_shared_cache(self):
+        view_counter.incr('ooty-monsoon')
+        with self.assertRaises(CommandError):
+            call_command('flush_blog_views', stdout=StringIO())
+
+        with mock.patch('blog.management.commands.flush_blog_views.is_shared_cache', return_value=True):
+            call_command('flush_blog_views', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 11)
+
+
+class BlogSearchTests(TestCase):
+    """Tests for blog full-text search with the in-process index"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.hills = BlogPost.objects.create(
+            title='Best Hill Stations near Coimbatore', slug='hill-stations', is_published=True,
+            content='Ooty, Kodaikanal and Valparai are short drives away.',
+        )
+        self.food = BlogPost.objects.create(
+            title='Street Food of Madurai', slug='madurai-food', is_published=True,
+            content='After the temple visit, try the jigarthanda. The hills of Kodaikanal are a day trip away.',
+        )
+        BlogPost.objects.create(title='Kodaikanal Draft', slug='draft', content='Kodaikanal', is_published=False)
+        blog_search_index.invalidate()
+
+    def test_ranks_title_matches_first_and_skips_drafts(self):
+        results = list(search_posts('kodaikanal hills')[:10])
+        self.assertEqual(results, [self.hills, self.food])
+        self.assertEqual(list(search_posts('jigarthanda')[:10]), [self.food])
+        self.assertEqual(len(search_posts('munnar')), 0)
+
+    def test_new_posts_are_indexed(self):
+        post = BlogPost.objects.create(title='Munnar Tea Gardens', slug='munnar', content='Tea.', is_published=True)
+        self.assertEqual(list(search_posts('munnar')[:10]), [post])
+
+    def test_highlight_marks_terms_and_escapes(self):
+        snippet = highlight('Visit <Ooty> hills in May', 'hill')
+        self.assertEqual(snippet, 'Visit &lt;Ooty&gt; <mark>hills</mark> in May')
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_search_page(self):
+        response = self.client.get('/blog/search/', {'q': 'kodaikanal'})
+        self.assertEqual(set(response.context['posts']), {self.hills, self.food})
+        self.assertContains(response, '<mark>Kodaikanal</mark>')
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class BlogListingTests(TestCase):
+    """Tests for related posts and the cached blog list"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        topics = [
+            ('ooty-toy-train', 'Ooty Toy Train', 'The Nilgiri mountain railway climbs from Mettupalayam to Ooty through tea estates.'),
+            ('coonoor-tea', 'Coonoor Tea Estates', 'Tea estates around Coonoor and the Nilgiri mountain railway station.'),
+            ('madurai-temple', 'Madurai Temple Guide', 'Meenakshi temple towers, the temple tank and evening ceremonies.'),
+            ('rameswaram', 'Rameswaram Temple Walk', 'The long temple corridors of Rameswaram and the Pamban bridge.'),
+            ('pondy-cafes', 'Pondicherry Cafes', 'French quarter cafes and the promenade beach at sunset.'),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts = {
+                slug: BlogPost.objects.create(slug=slug, title=title, content=content, is_published=True)
+                for slug, title, content in topics
+            }
+
+    def test_related_posts_follow_content_similarity(self):
+        self.assertEqual(related_posts.get(self.posts['ooty-toy-train'].id)[0], self.posts['coonoor-tea'].id)
+        self.assertEqual(related_posts.get(self.posts['madurai-temple'].id)[0], self.posts['rameswaram'].id)
+
+        response = self.client.get('/blog/madurai-temple/')
+        related = response.context['related_posts']
+        self.assertEqual(related[0], self.posts['rameswaram'])
+        self.assertEqual(len(related), 4)
+        self.assertNotIn(self.posts['madurai-temple'], related)
+
+    def test_list_pages_are_cached_until_a_post_changes(self):
+        self.client.get('/blog/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/blog/')
+        self.assertFalse([query for query in queries if 'blog_posts' in query['sql']])
+        self.assertEqual(len(response.context['posts']), 5)
+
+        BlogPost.objects.create(slug='kochi', title='Kochi Backwaters', content='Houseboats.', is_published=True)
+        self.assertEqual(response.context['paginator'].count, 5)
+        self.assertEqual(self.client.get('/blog/').context['paginator'].count, 6)
+        self.assertEqual(self.client.get('/blog/', {'page': 2}).status_code, 404)
+
+    def test_post_images_are_served_from_static(self):
+        BlogPost.objects.filter(slug='pondy-cafes').update(image='promenade.jpg')
+        cache.clear()
+        for path in ('/blog/', '/blog/pondy-cafes/'):
+            response = self.client.get(path)
+            self.assertContains(response, 'src="/static/bolgs_images/promenade.jpg"')
+            self.assertNotContains(response, '/media/derivatives/')
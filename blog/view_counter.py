@@ -0,0 +1,90 @@
+"""
+Buffered Blog View Counter
+Counts post views in the shared cache and writes them back in batches with
+one ``views = views + delta`` UPDATE, so the view endpoint never touches
+the database and concurrent increments are never lost.
+"""
+
+import logging
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+SLUGS_KEY = 'blog_view_counter_slugs'
+FLUSH_MARKER_KEY = 'blog_view_counter_flushed'
+
+
+def pending_key(post_id: int) -> str:
+    return f"blog_views_pending_{post_id}"
+
+
+class ViewCounter:
+    """Write-behind counter for BlogPost.views"""
+
+    @property
+    def flush_interval(self) -> int:
+        return getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', 60)
+
+    def _slugs(self) -> Dict[str, int]:
+        """Published post ids by slug, rebuilt after any post is saved or deleted"""
+        slugs = cache.get(SLUGS_KEY)
+        if slugs is None:
+            from .models import BlogPost
+            slugs = dict(BlogPost.objects.filter(is_published=True).values_list('slug', 'id'))
+            cache.set(SLUGS_KEY, slugs, None)
+        return slugs
+
+    def invalidate(self) -> None:
+        cache.delete(SLUGS_KEY)
+
+    def incr(self, slug: str) -> Optional[int]:
+        """Buffer one view; returns the post id, or None for an unknown slug"""
+        post_id = self._slugs().get(slug)
+        if post_id is None:
+            return None
+        key = pending_key(post_id)
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+        return post_id
+
+    def pending(self, post_id: int) -> int:
+        return cache.get(pending_key(post_id), 0)
+
+    def flush_due(self) -> bool:
+        """True for the one request per interval that should write back"""
+        return cache.add(FLUSH_MARKER_KEY, 1, self.flush_interval)
+
+    def flush(self) -> int:
+        """Write buffered views with one UPDATE; returns the number of views written"""
+        from .models import BlogPost
+
+        ids = list(self._slugs().values())
+        counts = cache.get_many([pending_key(post_id) for post_id in ids])
+        deltas = {post_id: counts[pending_key(post_id)] for post_id in ids if counts.get(pending_key(post_id))}
+        if not deltas:
+            return 0
+
+        # Unsaved instances carrying F() expressions: bulk_update emits a single CASE WHEN UPDATE
+        posts = [BlogPost(id=post_id, views=F('views') + delta) for post_id, delta in deltas.items()]
+        BlogPost.objects.bulk_update(posts, ['views'])
+
+        # Subtract what was written; views counted during the flush stay buffered
+        for post_id, delta in deltas.items():
+            try:
+                cache.decr(pending_key(post_id), delta)
+            except ValueError:
+                pass
+        total = sum(deltas.values())
+        logger.info(f"Flushed {total} blog views for {len(deltas)} posts")
+        return total
+
+
+# Global service instance
+view_counter = ViewCounter()
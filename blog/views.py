@@ -3,7 +3,22 @@ from django.views.generic import ListView, DetailView
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+from django.db.models.functions import Substr
+from . import list_cache
 from .models import BlogPost
+from .related import related_posts
+from .search import highlight, search_posts
+from .view_counter import view_counter
+
+
+def card_queryset():
+    """Published posts for list cards: the content body is deferred, only a preview is loaded"""
+    return (
+        BlogPost.objects.filter(is_published=True)
+        .select_related('author')
+        .defer('content')
+        .annotate(content_preview=Substr('content', 1, 300))
+    )
 
 
 class BlogListView(ListView):
@@ -13,7 +28,43 @@ class BlogListView(ListView):
     paginate_by = 6
     
     def get_queryset(self):
-        return BlogPost.objects.filter(is_published=True)
+        return card_queryset()
+    
+    def paginate_queryset(self, queryset, page_size):
+        page_number = str(self.request.GET.get(self.page_kwarg) or 1)
+        entry = list_cache.fetch(page_number)
+        if entry is None:
+            paginator, page, posts, is_paginated = super().paginate_queryset(queryset, page_size)
+            entry = {'count': paginator.count, 'number': page.number, 'posts': list(posts)}
+            list_cache.store(page_number, entry)
+        
+        # Rebuild the page around the cached rows, so a hit runs no COUNT or SELECT
+        paginator = self.get_paginator(range(entry['count']), page_size)
+        page = paginator.page(entry['number'])
+        page.object_list = entry['posts']
+        return paginator, page, entry['posts'], page.has_other_pages()
+
+
+class BlogSearchView(ListView):
+    template_name = 'blog/blog_list.html'
+    context_object_name = 'posts'
+    paginate_by = 6
+    
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()[:200]
+    
+    def get_queryset(self):
+        query = self.get_query()
+        return search_posts(query) if query else BlogPost.objects.none()
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_query()
+        context['query'] = query
+        # Snippets only for the posts on this page
+        for post in context['posts']:
+            post.snippet = highlight(post.content or post.excerpt, query)
+        return context
 
 
 class BlogDetailView(DetailView):
@@ -31,12 +82,15 @@ class BlogDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get related posts (exclude current post, get 4 most recent)
-        context['related_posts'] = BlogPost.objects.filter(
-            is_published=True
-        ).exclude(
-            id=self.object.id
-        ).order_by('-created_at')[:4]
+        # Precomputed content-similarity neighbours, topped up with the latest posts
+        related_ids = related_posts.get(self.object.id)
+        posts = card_queryset().in_bulk(related_ids)
+        related = [posts[post_id] for post_id in related_ids if post_id in posts]
+        if len(related) < related_posts.limit:
+            related += card_queryset().exclude(
+                id__in=[self.object.id] + related_ids
+            ).order_by('-created_at')[:related_posts.limit - len(related)]
+        context['related_posts'] = related
         return context
 
 
@@ -44,10 +98,10 @@ class BlogDetailView(DetailView):
 @require_POST
 def increment_view_count(request, slug):
     """API endpoint to increment blog post view count"""
-    try:
-        post = get_object_or_404(BlogPost, slug=slug, is_published=True)
-        post.views += 1
-        post.save(update_fields=['views'])
-        return JsonResponse({'success': True, 'views': post.views})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=400)
\ No newline at end of file
+    # Buffered in the cache and written back in batches; no database access per view
+    post_id = view_counter.incr(slug)
+    if post_id is None:
+        return JsonResponse({'success': False, 'error': 'Post not found'}, status=404)
+    if view_counter.flush_due():
+        view_counter.flush()
+    return JsonResponse({'success': True})
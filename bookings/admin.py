@@ -1,13 +1,14 @@
 from django.contrib import admin
 from .models import Booking, Payment, BookingRoute, GSTRate, ExtraPayment, NotificationRecord, NotificationTemplate
+from . import ledger
 
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
-    list_display = ('booking_number', 'name', 'phone', 'trip_type', 'status', 'total_amount', 'notification_count', 'created_at')
+    list_display = ('booking_number', 'name', 'phone', 'trip_type', 'status', 'total_amount', 'amount_paid', 'outstanding', 'notification_count', 'created_at')
     list_filter = ('status', 'trip_type', 'payment_type')
     search_fields = ('booking_number', 'name', 'email', 'phone')
-    readonly_fields = ('booking_number', 'created_at', 'updated_at', 'notification_count', 'last_notification_sent')
+    readonly_fields = ('booking_number', 'amount_paid', 'outstanding', 'created_at', 'updated_at', 'notification_count', 'last_notification_sent')
     list_per_page = 25
     date_hierarchy = 'created_at'
     
@@ -23,7 +24,7 @@ class BookingAdmin(admin.ModelAdmin):
                       'drop_date', 'drop_time', 'trip_type', 'total_days', 'total_distance', 'multicity_routes')
         }),
         ('Payment Information', {
-            'fields': ('payment_type', 'total_amount', 'advance_amount', 'special_instructions')
+            'fields': ('payment_type', 'total_amount', 'advance_amount', 'amount_paid', 'outstanding', 'special_instructions')
         }),
         ('Notification Tracking', {
             'fields': ('notification_preferences', 'notification_count', 'last_notification_sent'),
@@ -41,6 +42,20 @@ class PaymentAdmin(admin.ModelAdmin):
     list_display = ('booking', 'amount', 'status', 'razorpay_payment_id', 'created_at')
     list_filter = ('status',)
     search_fields = ('booking__booking_number', 'razorpay_payment_id')
+    
+    def get_readonly_fields(self, request, obj=None):
+        # The booking ledger already counts this amount
+        if obj is not None:
+            return ('booking', 'amount')
+        return ()
+    
+    def save_model(self, request, obj, form, change):
+        """Book new payments and status changes in the booking ledger"""
+        status = obj.status
+        # Save in the status the ledger already reflects; a new payment holds nothing while 'failed'
+        obj.status = form.initial['status'] if change else 'failed'
+        super().save_model(request, obj, form, change)
+        ledger.transition(obj, status)
 
 
 @admin.register(BookingRoute)
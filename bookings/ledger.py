@@ -0,0 +1,179 @@
+"""
+Booking Payment Ledger
+Keeps ``Booking.amount_paid`` and ``Booking.outstanding`` in step with the
+payments table so payment endpoints read the balance instead of summing
+payments. Every payment status change goes through ``transition``, which
+moves the payment with a conditional UPDATE and applies the matching F()
+deltas to its booking in the same transaction, so a change is counted once
+however many callbacks race for it. Pending payments hold their amount
+against the outstanding balance, so two concurrent checkouts cannot both
+pay the same balance.
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Booking, Payment
+
+logger = logging.getLogger(__name__)
+
+# Statuses whose amount is taken out of the outstanding balance
+HOLDING = ('pending', 'completed')
+
+CENTS = Decimal('0.01')
+
+
+class InsufficientBalance(Exception):
+    """The payment is larger than what is left to pay on the booking"""
+
+
+def get_reservation_timeout() -> int:
+    return getattr(settings, 'PAYMENT_RESERVATION_TIMEOUT', 15 * 60)
+
+
+def _amount(value) -> Decimal:
+    return Decimal(str(value)).quantize(CENTS)
+
+
+def _apply(booking_id: int, amount: Decimal, old: Optional[str], new: Optional[str]) -> None:
+    paid = amount * ((new == 'completed') - (old == 'completed'))
+    held = amount * ((new in HOLDING) - (old in HOLDING))
+    if paid or held:
+        Booking.objects.filter(pk=booking_id).update(
+            amount_paid=F('amount_paid') + paid,
+            outstanding=F('outstanding') - held,
+        )
+
+
+def open_payment(booking: Booking, amount, **fields) -> Payment:
+    """Create a pending payment, holding ``amount`` of the outstanding balance"""
+    amount = _amount(amount)
+    with transaction.atomic():
+        held = Booking.objects.filter(pk=booking.pk, outstanding__gte=amount).update(
+            outstanding=F('outstanding') - amount
+        )
+        if not held:
+            raise InsufficientBalance(booking.booking_number)
+        return Payment.objects.create(booking=booking, amount=amount, status='pending', **fields)
+
+
+def record_payment(booking: Booking, amount, status: str = 'completed', **fields) -> Tuple[Payment, bool]:
+    """
+    Book a payment reported by the gateway, like ``get_or_create``.
+
+    A repeat of a ``razorpay_payment_id`` that is already booked changes
+    nothing, and a pending checkout for the same ``razorpay_order_id`` is
+    moved to ``status`` instead of adding a second payment.
+    """
+    payment_id = fields.get('razorpay_payment_id')
+    order_id = fields.get('razorpay_order_id')
+    with transaction.atomic():
+        # Serialize gateway reports for the booking
+        Booking.objects.select_for_update().filter(pk=booking.pk).first()
+        if payment_id:
+            existing = Payment.objects.filter(booking=booking, razorpay_payment_id=payment_id).first()
+            if existing is not None:
+                return existing, False
+        if order_id:
+            checkout = Payment.objects.filter(booking=booking, razorpay_order_id=order_id, status='pending').first()
+            if checkout is not None:
+                changes = {name: value for name, value in fields.items() if name != 'razorpay_order_id'}
+                return checkout, transition(checkout, status, **changes)
+        payment = Payment.objects.create(booking=booking, amount=_amount(amount), status=status, **fields)
+        _apply(booking.pk, payment.amount, None, status)
+    return payment, True
+
+
+def transition(payment: Payment, status: str, **fields) -> bool:
+    """
+    Move ``payment`` to ``status`` and update its booking's ledger.
+
+    Returns False, changing nothing, when the payment is no longer in the
+    status it was loaded with (another request got there first).
+    """
+    if status not in dict(Payment.PAYMENT_STATUS_CHOICES):
+        raise ValueError(f"Unknown payment status: {status}")
+    old = payment.status
+    if old == status:
+        return False
+    with transaction.atomic():
+        changed = Payment.objects.filter(pk=payment.pk, status=old).update(
+            status=status, updated_at=timezone.now(), **fields
+        )
+        if not changed:
+            return False
+        _apply(payment.booking_id, _amount(payment.amount), old, status)
+    payment.status = status
+    for name, value in fields.items():
+        setattr(payment, name, value)
+    return True
+
+
+def unbook(payment: Payment) -> None:
+    """Reverse a payment's effect on the ledger, e.g. after it was deleted"""
+    _apply(payment.booking_id, _amount(payment.amount), payment.status, None)
+
+
+def release_unpaid(booking: Booking) -> int:
+    """Fail the booking's pending payments that were never paid, e.g. a dismissed checkout"""
+    unpaid = Payment.objects.filter(booking=booking, status='pending').filter(
+        Q(razorpay_payment_id__isnull=True) | Q(razorpay_payment_id='')
+    )
+    released = 0
+    for payment in unpaid.only('id', 'booking_id', 'amount', 'status'):
+        if transition(payment, 'failed'):
+            released += 1
+    return released
+
+
+def release_stale(booking: Optional[Booking] = None) -> int:
+    """Fail pending payments older than the reservation timeout, returning their hold"""
+    cutoff = timezone.now() - timedelta(seconds=get_reservation_timeout())
+    stale = Payment.objects.filter(status='pending', created_at__lt=cutoff)
+    if booking is not None:
+        stale = stale.filter(booking=booking)
+    released = 0
+    for payment in stale.only('id', 'booking_id', 'amount', 'status'):
+        if transition(payment, 'failed'):
+            released += 1
+    if released:
+        logger.info(f"Released {released} abandoned pending payments")
+    return released
+
+
+def reconcile(fix: bool = True) -> List[dict]:
+    """Compare every booking's ledger with its payments; fixes drift unless ``fix`` is False"""
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=10, decimal_places=2))
+    bookings = Booking.objects.annotate(
+        paid=Coalesce(Sum('payments__amount', filter=Q(payments__status='completed')), zero),
+        held=Coalesce(Sum('payments__amount', filter=Q(payments__status__in=HOLDING)), zero),
+    ).values_list('pk', 'booking_number', 'total_amount', 'amount_paid', 'outstanding', 'paid', 'held')
+
+    mismatches = []
+    for pk, booking_number, total, amount_paid, outstanding, paid, held in bookings.iterator():
+        expected = total - held
+        if amount_paid == paid and outstanding == expected:
+            continue
+        fixed = False
+        if fix:
+            # Skip bookings whose ledger moved since it was read
+            fixed = bool(Booking.objects.filter(pk=pk, amount_paid=amount_paid, outstanding=outstanding).update(
+                amount_paid=paid, outstanding=expected,
+            ))
+        mismatches.append({
+            'booking_number': booking_number,
+            'amount_paid': amount_paid,
+            'expected_paid': paid,
+            'outstanding': outstanding,
+            'expected_outstanding': expected,
+            'fixed': fixed,
+        })
+    return mismatches
@@ -3,11 +3,14 @@ from vehicles.models import Vehicle
 from tours.models import City, Route, LocalArea, SightseeingSpot, TourPackage
 from blog.models import BlogPost
 from enquiries.models import Testimonial, Promotion
+from tours.services.catalog_bundle import catalog_bundle
 
 
 class Command(BaseCommand):
     help = 'Load initial test data for the application'
 
+    # One catalog bundle publish for the whole run, not one per saved row
+    @catalog_bundle.batch()
     def handle(self, *args, **options):
         self.stdout.write('Loading initial data...')
         
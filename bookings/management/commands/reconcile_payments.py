@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from bookings import ledger
+
+
+class Command(BaseCommand):
+    help = 'Release abandoned pending payments and check every booking ledger against its payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report mismatches without fixing them',
+        )
+        parser.add_argument(
+            '--keep-pending',
+            action='store_true',
+            help='Do not fail pending payments older than the reservation timeout',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Reconciling booking payments...'))
+        if not options['keep_pending'] and not options['dry_run']:
+            released = ledger.release_stale()
+            self.stdout.write(f"  Released {released} abandoned pending payments")
+
+        mismatches = ledger.reconcile(fix=not options['dry_run'])
+        for mismatch in mismatches:
+            line = (
+                f"{mismatch['booking_number']}: paid {mismatch['amount_paid']} -> {mismatch['expected_paid']}, "
+                f"outstanding {mismatch['outstanding']} -> {mismatch['expected_outstanding']}"
+            )
+            if mismatch['fixed']:
+                self.stdout.write(self.style.SUCCESS(f"  ✓ {line}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"  ✗ {line}"))
+
+        fixed = sum(mismatch['fixed'] for mismatch in mismatches)
+        self.stdout.write(self.style.SUCCESS(f"\n{len(mismatches)} mismatched bookings, {fixed} fixed"))
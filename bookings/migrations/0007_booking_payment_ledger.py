@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:26
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_ledger(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=10, decimal_places=2))
+    bookings = Booking.objects.annotate(
+        paid=Coalesce(Sum('payments__amount', filter=Q(payments__status='completed')), zero),
+        held=Coalesce(Sum('payments__amount', filter=Q(payments__status__in=('pending', 'completed'))), zero),
+    ).values_list('pk', 'total_amount', 'paid', 'held')
+    for pk, total_amount, paid, held in bookings.iterator():
+        Booking.objects.filter(pk=pk).update(amount_paid=paid, outstanding=total_amount - held)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_add_notification_models'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Sum of completed payments', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='outstanding',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Total amount less completed and pending payments', max_digits=10),
+        ),
+        migrations.RunPython(populate_ledger, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,16 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F
 from accounts.models import User
 from vehicles.models import Vehicle
 from phonenumber_field.modelfields import PhoneNumberField
 
 
+# Booking columns written only by the payment ledger
+LEDGER_FIELDS = ('amount_paid', 'outstanding')
+
+
 class Booking(models.Model):
     BOOKING_STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -63,6 +70,16 @@ class Booking(models.Model):
     advance_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     special_instructions = models.TextField(blank=True, null=True)
     
+    # Payment ledger, maintained by bookings.ledger with F() updates
+    amount_paid = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False,
+        help_text="Sum of completed payments"
+    )
+    outstanding = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False,
+        help_text="Total amount less completed and pending payments"
+    )
+    
     # Status
     status = models.CharField(max_length=20, choices=BOOKING_STATUS_CHOICES, default='pending')
     
@@ -81,6 +98,44 @@ class Booking(models.Model):
     def __str__(self):
         return f"{self.booking_number} - {self.name}"
     
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.outstanding = Decimal(str(self.total_amount)) - Decimal(str(self.amount_paid))
+            return super().save(*args, **kwargs)
+        
+        # The ledger columns only change through F() updates, so a save must
+        # not write back the values this instance happened to load
+        implicit = kwargs.get('update_fields') is None
+        if implicit:
+            deferred = self.get_deferred_fields()
+            fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in LEDGER_FIELDS and field.attname not in deferred
+            ]
+        else:
+            fields = [name for name in kwargs['update_fields'] if name not in LEDGER_FIELDS]
+        
+        with transaction.atomic():
+            found = True
+            if 'total_amount' in fields:
+                # Move the balance by the new total's difference to the stored one,
+                # before the save overwrites it
+                total = self.total_amount
+                if not hasattr(total, 'resolve_expression'):
+                    total = Decimal(str(total))
+                found = Booking.objects.filter(pk=self.pk).update(
+                    outstanding=F('outstanding') + (total - F('total_amount'))
+                )
+            elif implicit:
+                found = Booking.objects.filter(pk=self.pk).exists()
+            
+            if implicit and not found:
+                # The row is gone: save() inserts it again, as it always has
+                self.outstanding = Decimal(str(self.total_amount)) - Decimal(str(self.amount_paid))
+                return super().save(*args, **kwargs)
+            kwargs['update_fields'] = fields
+            return super().save(*args, **kwargs)
+    
     # Properties for notification services compatibility
     @property
     def customer_name(self):
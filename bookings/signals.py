@@ -4,10 +4,11 @@ Automatically sends notifications when bookings are created or updated
 """
 
 import logging
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.conf import settings
-from .models import Booking
+from .models import Booking, Payment
+from . import ledger
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +106,12 @@ def track_booking_status_changes(sender, instance, **kwargs):
         instance._previous_status = None
 
 
+@receiver(post_delete, sender=Payment)
+def release_deleted_payment(sender, instance, **kwargs):
+    """Take a deleted payment out of its booking's ledger"""
+    ledger.unbook(instance)
+
+
 def _send_status_update_notifications(booking, previous_status, current_status):
     """
     Send notifications when booking status changes
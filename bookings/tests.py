@@ -0,0 +1,216 @@
+"""
+Tests for the booking payment ledger
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings import ledger
+from bookings.models import Booking, Payment
+
+
+@override_settings(BOOKING_NOTIFICATIONS_ENABLED=False)
+class BookingLedgerTests(TestCase):
+    def setUp(self):
+        self.booking = Booking.objects.create(
+            booking_number='RT-LEDGER-1',
+            name='Ledger Guest',
+            email='guest@example.com',
+            phone='+919876543210',
+            pickup_address='Gandhipuram',
+            drop_address='Ooty',
+            pickup_city='Coimbatore',
+            pickup_date=date.today() + timedelta(days=7),
+            trip_type='outstation',
+            payment_type='upi',
+            total_amount=Decimal('5000.00'),
+        )
+
+    def refresh(self):
+        self.booking.refresh_from_db()
+        return self.booking.amount_paid, self.booking.outstanding
+
+    def test_new_booking_owes_total(self):
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('5000.00')))
+
+    def test_pending_payment_holds_balance(self):
+        ledger.open_payment(self.booking, '3000')
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('2000.00')))
+        with self.assertRaises(ledger.InsufficientBalance):
+            ledger.open_payment(self.booking, '2500')
+        self.assertEqual(Payment.objects.filter(booking=self.booking).count(), 1)
+
+    def test_completion_is_counted_once(self):
+        payment = ledger.open_payment(self.booking, '3000')
+        duplicate = Payment.objects.get(pk=payment.pk)
+        self.assertTrue(ledger.transition(payment, 'completed', razorpay_payment_id='pay_1'))
+        self.assertFalse(ledger.transition(duplicate, 'completed', razorpay_payment_id='pay_1'))
+        self.assertEqual(self.refresh(), (Decimal('3000.00'), Decimal('2000.00')))
+
+        self.assertTrue(ledger.transition(payment, 'refunded'))
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('5000.00')))
+
+    def test_save_keeps_ledger_and_applies_total_change(self):
+        stale = Booking.objects.get(pk=self.booking.pk)
+        ledger.record_payment(self.booking, '1000')
+        stale.total_amount = Decimal('6000.00')
+        stale.save()
+        self.assertEqual(self.refresh(), (Decimal('1000.00'), Decimal('5000.00')))
+
+    def test_deferred_save_keeps_ledger(self):
+        ledger.record_payment(self.booking, '1000')
+        booking = Booking.objects.only('pk', 'status').get(pk=self.booking.pk)
+        booking.status = 'confirmed'
+        with CaptureQueriesContext(connection) as queries:
+            booking.save()
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('amount_paid', updates[0])
+        self.assertEqual(self.refresh(), (Decimal('1000.00'), Decimal('4000.00')))
+
+    def test_racing_total_changes_apply_to_stored_total(self):
+        first = Booking.objects.get(pk=self.booking.pk)
+        second = Booking.objects.get(pk=self.booking.pk)
+        first.total_amount = Decimal('6000.00')
+        first.save()
+        second.total_amount = Decimal('5500.00')
+        second.save()
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('5500.00')))
+
+    def test_expression_total_and_missing_row(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.total_amount = F('total_amount') + 500
+        booking.save()
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('5500.00')))
+
+        Booking.objects.filter(pk=self.booking.pk).delete()
+        booking.total_amount = Decimal('4000.00')
+        booking.save()
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('4000.00')))
+
+    def test_repeated_gateway_report_is_booked_once(self):
+        fields = {'razorpay_order_id': 'order_1', 'razorpay_payment_id': 'pay_1'}
+        payment, created = ledger.record_payment(self.booking, '1000', **fields)
+        repeat, repeated = ledger.record_payment(self.booking, '1000', **fields)
+        self.assertTrue(created)
+        self.assertFalse(repeated)
+        self.assertEqual(repeat.pk, payment.pk)
+        self.assertEqual(self.refresh(), (Decimal('1000.00'), Decimal('4000.00')))
+
+    def test_gateway_report_completes_open_checkout(self):
+        checkout = ledger.open_payment(self.booking, '2000', razorpay_order_id='order_1')
+        payment, created = ledger.record_payment(
+            self.booking, '5000', razorpay_order_id='order_1', razorpay_payment_id='pay_1'
+        )
+        self.assertTrue(created)
+        self.assertEqual(payment.pk, checkout.pk)
+        self.assertEqual(Payment.objects.filter(booking=self.booking).count(), 1)
+        self.assertEqual(self.refresh(), (Decimal('2000.00'), Decimal('3000.00')))
+
+    def test_deleted_payment_is_unbooked(self):
+        payment, _ = ledger.record_payment(self.booking, '1000')
+        payment.delete()
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('5000.00')))
+
+    def test_release_stale_frees_abandoned_hold(self):
+        payment = ledger.open_payment(self.booking, '3000')
+        Payment.objects.filter(pk=payment.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        ledger.open_payment(self.booking, '500')
+        self.assertEqual(ledger.release_stale(self.booking), 1)
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('4500.00')))
+        self.assertEqual(Payment.objects.get(pk=payment.pk).status, 'failed')
+
+    def test_reconcile_command_fixes_drift(self):
+        ledger.record_payment(self.booking, '1000')
+        Booking.objects.filter(pk=self.booking.pk).update(amount_paid=0, outstanding=5000)
+
+        out = StringIO()
+        call_command('reconcile_payments', '--dry-run', stdout=out)
+        self.assertIn('✗ RT-LEDGER-1', out.getvalue())
+        self.assertEqual(self.refresh(), (Decimal('0'), Decimal('5000.00')))
+
+        out = StringIO()
+        call_command('reconcile_payments', stdout=out)
+        self.assertIn('✓ RT-LEDGER-1', out.getvalue())
+        self.assertEqual(self.refresh(), (Decimal('1000.00'), Decimal('4000.00')))
+        self.assertEqual(ledger.reconcile(), [])
+
+    def test_validate_payment_reads_ledger(self):
+        ledger.record_payment(self.booking, '1500')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/bookings/validate-payment/', {'booking_number': 'RT-LEDGER-1'}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_paid'], 1500.0)
+        self.assertEqual(response.json()['outstanding_amount'], 3500.0)
+        self.assertFalse(any('SUM(' in query['sql'].upper() for query in queries))
+
+
+@override_settings(BOOKING_NOTIFICATIONS_ENABLED=False, RAZORPAY_KEY_ID='rzp_test', RAZORPAY_KEY_SECRET='secret')
+class PaymentFlowTests(TestCase):
+    def setUp(self):
+        self.booking = Booking.objects.create(
+            booking_number='RT-FLOW-1',
+            name='Flow Guest',
+            email='guest@example.com',
+            phone='+919876543210',
+            pickup_address='Gandhipuram',
+            drop_address='Ooty',
+            pickup_city='Coimbatore',
+            pickup_date=date.today() + timedelta(days=7),
+            trip_type='outstation',
+            payment_type='upi',
+            total_amount=Decimal('5000.00'),
+        )
+        patcher = mock.patch('bookings.views.razorpay.Client')
+        self.client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        orders = iter(range(1, 100))
+        self.client_class.return_value.order.create.side_effect = lambda data: {
+            'id': f'order_{next(orders)}', 'amount': data['amount'], 'currency': 'INR'
+        }
+
+    def checkout(self, amount):
+        return self.client.post('/api/bookings/process-payment/', {
+            'booking_number': 'RT-FLOW-1', 'amount': amount, 'captcha': 'AB12', 'captcha_code': 'AB12',
+        }, content_type='application/json')
+
+    def test_retry_after_dismissed_checkout(self):
+        self.assertEqual(self.checkout(5000).status_code, 200)
+        # The customer closes the Razorpay modal and pays again
+        retry = self.checkout(5000)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(
+            list(Payment.objects.filter(booking=self.booking).order_by('pk').values_list('status', flat=True)),
+            ['failed', 'pending'],
+        )
+        self.booking.refresh_from_db()
+        self.assertEqual((self.booking.amount_paid, self.booking.outstanding), (Decimal('0'), Decimal('0')))
+
+        response = self.client.post(
+            '/api/bookings/validate-payment/', {'booking_number': 'RT-FLOW-1'}, content_type='application/json'
+        )
+        self.assertEqual(response.json()['outstanding_amount'], 5000.0)
+
+    def test_replayed_callback_is_booked_once(self):
+        order_id = self.checkout(2000).json()['order_id']
+        payload = {
+            'razorpay_payment_id': 'pay_1', 'razorpay_order_id': order_id,
+            'razorpay_signature': 'sig', 'booking_number': 'RT-FLOW-1',
+        }
+        for _ in range(2):
+            response = self.client.post('/api/razorpay/callback/', payload, content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+        self.booking.refresh_from_db()
+        self.assertEqual((self.booking.amount_paid, self.booking.outstanding), (Decimal('2000.00'), Decimal('3000.00')))
+        self.assertEqual(Payment.objects.filter(booking=self.booking, status='completed').count(), 1)
@@ -11,9 +11,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from .models import Booking, Payment, BookingRoute
-from django.db.models import Sum
+from . import ledger
 from vehicles.models import Vehicle
 from tours.models import City
+from tours.services import sightseeing_catalog
 from .utils import send_booking_confirmation_email, send_booking_whatsapp, send_admin_notification
 import razorpay
 from django.conf import settings
@@ -74,15 +75,17 @@ def get_booking_summary(request):
         # Get pickup city details
         if pickup_city_id:
             try:
-                from tours.models import City
-                pickup_city = City.objects.get(id=pickup_city_id)
+                sightseeing = sightseeing_catalog.get(int(pickup_city_id))
+            except ValueError:
+                sightseeing = None
+            if sightseeing:
                 response_data['pickup_city'] = {
-                    'id': pickup_city.id,
-                    'name': pickup_city.name,
-                    'tourist_places': pickup_city.get_tourist_places_list(),
-                    'sightseeing_km': float(pickup_city.sightseeing_kilometers)
+                    'id': sightseeing['city_id'],
+                    'name': sightseeing['city_name'],
+                    'tourist_places': sightseeing['tourist_places'],
+                    'sightseeing_km': sightseeing['sightseeing_kilometers']
                 }
-            except City.DoesNotExist:
+            else:
                 response_data['pickup_city'] = None
         
         # Get vehicle details
@@ -185,17 +188,15 @@ def get_booking_summary(request):
                     
                     # Get routes from multicity data to identify hill stations
                     if 'routes' in response_data:
+                        destinations = sightseeing_catalog.get_many(
+                            route['to_city_id'] for route in response_data['routes'] if route.get('to_city_id')
+                        )
                         for route in response_data['routes']:
                             # Check if destination city is a hill station
-                            try:
-                                to_city_id = route.get('to_city_id')
-                                if to_city_id:
-                                    city = City.objects.get(id=to_city_id)
-                                    if city.is_hill_station and city.name not in hill_stations_visited:
-                                        hill_charges += float(city.hill_station_charge)
-                                        hill_stations_visited.add(city.name)
-                            except City.DoesNotExist:
-                                pass
+                            city = destinations.get(route.get('to_city_id'))
+                            if city and city['is_hill_station'] and city['city_name'] not in hill_stations_visited:
+                                hill_charges += city['hill_station_charge']
+                                hill_stations_visited.add(city['city_name'])
                     
                     # Calculate extra km
                     extra_km = max(0, total_distance - total_free_km)
@@ -750,17 +751,18 @@ def razorpay_callback(request):
             client.utility.verify_payment_signature(params_dict)
             booking = Booking.objects.get(booking_number=booking_number)
             
-            payment = Payment.objects.create(
-                booking=booking,
+            # Repeated callbacks for the same payment are booked once
+            payment, created = ledger.record_payment(
+                booking,
+                booking.advance_amount or booking.total_amount,
                 razorpay_order_id=order_id,
                 razorpay_payment_id=payment_id,
                 razorpay_signature=signature,
-                amount=booking.advance_amount or booking.total_amount,
-                status='completed'
             )
             
-            booking.status = 'confirmed'
-            booking.save()
+            if created:
+                booking.status = 'confirmed'
+                booking.save()
             
             return JsonResponse({'status': 'success', 'message': 'Payment successful'})
         except razorpay.errors.SignatureVerificationError:
@@ -802,13 +804,9 @@ def validate_booking_for_payment(request):
         except Booking.DoesNotExist:
             return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Calculate total paid amount
-        total_paid = Payment.objects.filter(
-            booking=booking,
-            status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        outstanding_amount = float(booking.total_amount) - float(total_paid)
+        # Balance still held by an open checkout is owed until it is paid
+        total_paid = booking.amount_paid
+        outstanding_amount = float(booking.total_amount - total_paid)
         
         return Response({
             'exists': True,
@@ -849,27 +847,25 @@ def process_payment(request):
         except Booking.DoesNotExist:
             return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Calculate outstanding amount
-        total_paid = Payment.objects.filter(
-            booking=booking,
-            status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        outstanding_amount = float(booking.total_amount) - float(total_paid)
-        
         # Validate amount
         if amount <= 0:
             return Response({'error': 'Invalid amount'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if amount > outstanding_amount:
+        if not settings.RAZORPAY_KEY_ID or not settings.RAZORPAY_KEY_SECRET:
+            return Response({'error': 'Razorpay is not configured'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # A new checkout replaces earlier ones that were dismissed before paying,
+        # then holds the amount against the outstanding balance
+        ledger.release_unpaid(booking)
+        try:
+            payment = ledger.open_payment(booking, amount)
+        except ledger.InsufficientBalance:
+            booking.refresh_from_db(fields=['amount_paid'])
             return Response({
-                'error': f'Amount cannot exceed outstanding amount of ₹{outstanding_amount:.2f}'
+                'error': f'Amount cannot exceed outstanding amount of ₹{float(booking.total_amount - booking.amount_paid):.2f}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Create Razorpay order
-        if not settings.RAZORPAY_KEY_ID or not settings.RAZORPAY_KEY_SECRET:
-            return Response({'error': 'Razorpay is not configured'}, status=status.HTTP_400_BAD_REQUEST)
-        
         client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
         order_data = {
             'amount': int(amount * 100),  # Convert to paise
@@ -882,15 +878,14 @@ def process_payment(request):
                 'phone': phone
             }
         }
-        order = client.order.create(data=order_data)
+        try:
+            order = client.order.create(data=order_data)
+        except Exception:
+            ledger.transition(payment, 'failed')
+            raise
         
-        # Create pending payment record
-        payment = Payment.objects.create(
-            booking=booking,
-            razorpay_order_id=order['id'],
-            amount=amount,
-            status='pending'
-        )
+        payment.razorpay_order_id = order['id']
+        payment.save(update_fields=['razorpay_order_id'])
         
         return Response({
             'order_id': order['id'],
@@ -936,29 +931,21 @@ def payment_success(request):
         try:
             client.utility.verify_payment_signature(params_dict)
             
-            # Update payment record
-            payment.razorpay_payment_id = payment_id
-            payment.razorpay_signature = signature
-            payment.status = 'completed'
-            payment.save()
+            # Complete the payment once, even if the callback is repeated
+            completed = ledger.transition(
+                payment, 'completed', razorpay_payment_id=payment_id, razorpay_signature=signature
+            )
             
-            # Update booking status
+            # Full and partial payments both confirm the booking
             booking = payment.booking
-            total_paid = Payment.objects.filter(
-                booking=booking,
-                status='completed'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            if float(total_paid) >= float(booking.total_amount):
+            if completed:
                 booking.status = 'confirmed'
-            else:
-                booking.status = 'confirmed'  # Still confirmed for partial payment
-            booking.save()
-            
-            # Send notifications
-            from .utils import send_payment_confirmation_email, send_payment_whatsapp
-            send_payment_confirmation_email(payment)
-            send_payment_whatsapp(payment)
+                booking.save()
+                
+                # Send notifications
+                from .utils import send_payment_confirmation_email, send_payment_whatsapp
+                send_payment_confirmation_email(payment)
+                send_payment_whatsapp(payment)
             
             return JsonResponse({
                 'status': 'success',
@@ -968,8 +955,7 @@ def payment_success(request):
                 'amount': float(payment.amount)
             })
         except razorpay.errors.SignatureVerificationError:
-            payment.status = 'failed'
-            payment.save()
+            ledger.transition(payment, 'failed')
             return JsonResponse({'status': 'error', 'message': 'Invalid signature'}, status=400)
     
     except Exception as e:
@@ -1035,7 +1021,7 @@ def verify_booking_for_cancellation(request):
         
         # Calculate payments
         payments = Payment.objects.filter(booking=booking, status='completed')
-        total_paid = payments.aggregate(total=Sum('amount'))['total'] or 0
+        total_paid = booking.amount_paid
         
         # Calculate cancellation charges (10% of total amount)
         cancellation_charge_percent = 10
@@ -1098,7 +1084,7 @@ def confirm_cancellation(request):
         
         # Calculate refund
         payments = Payment.objects.filter(booking=booking, status='completed')
-        total_paid = payments.aggregate(total=Sum('amount'))['total'] or 0
+        total_paid = booking.amount_paid
         cancellation_charges = float(booking.total_amount) * 0.10
         final_refund = max(0, float(total_paid) - cancellation_charges)
         
@@ -1122,8 +1108,7 @@ def confirm_cancellation(request):
                             'amount': int(refund_amount * 100)  # Convert to paise
                         })
                         
-                        payment.status = 'refunded'
-                        payment.save()
+                        ledger.transition(payment, 'refunded')
                         refunded_payments.append({
                             'payment_id': payment.razorpay_payment_id,
                             'refund_id': refund.get('id'),
@@ -1324,9 +1309,7 @@ def booking_details(request, booking_id):
         routes = BookingRoute.objects.filter(booking=booking).order_by('order')
         
         # Calculate payment summary
-        total_paid = payments.filter(status='completed').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        total_paid = booking.amount_paid
         
         remaining_amount = booking.total_amount - total_paid
         
@@ -0,0 +1,167 @@
+"""
+Google Reviews Cache
+Keeps the last good Google Places reviews payload in the shared cache and
+serves it with stale-while-revalidate: fresh entries are returned as is,
+stale ones are returned immediately while one background thread refreshes
+them, and API failures keep serving the last good payload.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PLACES_DETAILS_URL = 'https://maps.googleapis.com/maps/api/place/details/json'
+
+ENTRY_KEY = 'enquiries_google_reviews'
+LOCK_KEY = 'enquiries_google_reviews_refresh_lock'
+FAILURE_KEY = 'enquiries_google_reviews_failure'
+
+
+class ReviewsFetchError(Exception):
+    """Raised when the Places API does not return a usable payload"""
+
+
+class GoogleReviewsCache:
+    """Stale-while-revalidate cache in front of the Places details API"""
+
+    # Last refresh thread started by this worker
+    _refresh_thread: Optional[threading.Thread] = None
+
+    @property
+    def api_url(self) -> str:
+        # Overridable so tests and staging can point at a stub Places server
+        return getattr(settings, 'GOOGLE_PLACES_API_URL', PLACES_DETAILS_URL)
+
+    @property
+    def fresh_for(self) -> int:
+        return getattr(settings, 'GOOGLE_REVIEWS_FRESH_FOR', 6 * 3600)
+
+    @property
+    def retry_after(self) -> int:
+        # Back-off after a failed fetch before Google is called again
+        return getattr(settings, 'GOOGLE_REVIEWS_RETRY_AFTER', 300)
+
+    @property
+    def request_timeout(self) -> float:
+        return getattr(settings, 'GOOGLE_REVIEWS_TIMEOUT', 5)
+
+    def is_configured(self) -> bool:
+        return bool(getattr(settings, 'GOOGLE_PLACES_API_KEY', '') and getattr(settings, 'GOOGLE_PLACE_ID', ''))
+
+    def fetch(self) -> Dict[str, Any]:
+        """Call the Places API and return the processed payload"""
+        params = {
+            'place_id': settings.GOOGLE_PLACE_ID,
+            'fields': 'name,rating,user_ratings_total,reviews',
+            'key': settings.GOOGLE_PLACES_API_KEY,
+        }
+        try:
+            response = requests.get(self.api_url, params=params, timeout=self.request_timeout)
+            data = response.json()
+        except requests.exceptions.Timeout:
+            raise ReviewsFetchError('Google API request timed out')
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise ReviewsFetchError(f'Failed to connect to Google API: {e}')
+
+        if data.get('status') != 'OK':
+            raise ReviewsFetchError(
+                f"{data.get('status', 'UNKNOWN_ERROR')}: {data.get('error_message', 'Unknown error')}"
+            )
+        return self._process(data.get('result', {}))
+
+    def _process(self, place_data: Dict[str, Any]) -> Dict[str, Any]:
+        reviews = place_data.get('reviews', [])
+
+        processed_reviews = []
+        rating_breakdown = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+        for review in reviews:
+            processed_reviews.append({
+                'author_name': review.get('author_name', 'Anonymous'),
+                'rating': review.get('rating', 5),
+                'text': review.get('text', ''),
+                'time': review.get('time', 0),
+                'profile_photo_url': review.get('profile_photo_url', ''),
+                'relative_time_description': review.get('relative_time_description', '')
+            })
+            rating = review.get('rating', 5)
+            if rating in rating_breakdown:
+                rating_breakdown[rating] += 1
+
+        return {
+            'success': True,
+            'rating': place_data.get('rating', 4.8),
+            'total_reviews': place_data.get('user_ratings_total', 0),
+            'reviews': processed_reviews,
+            'rating_breakdown': rating_breakdown,
+            'place_name': place_data.get('name', 'Ritham Tours & Travels')
+        }
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """
+        Fetch and store a new payload. On failure the last good entry is
+        kept and further attempts are held off for ``retry_after`` seconds.
+        """
+        try:
+            payload = self.fetch()
+        except ReviewsFetchError as e:
+            logger.warning(f"Google reviews refresh failed: {e}")
+            cache.set(FAILURE_KEY, {'error': str(e), 'failed_at': time.time()}, self.retry_after)
+            return None
+
+        entry = {'payload': payload, 'fetched_at': time.time()}
+        # Never expires: the last good payload is the fallback for API outages
+        cache.set(ENTRY_KEY, entry, None)
+        cache.delete(FAILURE_KEY)
+        logger.info(f"Refreshed Google reviews ({len(payload['reviews'])} reviews)")
+        return entry
+
+    def refresh_in_background(self) -> Optional[threading.Thread]:
+        """Start one refresh thread unless another worker is already refreshing"""
+        if cache.get(FAILURE_KEY) is not None:
+            return None
+        if not cache.add(LOCK_KEY, 1, int(self.request_timeout) + 5):
+            return None
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                cache.delete(LOCK_KEY)
+
+        thread = threading.Thread(target=run, name='google-reviews-refresh', daemon=True)
+        thread.start()
+        self._refresh_thread = thread
+        return thread
+
+    def get(self) -> Dict[str, Any]:
+        """Return the reviews payload, refreshing it as needed"""
+        entry = cache.get(ENTRY_KEY)
+        if entry is None:
+            # Nothing to serve yet: fetch inline unless a recent attempt failed
+            failure = cache.get(FAILURE_KEY)
+            if failure is None:
+                entry = self.refresh()
+            if entry is None:
+                failure = cache.get(FAILURE_KEY) or {}
+                return {
+                    'success': False,
+                    'error': 'Failed to fetch reviews from Google',
+                    'details': failure.get('error', 'Unknown error'),
+                }
+
+        age = time.time() - entry['fetched_at']
+        stale = age > self.fresh_for
+        if stale:
+            self.refresh_in_background()
+        return {**entry['payload'], 'cached_age': int(age), 'stale': stale}
+
+
+# Global service instance
+google_reviews = GoogleReviewsCache()
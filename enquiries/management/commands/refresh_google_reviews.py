@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from enquiries.google_reviews import google_reviews
+from tours.caching import is_shared_cache
+
+
+class Command(BaseCommand):
+    help = 'Refresh the cached Google reviews payload (run from cron to keep it warm)'
+
+    def handle(self, *args, **options):
+        if not google_reviews.is_configured():
+            raise CommandError('GOOGLE_PLACES_API_KEY and GOOGLE_PLACE_ID are not configured')
+        if not is_shared_cache():
+            # A payload stored in this process's own cache never reaches the web workers
+            raise CommandError('The web workers cannot see this process\'s cache; configure a shared cache (REDIS_URL)')
+
+        self.stdout.write(self.style.SUCCESS('Refreshing Google reviews...'))
+        entry = google_reviews.refresh()
+        if entry is None:
+            # The previous payload is still served; only the refresh failed
+            raise CommandError('Refresh failed; the last good payload is kept')
+
+        payload = entry['payload']
+        self.stdout.write(f"  Place:   {payload['place_name']}")
+        self.stdout.write(f"  Rating:  {payload['rating']} ({payload['total_reviews']} ratings)")
+        self.stdout.write(f"  Reviews: {len(payload['reviews'])}")
+        self.stdout.write(self.style.SUCCESS('\nGoogle reviews refreshed'))
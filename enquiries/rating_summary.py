@@ -0,0 +1,72 @@
+"""
+Testimonial Rating Summary
+Rating distribution, average and 4 & 5-star share of approved testimonials,
+computed with one GROUP BY query and kept in the shared cache until a
+testimonial is saved or deleted.
+"""
+
+import logging
+from typing import Any, Dict
+
+from django.core.cache import cache
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'enquiries_rating_summary'
+RATINGS = (1, 2, 3, 4, 5)
+
+
+class RatingSummary:
+    """Cached aggregate of approved testimonial ratings"""
+
+    timeout = 24 * 3600
+
+    def compute(self) -> Dict[str, Any]:
+        from .models import Testimonial
+
+        rows = (
+            Testimonial.objects.filter(is_approved=True)
+            .order_by()
+            .values('rating')
+            .annotate(count=Count('id'))
+        )
+        rating_counts = {rating: 0 for rating in RATINGS}
+        for row in rows:
+            rating_counts[row['rating']] = row['count']
+
+        total_reviews = sum(rating_counts.values())
+        if not total_reviews:
+            return {
+                'total_reviews': 0,
+                'average_rating': 0,
+                'rating_counts': rating_counts,
+                'rating_percentages': {rating: 0 for rating in RATINGS},
+                'high_rating_percentage': 0,
+            }
+
+        weighted = sum(rating * count for rating, count in rating_counts.items())
+        return {
+            'total_reviews': total_reviews,
+            'average_rating': round(weighted / total_reviews, 1),
+            'rating_counts': rating_counts,
+            'rating_percentages': {
+                rating: round((count / total_reviews) * 100) for rating, count in rating_counts.items()
+            },
+            'high_rating_percentage': round(((rating_counts[4] + rating_counts[5]) / total_reviews) * 100),
+        }
+
+    def get(self) -> Dict[str, Any]:
+        summary = cache.get(CACHE_KEY)
+        if summary is None:
+            summary = self.compute()
+            cache.set(CACHE_KEY, summary, self.timeout)
+            logger.debug(f"Computed rating summary for {summary['total_reviews']} testimonials")
+        return summary
+
+    def invalidate(self) -> None:
+        cache.delete(CACHE_KEY)
+
+
+# Global service instance
+rating_summary = RatingSummary()
@@ -4,11 +4,12 @@ Automatically sends notifications when enquiries are created
 """
 
 import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.conf import settings
 from django.core.mail import send_mail
-from .models import Enquiry
+from .models import Enquiry, Testimonial
+from .rating_summary import rating_summary
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +76,13 @@ Admin Panel: {getattr(settings, 'WEBSITE_URL', 'https://rithamtravels.in')}/trav
             logger.error(f"Error sending enquiry notification for enquiry {instance.id}: {str(e)}")
 
 
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+def invalidate_rating_summary(sender, **kwargs):
+    """Recompute the testimonial rating summary after a review is added, edited or removed"""
+    rating_summary.invalidate()
+
+
 # Signal configuration
 def configure_enquiry_signals():
     """Configure enquiry signals - called from apps.py"""
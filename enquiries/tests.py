@@ -0,0 +1,153 @@
+"""
+Tests for the enquiries app
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from enquiries.google_reviews import ENTRY_KEY, google_reviews
+from enquiries.models import Testimonial
+from enquiries.rating_summary import rating_summary
+
+
+class StubPlacesHandler(BaseHTTPRequestHandler):
+    """Answers Places details requests with ``server.payload``"""
+
+    def do_GET(self):
+        self.server.calls += 1
+        body = json.dumps(self.server.payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+PLACE_OK = {
+    'status': 'OK',
+    'result': {
+        'name': 'Ritham Tours & Travels',
+        'rating': 4.9,
+        'user_ratings_total': 120,
+        'reviews': [
+            {'author_name': 'Asha', 'rating': 5, 'text': 'Great trip'},
+            {'author_name': 'Ravi', 'rating': 4, 'text': 'Good driver'},
+        ],
+    },
+}
+
+
+class GoogleReviewsCacheTests(SimpleTestCase):
+    """Tests for the stale-while-revalidate Google reviews cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.server = HTTPServer(('127.0.0.1', 0), StubPlacesHandler)
+        self.server.calls = 0
+        self.server.payload = PLACE_OK
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        settings = override_settings(
+            GOOGLE_PLACES_API_URL=f"http://127.0.0.1:{self.server.server_port}/details/json",
+            GOOGLE_PLACES_API_KEY='test-key',
+            GOOGLE_PLACE_ID='test-place',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(cache.clear)
+
+    def test_fresh_payload_is_served_from_cache(self):
+        first = self.client.get('/api/google-reviews/').json()
+        second = self.client.get('/api/google-reviews/').json()
+
+        self.assertTrue(first['success'])
+        self.assertEqual(first['total_reviews'], 120)
+        self.assertEqual(first['rating_breakdown']['5'], 1)
+        self.assertFalse(second['stale'])
+        self.assertEqual(self.server.calls, 1)
+
+    def test_stale_payload_is_served_while_refreshing(self):
+        google_reviews.refresh()
+        entry = cache.get(ENTRY_KEY)
+        entry['fetched_at'] = time.time() - 7 * 3600
+        cache.set(ENTRY_KEY, entry, None)
+        self.server.payload = {**PLACE_OK, 'result': {**PLACE_OK['result'], 'user_ratings_total': 121}}
+
+        data = google_reviews.get()
+        self.assertTrue(data['stale'])
+        self.assertEqual(data['total_reviews'], 120)
+
+        google_reviews._refresh_thread.join(5)
+        self.assertEqual(google_reviews.get()['total_reviews'], 121)
+        self.assertEqual(self.server.calls, 2)
+
+    def test_api_errors_keep_last_good_payload(self):
+        google_reviews.refresh()
+        self.server.payload = {'status': 'OVER_QUERY_LIMIT', 'error_message': 'quota'}
+
+        self.assertIsNone(google_reviews.refresh())
+        data = google_reviews.get()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['total_reviews'], 120)
+
+    def test_failed_cold_fetch_backs_off(self):
+        self.server.payload = {'status': 'REQUEST_DENIED', 'error_message': 'bad key'}
+
+        self.assertFalse(google_reviews.get()['success'])
+        self.assertFalse(google_reviews.get()['success'])
+        self.assertEqual(self.server.calls, 1)
+
+
+class RatingSummaryTests(TestCase):
+    """Tests for the testimonial rating summary and paginated testimonials page"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        User = get_user_model()
+        for index, rating in enumerate([5, 5, 5, 4, 3, 1]):
+            user = User.objects.create_user(
+                email=f"guest{index}@example.com", username=f"guest{index}", password='pass12345'
+            )
+            Testimonial.objects.create(user=user, name=f"Guest {index}", rating=rating, review='Nice trip')
+
+    def test_summary_uses_one_query_and_is_cached(self):
+        with self.assertNumQueries(1):
+            summary = rating_summary.get()
+        with self.assertNumQueries(0):
+            rating_summary.get()
+
+        self.assertEqual(summary['total_reviews'], 6)
+        self.assertEqual(summary['average_rating'], 3.8)
+        self.assertEqual(summary['rating_counts'], {1: 1, 2: 0, 3: 1, 4: 1, 5: 3})
+        self.assertEqual(summary['high_rating_percentage'], 67)
+
+    def test_saving_a_testimonial_invalidates_summary(self):
+        rating_summary.get()
+        Testimonial.objects.filter(rating=1).get().delete()
+        self.assertEqual(rating_summary.get()['total_reviews'], 5)
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_testimonials_page_is_paginated(self):
+        User = get_user_model()
+        for index in range(6, 14):
+            user = User.objects.create_user(
+                email=f"guest{index}@example.com", username=f"guest{index}", password='pass12345'
+            )
+            Testimonial.objects.create(user=user, name=f"Guest {index}", rating=5, review='Nice trip')
+
+        response = self.client.get('/testimonials/')
+        self.assertEqual(len(response.context['testimonials']), 12)
+        self.assertEqual(response.context['total_reviews'], 14)
+        self.assertContains(response, 'data-next-page="2"')
+        self.assertEqual(len(self.client.get('/testimonials/', {'page': 2}).context['testimonials']), 2)
@@ -1,5 +1,5 @@
 from django.shortcuts import render
-from django.views.generic import TemplateView
+from django.views.generic import ListView, TemplateView
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
@@ -9,9 +9,12 @@ from rest_framework.permissions import AllowAny
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
 from .models import Enquiry, Testimonial, Promotion
+from seo.mixins import FullPageCacheMixin
+from tours.single_flight import single_flight
+from .google_reviews import google_reviews
+from .rating_summary import rating_summary
 from django.core.mail import send_mail
 from django.conf import settings
-import requests
 import json
 
 
@@ -25,49 +28,21 @@ class ContactUsView(TemplateView):
         return context
 
 
-class TestimonialsView(TemplateView):
+class TestimonialsView(ListView):
     template_name = 'enquiries/testimonials.html'
+    context_object_name = 'testimonials'
+    paginate_by = 12
+    
+    def get_queryset(self):
+        return Testimonial.objects.filter(is_approved=True)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get all approved testimonials
-        testimonials = Testimonial.objects.filter(is_approved=True)
-        context['testimonials'] = testimonials
-        
-        # Calculate statistics
-        total_reviews = testimonials.count()
-        context['total_reviews'] = total_reviews
-        
-        # Calculate average rating
-        if total_reviews > 0:
-            from django.db.models import Avg
-            avg_rating = testimonials.aggregate(Avg('rating'))['rating__avg']
-            context['average_rating'] = round(avg_rating, 1) if avg_rating else 0
-            
-            # Calculate rating distribution
-            rating_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            for testimonial in testimonials:
-                rating_counts[testimonial.rating] = rating_counts.get(testimonial.rating, 0) + 1
-            
-            context['rating_counts'] = rating_counts
-            
-            # Calculate percentages
-            rating_percentages = {}
-            for rating, count in rating_counts.items():
-                rating_percentages[rating] = round((count / total_reviews) * 100) if total_reviews > 0 else 0
-            context['rating_percentages'] = rating_percentages
-            
-            # Calculate 4 & 5-star percentage
-            four_star_count = rating_counts.get(4, 0)
-            five_star_count = rating_counts.get(5, 0)
-            high_rating_percentage = round(((four_star_count + five_star_count) / total_reviews) * 100) if total_reviews > 0 else 0
-            context['high_rating_percentage'] = high_rating_percentage
-        else:
-            context['average_rating'] = 0
-            context['rating_counts'] = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            context['rating_percentages'] = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            context['high_rating_percentage'] = 0
+        # Distribution, average and 4 & 5-star share from one cached GROUP BY query
+        summary = rating_summary.get()
+        context.update(summary)
+        total_reviews = summary['total_reviews']
         
         # Estimate happy customers (can be based on bookings or a multiplier)
         # For now, use a reasonable multiplier of reviews
@@ -78,8 +53,9 @@ class TestimonialsView(TemplateView):
         
         # Check if current user can submit a review
         if self.request.user.is_authenticated:
-            context['user_can_review'] = not Testimonial.objects.filter(user=self.request.user).exists()
-            context['user_has_reviewed'] = Testimonial.objects.filter(user=self.request.user).exists()
+            has_reviewed = Testimonial.objects.filter(user=self.request.user).exists()
+            context['user_can_review'] = not has_reviewed
+            context['user_has_reviewed'] = has_reviewed
         else:
             context['user_can_review'] = False
             context['user_has_reviewed'] = False
@@ -287,30 +263,32 @@ def get_user_testimonial(request):
 
 
 # Policy Page Views
-class TermsConditionsView(TemplateView):
+class TermsConditionsView(FullPageCacheMixin, TemplateView):
     template_name = 'enquiries/terms_conditions.html'
 
 
-class CancelRefundPolicyView(TemplateView):
+class CancelRefundPolicyView(FullPageCacheMixin, TemplateView):
     template_name = 'enquiries/cancel_refund_policy.html'
 
 
-class PrivacyPolicyView(TemplateView):
+class PrivacyPolicyView(FullPageCacheMixin, TemplateView):
     template_name = 'enquiries/privacy_policy.html'
 
 
-class ShippingPolicyView(TemplateView):
+class ShippingPolicyView(FullPageCacheMixin, TemplateView):
     template_name = 'enquiries/shipping_policy.html'
 
 
-class DisclaimerPolicyView(TemplateView):
+class DisclaimerPolicyView(FullPageCacheMixin, TemplateView):
     template_name = 'enquiries/disclaimer_policy.html'
 
 
-class RazorpayPrivacyPolicyView(TemplateView):
+class RazorpayPrivacyPolicyView(FullPageCacheMixin, TemplateView):
     template_name = 'enquiries/razorpay_privacy_policy.html'
 
 
+# Every page with the reviews widget calls this at once; share one Google request
+@single_flight(timeout=15, shared=True, share_for=5)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def google_reviews_api(request):
@@ -333,89 +311,14 @@ def google_reviews_api(request):
     4. Restrict the key to Places API
     """
     
-    # Get API credentials from settings
-    api_key = getattr(settings, 'GOOGLE_PLACES_API_KEY', '')
-    place_id = getattr(settings, 'GOOGLE_PLACE_ID', '')
-    
     # Check if API credentials are configured
-    if not api_key or not place_id:
+    if not google_reviews.is_configured():
         return JsonResponse({
             'success': False,
             'error': 'Google API credentials not configured',
             'message': 'Please set GOOGLE_PLACES_API_KEY and GOOGLE_PLACE_ID in your environment variables'
         })
-    
-    try:
-        # Google Places API endpoint for place details
-        url = "https://maps.googleapis.com/maps/api/place/details/json"
-        
-        params = {
-            'place_id': place_id,
-            'fields': 'name,rating,user_ratings_total,reviews',
-            'key': api_key
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        if data.get('status') == 'OK':
-            place_data = data.get('result', {})
-            
-            # Extract reviews
-            reviews = place_data.get('reviews', [])
-            
-            # Process reviews
-            processed_reviews = []
-            for review in reviews:
-                processed_reviews.append({
-                    'author_name': review.get('author_name', 'Anonymous'),
-                    'rating': review.get('rating', 5),
-                    'text': review.get('text', ''),
-                    'time': review.get('time', 0),
-                    'profile_photo_url': review.get('profile_photo_url', ''),
-                    'relative_time_description': review.get('relative_time_description', '')
-                })
-            
-            # Calculate rating breakdown
-            rating_breakdown = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            for review in reviews:
-                rating = review.get('rating', 5)
-                if rating in rating_breakdown:
-                    rating_breakdown[rating] += 1
-            
-            return JsonResponse({
-                'success': True,
-                'rating': place_data.get('rating', 4.8),
-                'total_reviews': place_data.get('user_ratings_total', 0),
-                'reviews': processed_reviews,
-                'rating_breakdown': rating_breakdown,
-                'place_name': place_data.get('name', 'Ritham Tours & Travels')
-            })
-        else:
-            return JsonResponse({
-                'success': False,
-                'error': 'Failed to fetch reviews from Google',
-                'details': data.get('error_message', 'Unknown error'),
-                'status': data.get('status', 'UNKNOWN_ERROR')
-            })
-            
-    except requests.exceptions.Timeout:
-        return JsonResponse({
-            'success': False,
-            'error': 'Request timeout',
-            'message': 'Google API request timed out. Please try again.'
-        })
-    except requests.exceptions.RequestException as e:
-        return JsonResponse({
-            'success': False,
-            'error': 'Network error',
-            'message': 'Failed to connect to Google API.',
-            'details': str(e)
-        })
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': 'Server error while fetching reviews',
-            'details': str(e)
-        })
+
+    # Served from the cache; stale payloads are refreshed in the background
+    return JsonResponse(google_reviews.get())
 
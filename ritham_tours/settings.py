@@ -51,6 +51,8 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'seo.middleware.SEORedirectMiddleware',
+    'seo.middleware.FullPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -126,6 +128,26 @@ DATABASES = {
     }
 }
 
+# Shared by every gunicorn worker and the cron management commands: buffered
+# blog views, API cache counters, Google reviews and the model versions all
+# have to be seen by every process. Without REDIS_URL (local development)
+# each process gets its own cache and those cron commands refuse to run.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
 
 # DATABASES = {
 #     'default': {
@@ -199,6 +221,12 @@ STATICFILES_FINDERS = [
 
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Files with a 12 character content hash (manifest names and catalog bundles) never change
+WHITENOISE_IMMUTABLE_FILE_TEST = r'^.+\.[0-9a-f]{12}\..+$'
+
+# Republish the static catalog bundle after admin edits (manage.py publish_catalog)
+CATALOG_BUNDLE_AUTO_PUBLISH = True
+
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -281,6 +309,14 @@ CONTACT_EMAIL = 'rithamtravels@gmail.com'
 # Google API Configuration
 GOOGLE_PLACES_API_KEY = config('GOOGLE_PLACES_API_KEY', default='')
 GOOGLE_PLACE_ID = config('GOOGLE_PLACE_ID', default='')
+# Reviews are served from cache and refreshed in the background once older than this
+GOOGLE_REVIEWS_FRESH_FOR = 6 * 60 * 60
+
+# Buffered blog view counts are written to the database at most this often (seconds)
+BLOG_VIEW_FLUSH_INTERVAL = 60
+
+# Unpaid pending payments stop holding the booking's balance after this long (seconds)
+PAYMENT_RESERVATION_TIMEOUT = 15 * 60
 
 # Company Details
 COMPANY_NAME = 'Ritham Tours & Travels'
@@ -23,6 +23,7 @@ urlpatterns = [
     path('', include('tours.urls')),
     path('', include('blog.urls')),
     path('', include('enquiries.urls')),
+    path('', include('seo.urls')),
 ]
 
 if settings.DEBUG:
@@ -176,6 +176,8 @@ class SEORedirectAdmin(admin.ModelAdmin):
         'new_path',
         'redirect_type',
         'is_active',
+        'hit_count',
+        'last_hit_at',
         'created_at'
     ]
     
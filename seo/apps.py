@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SeoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'seo'
+    
+    def ready(self):
+        """Import signals when the app is ready"""
+        import seo.signals
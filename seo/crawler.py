@@ -0,0 +1,272 @@
+"""
+SEO Crawler
+Discovers the site's pages from the URL conf and the sitemap sections,
+renders them through the test client across a process pool and records,
+per page, the SEO checks together with render time, query count and
+response size. Shared by validate_seo, seo_proof and extract_head.
+"""
+
+import json
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import django
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+
+from .sitemaps import SECTIONS
+
+# URL conf prefixes that are not public pages: admin, APIs, generated files,
+# dashboards and endpoints with side effects
+EXCLUDED_PREFIXES = (
+    'admin/', 'api/', 'static/', 'media/', 'sitemap', 'webhook/', 'logout/', 'forgot-password/',
+    'payment/', 'travels-dashboard/', 'customer-dashboard/',
+)
+
+
+def _static_routes(patterns, prefix: str = '') -> Iterable[str]:
+    for pattern in patterns:
+        route = pattern.pattern
+        if not isinstance(route, RoutePattern) or route.converters:
+            continue
+        path = prefix + str(route)
+        if isinstance(pattern, URLResolver):
+            yield from _static_routes(pattern.url_patterns, path)
+        elif isinstance(pattern, URLPattern) and not path.startswith(EXCLUDED_PREFIXES):
+            yield f"/{path}"
+
+
+def discover_urls() -> List[str]:
+    """Parameterless routes from the URL conf plus every sitemap URL"""
+    paths = set(_static_routes(get_resolver().url_patterns))
+    for section in SECTIONS.values():
+        paths.update(path for path, _ in section.entries(0, section.count()))
+    return sorted(paths)
+
+
+def site_host() -> Tuple[str, bool]:
+    """Host and HTTPS flag of SITE_URL, so requests pass ALLOWED_HOSTS outside the test runner"""
+    site = urlparse(getattr(settings, 'SITE_URL', 'https://rithamtravels.in'))
+    return site.netloc, site.scheme == 'https'
+
+
+def fetch(path: str) -> Tuple[Any, bytes]:
+    """GET ``path`` through the test client as SITE_URL; returns the response and its body"""
+    host, secure = site_host()
+    response = Client().get(path, HTTP_HOST=host, secure=secure)
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    return response, content
+
+
+def analyze_html(path: str, content: bytes) -> Dict[str, Any]:
+    """SEO checks for one rendered page"""
+    soup = BeautifulSoup(content.decode('utf-8'), 'html.parser')
+
+    issues = []
+    warnings = []
+
+    # Check title tag
+    title_tag = soup.find('title')
+    title = title_tag.get_text().strip() if title_tag else None
+    if not title_tag:
+        issues.append("Missing <title> tag")
+    elif not title:
+        issues.append("Empty <title> tag")
+    elif len(title) > 60:
+        warnings.append(f"Title too long ({len(title)} chars, recommended: ≤60)")
+
+    # Check meta description
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    description = meta_desc.get('content', '') if meta_desc else None
+    if not meta_desc:
+        issues.append("Missing meta description")
+    elif not description.strip():
+        issues.append("Empty meta description")
+    elif len(description) > 160:
+        warnings.append(f"Meta description too long ({len(description)} chars, recommended: ≤160)")
+
+    # Check meta keywords
+    if not soup.find('meta', attrs={'name': 'keywords'}):
+        warnings.append("Missing meta keywords")
+
+    # Check canonical URL
+    canonical = soup.find('link', attrs={'rel': 'canonical'})
+    if not canonical:
+        warnings.append("Missing canonical URL")
+
+    # Check Open Graph tags
+    og_image = soup.find('meta', attrs={'property': 'og:image'})
+    for prop, label in (('og:title', 'title'), ('og:description', 'description'), ('og:image', 'image'), ('og:url', 'URL')):
+        if not soup.find('meta', attrs={'property': prop}):
+            issues.append(f"Missing Open Graph {label}")
+
+    # Check Twitter Card tags
+    for name, label in (('twitter:card', 'type'), ('twitter:title', 'title'), ('twitter:description', 'description'), ('twitter:image', 'image')):
+        if not soup.find('meta', attrs={'name': name}):
+            warnings.append(f"Missing Twitter Card {label}")
+
+    # Check structured data
+    json_ld_scripts = soup.find_all('script', attrs={'type': 'application/ld+json'})
+    if not json_ld_scripts:
+        warnings.append("Missing structured data (JSON-LD)")
+    for script in json_ld_scripts:
+        try:
+            json.loads(script.get_text())
+        except json.JSONDecodeError:
+            issues.append("Invalid JSON-LD structured data")
+
+    # Check robots and viewport meta tags
+    if not soup.find('meta', attrs={'name': 'robots'}):
+        warnings.append("Missing robots meta tag")
+    if not soup.find('meta', attrs={'name': 'viewport'}):
+        issues.append("Missing viewport meta tag")
+
+    # Check for duplicate meta tags
+    seen = set()
+    for meta in soup.find_all('meta'):
+        for attr in ('name', 'property'):
+            value = meta.get(attr)
+            if value:
+                if (attr, value) in seen:
+                    warnings.append(f"Duplicate meta {attr}='{value}'")
+                seen.add((attr, value))
+
+    # Check heading structure
+    headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+    h1_count = len(soup.find_all('h1'))
+    if h1_count == 0:
+        issues.append("Missing H1 tag")
+    elif h1_count > 1:
+        warnings.append(f"Multiple H1 tags found ({h1_count})")
+
+    # Check image alt attributes
+    images = soup.find_all('img')
+    images_without_alt = [img for img in images if not img.get('alt')]
+    if images_without_alt:
+        warnings.append(f"{len(images_without_alt)} images missing alt attributes")
+
+    if issues:
+        status = 'error'
+    elif warnings:
+        status = 'warning'
+    else:
+        status = 'success'
+
+    return {
+        'url': path,
+        'status': status,
+        'title': title,
+        'meta_description': description,
+        'canonical': canonical.get('href') if canonical else None,
+        'og_image': og_image.get('content') if og_image else None,
+        'issues': issues,
+        'warnings': warnings,
+        'stats': {
+            'title_length': len(title) if title else 0,
+            'description_length': len(description) if description else 0,
+            'h1_count': h1_count,
+            'total_headings': len(headings),
+            'images_count': len(images),
+            'images_without_alt': len(images_without_alt),
+            'json_ld_count': len(json_ld_scripts),
+        },
+    }
+
+
+def crawl_page(path: str, repeat: int = 1) -> Dict[str, Any]:
+    """Render ``path`` ``repeat`` times; SEO checks plus timings of the renders"""
+    timings = []
+    try:
+        for run in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response, content = fetch(path)
+                timings.append((time.perf_counter() - started) * 1000)
+            if run == 0:
+                # Queries and cache status of the first, cold render
+                first_queries, page_cache = len(queries), response.get('X-Page-Cache')
+    except Exception as e:
+        return {'url': path, 'status': 'error', 'message': str(e), 'issues': [], 'warnings': []}
+
+    benchmark = {
+        'status_code': response.status_code,
+        'render_ms': round(statistics.median(timings), 2),
+        'first_render_ms': round(timings[0], 2),
+        'queries': first_queries,
+        'bytes': len(content),
+        'page_cache': page_cache,
+    }
+    # Redirects (login-only pages) and POST-only endpoints are not pages to validate
+    if 300 <= response.status_code < 400 or response.status_code == 405:
+        result = {'url': path, 'status': 'skipped', 'message': f'HTTP {response.status_code}', 'issues': [], 'warnings': []}
+    elif response.status_code == 400:
+        # Almost always DisallowedHost: every page would time an error page
+        message = f'HTTP 400 (is {site_host()[0]} in ALLOWED_HOSTS?)'
+        result = {'url': path, 'status': 'error', 'message': message, 'issues': [], 'warnings': []}
+    elif response.status_code != 200:
+        result = {'url': path, 'status': 'error', 'message': f'HTTP {response.status_code}', 'issues': [], 'warnings': []}
+    elif 'html' not in response.get('Content-Type', ''):
+        result = {'url': path, 'status': 'skipped', 'message': response.get('Content-Type'), 'issues': [], 'warnings': []}
+    else:
+        result = analyze_html(path, content)
+    result['benchmark'] = benchmark
+    return result
+
+
+def _init_worker() -> None:
+    # Needed where workers are spawned rather than forked
+    django.setup()
+
+
+def crawl(paths: List[str], workers: Optional[int] = None, repeat: int = 1) -> List[Dict[str, Any]]:
+    """Crawl ``paths`` across ``workers`` processes (inline for one); results keep the input order"""
+    if workers == 1:
+        return [crawl_page(path, repeat) for path in paths]
+    # Each worker opens its own database connection
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(crawl_page, paths, [repeat] * len(paths)))
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    timed = [result['benchmark'] for result in results if 'benchmark' in result]
+    render_ms = sorted(benchmark['render_ms'] for benchmark in timed)
+    return {
+        'pages': len(results),
+        'success': sum(result['status'] == 'success' for result in results),
+        'warning': sum(result['status'] == 'warning' for result in results),
+        'error': sum(result['status'] == 'error' for result in results),
+        'skipped': sum(result['status'] == 'skipped' for result in results),
+        'bad_request': sum(result.get('benchmark', {}).get('status_code') == 400 for result in results),
+        'render_ms_total': round(sum(render_ms), 2),
+        'render_ms_median': round(statistics.median(render_ms), 2) if render_ms else 0,
+        'render_ms_p95': render_ms[max(0, int(len(render_ms) * 0.95) - 1)] if render_ms else 0,
+        'queries_total': sum(benchmark['queries'] for benchmark in timed),
+        'bytes_total': sum(benchmark['bytes'] for benchmark in timed),
+    }
+
+
+def compare(current: List[Dict[str, Any]], previous: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-page render time, query and size changes against an earlier report"""
+    before = {result['url']: result['benchmark'] for result in previous if 'benchmark' in result}
+    changes = []
+    for result in current:
+        old, new = before.get(result['url']), result.get('benchmark')
+        if old is None or new is None:
+            continue
+        changes.append({
+            'url': result['url'],
+            'render_ms': round(new['render_ms'] - old['render_ms'], 2),
+            'render_pct': round((new['render_ms'] - old['render_ms']) / old['render_ms'] * 100, 1) if old['render_ms'] else 0.0,
+            'queries': new['queries'] - old['queries'],
+            'bytes': new['bytes'] - old['bytes'],
+        })
+    return changes
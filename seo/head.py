@@ -0,0 +1,139 @@
+"""
+SEO Head Fragment
+Resolves a page's SEO data once (PageSEO overrides on top of the view's
+SEOMixin context, with SEOConfig defaults underneath) and caches the rendered
+<head> meta block per path and SEO content version. The version is the one
+the full-page cache uses, so any PageSEO or SEOConfig edit invalidates both.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from . import page_cache
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAME = 'seo/seo_meta.html'
+
+# PageSEO fields that replace the view's value whenever they are filled in
+PAGE_OVERRIDE_FIELDS = (
+    'title', 'description', 'keywords', 'page_type', 'og_image_alt', 'twitter_card_type',
+    'canonical_url', 'robots', 'article_section', 'published_time', 'modified_time',
+    'product_price', 'product_availability',
+)
+
+# SEOConfig fields that replace the settings-based values in ``site_seo``
+SITE_OVERRIDE_FIELDS = ('site_name', 'twitter_handle', 'facebook_app_id', 'google_site_verification')
+
+
+def get_timeout() -> Optional[int]:
+    return getattr(settings, 'SEO_HEAD_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def _key(kind: str, *parts: str) -> str:
+    digest = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+    return f"seo_head_{kind}_{page_cache.get_version()}_{digest}"
+
+
+def _filled(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in values.items() if value not in (None, '')}
+
+
+def get_config() -> Dict[str, Any]:
+    """Active SEOConfig as plain values ({} when there is none)"""
+    from .models import SEOConfig
+
+    key = _key('config')
+    config = cache.get(key)
+    if config is None:
+        active = SEOConfig.get_active_config()
+        config = {}
+        if active is not None:
+            config = {name: getattr(active, name) for name in SITE_OVERRIDE_FIELDS}
+            config.update(
+                site_description=active.site_description,
+                site_keywords=active.site_keywords,
+                default_og_image=active.default_og_image.url if active.default_og_image else '',
+            )
+        cache.set(key, config, get_timeout())
+    return config
+
+
+def get_page(path: str) -> Dict[str, Any]:
+    """Active PageSEO for ``path``: explicit overrides and generated fallbacks"""
+    from .models import PageSEO
+
+    key = _key('page', path)
+    page = cache.get(key)
+    if page is None:
+        page_seo = PageSEO.get_page_seo(path)
+        page = {}
+        if page_seo is not None:
+            overrides = {name: getattr(page_seo, name) for name in PAGE_OVERRIDE_FIELDS}
+            overrides['og_image'] = page_seo.og_image.url if page_seo.og_image else ''
+            page = {
+                'overrides': _filled(overrides),
+                'fallbacks': {
+                    'title': page_seo.get_effective_title(),
+                    'description': page_seo.get_effective_description(),
+                    'keywords': page_seo.get_effective_keywords(),
+                },
+            }
+        cache.set(key, page, get_timeout())
+    return page
+
+
+def resolve(path: str, seo: Optional[Dict[str, Any]], site_seo: Optional[Dict[str, Any]]):
+    """Merged ``(seo, site_seo)`` for a page from its view context and the SEO models"""
+    config = get_config()
+    page = get_page(path)
+
+    site = dict(site_seo or {})
+    site.update(_filled({name: config.get(name) for name in SITE_OVERRIDE_FIELDS}))
+    if config.get('default_og_image'):
+        site['default_og_image'] = config['default_og_image']
+
+    merged = _filled({'description': config.get('site_description'), 'keywords': config.get('site_keywords')})
+    merged.update(page.get('fallbacks', {}))
+    merged.update(_filled(seo or {}))
+    merged.update(page.get('overrides', {}))
+    return merged, site
+
+
+def render(request, seo: Optional[Dict[str, Any]], site_seo: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """``{'title', 'html'}`` for the page's <head>, rendered at most once per SEO version"""
+    from .templatetags.seo_tags import seo_title
+
+    path = request.path if request is not None else ''
+    merged, site = resolve(path, seo, site_seo)
+    if not merged.get('canonical_url') and request is not None:
+        # Without the query string, so tracking parameters share one fragment
+        merged['canonical_url'] = request.path
+
+    key = _key('fragment', path, json.dumps(merged, sort_keys=True, default=str))
+    entry = cache.get(key)
+    if entry is None:
+        context = {'seo': merged, 'site_seo': site, 'request': request}
+        entry = {
+            'title': str(seo_title(merged.get('title'), site.get('site_name'))),
+            'html': render_to_string(TEMPLATE_NAME, context),
+        }
+        cache.set(key, entry, get_timeout())
+    return entry
+
+
+def for_context(context) -> Dict[str, str]:
+    """Head entry for a template context, computed once per request"""
+    request = context.get('request')
+    entry = getattr(request, '_seo_head', None)
+    if entry is None:
+        entry = render(request, context.get('seo'), context.get('site_seo'))
+        if request is not None:
+            request._seo_head = entry
+    return entry
@@ -3,8 +3,8 @@ Django Management Command to extract HTML head content
 """
 
 from django.core.management.base import BaseCommand
-from django.test import Client
 from bs4 import BeautifulSoup
+from seo.crawler import fetch
 
 
 class Command(BaseCommand):
@@ -14,17 +14,15 @@ class Command(BaseCommand):
         parser.add_argument('url', type=str, help='URL path to extract head from')
     
     def handle(self, *args, **options):
-        client = Client()
         url = options['url']
         
         try:
-            response = client.get(url)
+            response, content = fetch(url)
             if response.status_code != 200:
                 self.stdout.write(f"Error: HTTP {response.status_code}")
                 return
             
-            content = response.content.decode('utf-8')
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = BeautifulSoup(content.decode('utf-8'), 'html.parser')
             
             head = soup.find('head')
             if head:
@@ -3,16 +3,13 @@ Django Management Command to prove SEO implementation
 """
 
 from django.core.management.base import BaseCommand
-from django.test import Client
-from bs4 import BeautifulSoup
+from seo.crawler import analyze_html, fetch
 
 
 class Command(BaseCommand):
     help = 'Prove SEO implementation with actual tests'
     
     def handle(self, *args, **options):
-        client = Client()
-        
         # Test pages
         test_urls = [
             ('/', 'Home Page'),
@@ -26,37 +23,30 @@ class Command(BaseCommand):
             self.stdout.write(f"🔍 Testing {page_name} ({url})")
             
             try:
-                response = client.get(url)
+                response, content = fetch(url)
                 if response.status_code != 200:
                     self.stdout.write(f"❌ {page_name}: HTTP {response.status_code}")
                     continue
                 
-                content = response.content.decode('utf-8')
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Check required elements
-                title = soup.find('title')
-                meta_desc = soup.find('meta', attrs={'name': 'description'})
-                og_image = soup.find('meta', attrs={'property': 'og:image'})
-                json_ld = soup.find_all('script', attrs={'type': 'application/ld+json'})
+                result = analyze_html(url, content)
+                content = content.decode('utf-8')
                 
                 # Verify no page can render without these
-                if not title or not title.get_text().strip():
+                if not result['title']:
                     self.stdout.write(f"❌ {page_name}: Missing title")
                     continue
                     
-                if not meta_desc or not meta_desc.get('content', '').strip():
+                if not (result['meta_description'] or '').strip():
                     self.stdout.write(f"❌ {page_name}: Missing description")
                     continue
                     
-                if not og_image or not og_image.get('content', '').strip():
+                if not (result['og_image'] or '').strip():
                     self.stdout.write(f"❌ {page_name}: Missing OG image")
                     continue
                 
                 # Check for production domain usage
-                og_image_url = og_image.get('content', '')
-                canonical = soup.find('link', attrs={'rel': 'canonical'})
-                canonical_url = canonical.get('href', '') if canonical else ''
+                og_image_url = result['og_image']
+                canonical_url = result['canonical'] or ''
                 
                 # Check if testserver is present (should not be)
                 if 'testserver' in content:
@@ -71,11 +61,11 @@ class Command(BaseCommand):
                     self.stdout.write(f"⚠️  {page_name}: Missing production domain")
                 
                 self.stdout.write(f"✅ {page_name}: All required SEO elements present")
-                self.stdout.write(f"   Title: {title.get_text()}")
-                self.stdout.write(f"   Description: {meta_desc.get('content')[:80]}...")
+                self.stdout.write(f"   Title: {result['title']}")
+                self.stdout.write(f"   Description: {result['meta_description'][:80]}...")
                 self.stdout.write(f"   OG Image: {og_image_url}")
                 self.stdout.write(f"   Canonical: {canonical_url}")
-                self.stdout.write(f"   JSON-LD blocks: {len(json_ld)}")
+                self.stdout.write(f"   JSON-LD blocks: {result['stats']['json_ld_count']}")
                 
             except Exception as e:
                 self.stdout.write(f"❌ {page_name}: Error - {str(e)}")
@@ -117,9 +107,9 @@ class Command(BaseCommand):
         with open('templates/base.html', 'r') as f:
             base_content = f.read()
             
-        if "{% include 'seo/seo_meta.html' %}" in base_content:
+        if "{% seo_head %}" in base_content:
             self.stdout.write("✅ All future pages automatically inherit SEO")
-            self.stdout.write("   Base template includes SEO meta template")
+            self.stdout.write("   Base template includes the cached SEO head")
         else:
             self.stdout.write("❌ Base template missing SEO inclusion")
         
@@ -0,0 +1,69 @@
+"""
+SEO Middleware for Ritham Tours & Travels
+Redirects legacy URLs and serves static marketing and policy pages from the
+full-page cache
+"""
+
+from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect
+
+from . import page_cache
+from .redirects import redirect_table
+
+
+class SEORedirectMiddleware:
+    """
+    Redirect requests matching an active SEORedirect (exact path, or the
+    longest ``*`` prefix) from the in-memory redirect table.
+
+    Place it before CommonMiddleware so redirects win over APPEND_SLASH.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        match = redirect_table.match(request.path_info)
+        if match is None:
+            return self.get_response(request)
+
+        redirect_id, location, status = match
+        if location == request.path_info:
+            return self.get_response(request)
+        redirect_table.record_hit(redirect_id)
+
+        query = request.META.get('QUERY_STRING', '')
+        if query:
+            location = f"{location}{'&' if '?' in location else '?'}{query}"
+        if status == 301:
+            return HttpResponsePermanentRedirect(location)
+        return HttpResponseRedirect(location)
+
+
+class FullPageCacheMiddleware:
+    """
+    Answer anonymous GETs for views marked with ``full_page_cache`` from the
+    cache, before the session, auth and message middleware run.
+
+    Place it after WhiteNoise/CORS and before SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path = request.path_info
+        if not page_cache.is_cacheable_request(request) or not page_cache.is_cached_view(path):
+            return self.get_response(request)
+
+        entry = page_cache.fetch(path)
+        if entry is not None:
+            return page_cache.build_response(request, entry, 'HIT')
+
+        response = self.get_response(request)
+        entry = page_cache.store(path, response)
+        if entry is None:
+            return response
+        cached = page_cache.build_response(request, entry, 'MISS')
+        # The CSRF cookie set while rendering still goes to this visitor
+        cached.cookies = response.cookies
+        return cached
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seoredirect',
+            name='hit_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Requests redirected (written back periodically)'),
+        ),
+        migrations.AddField(
+            model_name='seoredirect',
+            name='last_hit_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='seoredirect',
+            name='new_path',
+            field=models.CharField(help_text='New URL path to redirect to; end with * to append the rest of a prefix match', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='seoredirect',
+            name='old_path',
+            field=models.CharField(help_text='Old URL path to redirect from; end with * to match every path under it', max_length=255, unique=True),
+        ),
+    ]
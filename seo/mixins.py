@@ -156,4 +156,12 @@ class TestimonialSEOMixin(SEOMixin):
     seo_title = "Customer Testimonials - Ritham Tours & Travels"
     seo_description = "Read genuine customer reviews and testimonials about Ritham Tours & Travels. Discover why travelers trust us for their perfect journey experiences."
     seo_keywords = "customer reviews, testimonials, travel reviews, ritham tours reviews, customer feedback, travel experiences"
-    seo_page_type = "website"
\ No newline at end of file
+    seo_page_type = "website"
+
+class FullPageCacheMixin:
+    """
+    Mark a template view as a static page that FullPageCacheMiddleware may
+    serve to anonymous visitors straight from the cache
+    """
+    
+    full_page_cache = True
@@ -324,12 +324,12 @@ class SEORedirect(models.Model):
     old_path = models.CharField(
         max_length=255,
         unique=True,
-        help_text="Old URL path to redirect from"
+        help_text="Old URL path to redirect from; end with * to match every path under it"
     )
     
     new_path = models.CharField(
         max_length=255,
-        help_text="New URL path to redirect to"
+        help_text="New URL path to redirect to; end with * to append the rest of a prefix match"
     )
     
     redirect_type = models.CharField(
@@ -347,6 +347,14 @@ class SEORedirect(models.Model):
         help_text="Enable this redirect"
     )
     
+    hit_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Requests redirected (written back periodically)"
+    )
+    
+    last_hit_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -0,0 +1,157 @@
+"""
+Full-page cache for static marketing and policy pages
+Stores the rendered HTML of anonymous GETs together with precompressed
+gzip/brotli bodies and a strong ETag. Entries are keyed on the request path
+and the SEO content version, which is bumped whenever PageSEO or SEOConfig
+rows change.
+"""
+
+import gzip
+import hashlib
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import Resolver404, resolve
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'seo_page_cache_version'
+
+# Query parameters added by ad and social links that never change the page
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|gclid|fbclid|msclkid)$')
+
+# Headers set by middleware below the page cache that must be replayed on hits
+REPLAYED_HEADERS = ('Content-Type', 'Content-Language', 'X-Frame-Options')
+
+# Per-visitor CSRF tokens rendered by {% csrf_token %}; shared pages must not carry one
+CSRF_INPUT = re.compile(rb'<input type="hidden" name="csrfmiddlewaretoken" value="[^"]*">')
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_LENGTH = 200
+
+re_accepts_gzip = re.compile(r'\bgzip\b')
+re_accepts_brotli = re.compile(r'\bbr\b')
+
+
+def get_timeout() -> int:
+    return getattr(settings, 'SEO_PAGE_CACHE_TIMEOUT', 3600)
+
+
+def get_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def purge() -> None:
+    """Invalidate every cached page by moving to a new version"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def cache_key(path: str) -> str:
+    digest = hashlib.md5(path.encode('utf-8')).hexdigest()
+    return f"seo_page_{get_version()}_{digest}"
+
+
+def is_cacheable_request(request) -> bool:
+    """Anonymous GET without session, messages or meaningful query parameters"""
+    if request.method != 'GET':
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES or 'messages' in request.COOKIES:
+        return False
+    return all(TRACKING_PARAMS.match(name) for name in request.GET)
+
+
+def is_cached_view(path: str) -> bool:
+    """True when the path resolves to a view marked with ``full_page_cache``"""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return False
+    view_class = getattr(match.func, 'view_class', None)
+    return bool(getattr(view_class, 'full_page_cache', False))
+
+
+def fetch(path: str) -> Optional[Dict[str, Any]]:
+    return cache.get(cache_key(path))
+
+
+def store(path: str, response) -> Optional[Dict[str, Any]]:
+    """Cache a rendered page without its CSRF token; only plain 200 responses are stored"""
+    if response.status_code != 200 or response.streaming or response.has_header('Content-Encoding'):
+        return None
+    if 'private' in response.get('Cache-Control', '') or 'no-store' in response.get('Cache-Control', ''):
+        return None
+    # Only the CSRF cookie may be set; anything else belongs to this visitor
+    if any(name != settings.CSRF_COOKIE_NAME for name in response.cookies):
+        return None
+
+    # Anonymous visitors never post the cached pages' forms with a token,
+    # and a token in a shared copy would be handed to every visitor
+    body = CSRF_INPUT.sub(b'', response.content)
+    entry = {
+        'body': body,
+        'etag': hashlib.md5(body).hexdigest(),
+        'headers': {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)},
+        'gzip': None,
+        'br': None,
+    }
+    if len(body) >= MIN_COMPRESS_LENGTH:
+        entry['gzip'] = gzip.compress(body, compresslevel=6, mtime=0)
+        if brotli is not None:
+            entry['br'] = brotli.compress(body, quality=5)
+    cache.set(cache_key(path), entry, get_timeout())
+    return entry
+
+
+def build_response(request, entry: Dict[str, Any], status: str) -> HttpResponse:
+    """Serve a cache entry, choosing the best encoding and answering If-None-Match"""
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encoding, body = None, entry['body']
+    if entry['br'] and re_accepts_brotli.search(accept_encoding):
+        encoding, body = 'br', entry['br']
+    elif entry['gzip'] and re_accepts_gzip.search(accept_encoding):
+        encoding, body = 'gzip', entry['gzip']
+
+    # Each representation gets its own strong ETag
+    etag = f'"{entry["etag"]}-{encoding}"' if encoding else f'"{entry["etag"]}"'
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        tags = parse_etags(if_none_match)
+        if '*' in tags or etag in tags:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            _set_cache_headers(response, status)
+            return response
+
+    response = HttpResponse(body)
+    for name, value in entry['headers'].items():
+        response[name] = value
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(body))
+    response['ETag'] = etag
+    _set_cache_headers(response, status)
+    return response
+
+
+def _set_cache_headers(response, status: str) -> None:
+    # Browsers revalidate with the ETag, so logged-in visitors never see a stale anonymous page
+    response['Cache-Control'] = 'max-age=0, must-revalidate'
+    response['Vary'] = 'Accept-Encoding, Cookie'
+    response['X-Page-Cache'] = status
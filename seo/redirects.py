@@ -0,0 +1,125 @@
+"""
+SEO Redirect Table
+Active SEORedirect rows held in memory as an exact-path dict plus a prefix
+trie, so legacy URLs are redirected without touching the database. Hit
+counts are buffered per process and written back in batches.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from tours.services.base import InMemoryIndex
+
+logger = logging.getLogger(__name__)
+
+# Marks a prefix redirect in old_path/new_path
+WILDCARD = '*'
+
+# Trie node key holding the redirect that ends at that node
+_END = ''
+
+
+def _normalize(path: str) -> str:
+    return path if path == '/' else path.rstrip('/')
+
+
+class RedirectTable(InMemoryIndex):
+    """Exact and longest-prefix lookup over active redirects"""
+
+    name = 'seo_redirects'
+
+    def __init__(self):
+        super().__init__()
+        self._hits_lock = threading.Lock()
+        self._hits: Counter = Counter()
+        self._flushed_at = time.monotonic()
+
+    @property
+    def flush_interval(self) -> int:
+        return getattr(settings, 'SEO_REDIRECT_HIT_FLUSH_INTERVAL', 60)
+
+    def build(self) -> Dict[str, Any]:
+        from .models import SEORedirect
+
+        exact: Dict[str, Tuple[int, str, int]] = {}
+        trie: Dict[str, Any] = {}
+        redirects = SEORedirect.objects.filter(is_active=True).values_list('id', 'old_path', 'new_path', 'redirect_type')
+        for redirect_id, old_path, new_path, redirect_type in redirects:
+            target = (redirect_id, new_path, int(redirect_type))
+            if old_path.endswith(WILDCARD):
+                node = trie
+                for char in old_path[:-1]:
+                    node = node.setdefault(char, {})
+                node[_END] = target
+            else:
+                exact[_normalize(old_path)] = target
+        return {'exact': exact, 'trie': trie}
+
+    def match(self, path: str) -> Optional[Tuple[int, str, int]]:
+        """Return ``(redirect id, location, status)`` for ``path``, or None"""
+        state = self.state
+        target = state['exact'].get(_normalize(path))
+        if target is not None:
+            redirect_id, new_path, status = target
+            return redirect_id, new_path.rstrip(WILDCARD), status
+
+        # Longest prefix wins
+        node, found, depth = state['trie'], None, 0
+        for index, char in enumerate(path):
+            if _END in node:
+                found, depth = node[_END], index
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            if _END in node:
+                found, depth = node[_END], len(path)
+        if found is None:
+            return None
+
+        redirect_id, new_path, status = found
+        if new_path.endswith(WILDCARD):
+            new_path = new_path[:-1] + path[depth:]
+        return redirect_id, new_path, status
+
+    def record_hit(self, redirect_id: int) -> None:
+        with self._hits_lock:
+            self._hits[redirect_id] += 1
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush_hits()
+
+    def flush_hits(self) -> int:
+        """Write buffered hit counts with one UPDATE; returns the number of hits written"""
+        from .models import SEORedirect
+
+        with self._hits_lock:
+            hits, self._hits = self._hits, Counter()
+            self._flushed_at = time.monotonic()
+        if not hits:
+            return 0
+
+        now = timezone.now()
+        redirects = [
+            SEORedirect(id=redirect_id, hit_count=F('hit_count') + count, last_hit_at=now)
+            for redirect_id, count in hits.items()
+        ]
+        try:
+            SEORedirect.objects.bulk_update(redirects, ['hit_count', 'last_hit_at'])
+        except Exception as e:
+            logger.error(f"Could not write redirect hit counts: {str(e)}")
+            with self._hits_lock:
+                self._hits.update(hits)
+            return 0
+        return sum(hits.values())
+
+
+# Global service instance
+redirect_table = RedirectTable()
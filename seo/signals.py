@@ -0,0 +1,38 @@
+"""
+Django Signals for SEO Data
+Purges the full-page and head caches when SEO configuration changes,
+reloads the redirect table when redirects change and tracks the models
+behind the cached sitemaps
+"""
+
+import logging
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import SEOConfig, PageSEO, SEORedirect
+from . import page_cache
+from .redirects import redirect_table
+from .sitemaps import tracked_models
+from tours.caching import track_models
+
+logger = logging.getLogger(__name__)
+
+# Sitemap shards and package JSON-LD are cached under these models' versions
+track_models(tracked_models())
+
+
+@receiver(post_save, sender=SEOConfig)
+@receiver(post_delete, sender=SEOConfig)
+@receiver(post_save, sender=PageSEO)
+@receiver(post_delete, sender=PageSEO)
+def purge_page_cache(sender, instance, **kwargs):
+    """Cached pages and head fragments embed SEO meta tags, so drop them all once an SEO edit commits"""
+    transaction.on_commit(page_cache.purge)
+    logger.debug(f"Full-page cache purged by {sender.__name__} {instance.pk}")
+
+
+@receiver(post_save, sender=SEORedirect)
+@receiver(post_delete, sender=SEORedirect)
+def reload_redirect_table(sender, instance, **kwargs):
+    """Reload the in-memory redirects in every worker once the admin edit is committed"""
+    transaction.on_commit(redirect_table.invalidate)
@@ -0,0 +1,265 @@
+"""
+Sitemap Generator
+Builds /sitemap.xml as an index of per-section shards of at most 50,000 URLs.
+Shards are streamed straight from ``iterator()`` querysets with ``lastmod``
+taken from ``updated_at``, and the finished XML is cached under the versions
+of the models it was read from, so a shard is only rebuilt after one of those
+rows changes. The pages shard also iterates the tour packages and stores their
+JSON-LD in the same pass.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.urls import reverse
+from django.utils.html import escape
+
+from tours.caching import get_model_version, model_label
+
+# Sitemap protocol limit per file
+SHARD_SIZE = 50000
+
+CHUNK_SIZE = 2000
+
+XML_HEADER = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_OPEN = b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+
+PACKAGES_JSON_LD_KEY = 'seo_packages_json_ld'
+
+Entry = Tuple[str, Optional[datetime]]
+
+
+def get_shard_size() -> int:
+    return getattr(settings, 'SITEMAP_SHARD_SIZE', SHARD_SIZE)
+
+
+def get_timeout() -> Optional[int]:
+    return getattr(settings, 'SITEMAP_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def absolute(path: str) -> str:
+    return f"{getattr(settings, 'SITE_URL', 'https://rithamtravels.in')}{path}"
+
+
+def format_lastmod(value: Optional[datetime]) -> str:
+    return value.replace(microsecond=0).isoformat() if value else ''
+
+
+def versions_digest(models) -> str:
+    versions = ','.join(f"{model_label(model)}:{get_model_version(model)}" for model in models)
+    return hashlib.md5(versions.encode('utf-8')).hexdigest()
+
+
+class Section:
+    """A group of sitemap URLs read from one source, split into shards"""
+
+    name = ''
+    changefreq = 'weekly'
+    priority = '0.5'
+
+    def get_models(self) -> List:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def lastmod(self) -> Optional[datetime]:
+        return None
+
+    def entries(self, offset: int, limit: int) -> Iterator[Entry]:
+        raise NotImplementedError
+
+    def shards(self) -> int:
+        return max(1, -(-self.count() // get_shard_size()))
+
+    def cache_key(self, page: int) -> str:
+        return f"sitemap_{self.name}_{page}_{versions_digest(self.get_models())}"
+
+
+class PagesSection(Section):
+    """Home, planner, destination, tariff and company pages"""
+
+    name = 'pages'
+    url_names = (
+        'home', 'tour_planner', 'about_us', 'contact_us', 'testimonials', 'blog_list',
+        'ooty', 'kodaikanal', 'munnar', 'coorg', 'mysore', 'yercaud', 'wayanad',
+        'tariff', 'tariff_local_hour', 'tariff_outstation_day', 'tariff_outstation_km',
+        'tariff_oneway_fixed', 'tariff_oneway_km',
+        'terms_conditions', 'cancel_refund_policy', 'privacy_policy', 'shipping_policy', 'disclaimer_policy',
+    )
+    # Pages that list tour packages are as fresh as the newest package
+    package_pages = ('home', 'tour_planner')
+    changefreq = 'weekly'
+    priority = '0.8'
+
+    def get_models(self) -> List:
+        from tours.models import City, TourPackage
+        from .models import PageSEO
+
+        return [PageSEO, TourPackage, TourPackage.cities.through, City]
+
+    def count(self) -> int:
+        return len(self.url_names)
+
+    def lastmod(self) -> Optional[datetime]:
+        from tours.models import TourPackage
+        from .models import PageSEO
+
+        dates = [
+            PageSEO.objects.filter(is_active=True).aggregate(latest=Max('updated_at'))['latest'],
+            TourPackage.objects.filter(is_active=True).aggregate(latest=Max('updated_at'))['latest'],
+        ]
+        return max((date for date in dates if date), default=None)
+
+    def entries(self, offset: int, limit: int) -> Iterator[Entry]:
+        from .models import PageSEO
+
+        packages_lastmod = build_packages_json_ld()['lastmod']
+        paths = {name: reverse(name) for name in self.url_names[offset:offset + limit]}
+        updated = dict(
+            PageSEO.objects.filter(page_path__in=paths.values(), is_active=True).values_list('page_path', 'updated_at')
+        )
+        for name, path in paths.items():
+            lastmod = updated.get(path)
+            if name in self.package_pages and packages_lastmod:
+                lastmod = max(lastmod, packages_lastmod) if lastmod else packages_lastmod
+            yield path, lastmod
+
+
+class BlogSection(Section):
+    """Published blog posts"""
+
+    name = 'blog'
+    changefreq = 'weekly'
+    priority = '0.7'
+
+    def get_models(self) -> List:
+        from blog.models import BlogPost
+
+        return [BlogPost]
+
+    def queryset(self):
+        from blog.models import BlogPost
+
+        return BlogPost.objects.filter(is_published=True).order_by('pk')
+
+    def count(self) -> int:
+        return self.queryset().count()
+
+    def lastmod(self) -> Optional[datetime]:
+        return self.queryset().aggregate(latest=Max('updated_at'))['latest']
+
+    def entries(self, offset: int, limit: int) -> Iterator[Entry]:
+        posts = self.queryset().values_list('slug', 'updated_at')[offset:offset + limit]
+        for slug, updated_at in posts.iterator(chunk_size=CHUNK_SIZE):
+            yield reverse('blog_detail', args=[slug]), updated_at
+
+
+SECTIONS: Dict[str, Section] = {section.name: section for section in (PagesSection(), BlogSection())}
+
+
+def tracked_models() -> List:
+    return [model for section in SECTIONS.values() for model in section.get_models()]
+
+
+def _url(path: str, lastmod: Optional[datetime], section: Section) -> bytes:
+    parts = [f"<url><loc>{escape(absolute(path))}</loc>"]
+    if lastmod:
+        parts.append(f"<lastmod>{format_lastmod(lastmod)}</lastmod>")
+    parts.append(f"<changefreq>{section.changefreq}</changefreq><priority>{section.priority}</priority></url>\n")
+    return ''.join(parts).encode('utf-8')
+
+
+def stream_shard(section: Section, page: int) -> Iterator[bytes]:
+    """XML of one shard, yielded as the rows are read"""
+    size = get_shard_size()
+    yield XML_HEADER + URLSET_OPEN
+    for path, lastmod in section.entries((page - 1) * size, size):
+        yield _url(path, lastmod, section)
+    yield b'</urlset>\n'
+
+
+def cached_stream(chunks: Iterator[bytes], key: str) -> Iterator[bytes]:
+    """Pass ``chunks`` through and cache their concatenation once all were sent"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, b''.join(parts), get_timeout())
+
+
+def stream_index() -> Iterator[bytes]:
+    yield XML_HEADER + INDEX_OPEN
+    for section in SECTIONS.values():
+        lastmod = format_lastmod(section.lastmod())
+        for page in range(1, section.shards() + 1):
+            loc = escape(absolute(reverse('sitemap_section', args=[section.name, page])))
+            entry = f"<sitemap><loc>{loc}</loc>"
+            if lastmod:
+                entry += f"<lastmod>{lastmod}</lastmod>"
+            yield f"{entry}</sitemap>\n".encode('utf-8')
+    yield b'</sitemapindex>\n'
+
+
+def index_cache_key() -> str:
+    return f"sitemap_index_{versions_digest(tracked_models())}"
+
+
+def _packages_key() -> str:
+    return f"{PACKAGES_JSON_LD_KEY}_{versions_digest(SECTIONS['pages'].get_models())}"
+
+
+def build_packages_json_ld() -> Dict[str, object]:
+    """Store the JSON-LD of every active tour package together with their latest ``updated_at``"""
+    from tours.models import TourPackage
+
+    site_url = absolute('')
+    items, latest = [], None
+    packages = (
+        TourPackage.objects.filter(is_active=True)
+        .prefetch_related('cities')
+        .order_by('pk')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for package in packages:
+        latest = max(latest, package.updated_at) if latest else package.updated_at
+        trip = {
+            '@type': 'TouristTrip',
+            'name': package.name,
+            'description': package.description[:300],
+            'url': absolute(reverse('tour_planner')),
+            'provider': {'@type': 'TravelAgency', 'name': getattr(settings, 'COMPANY_NAME', 'Ritham Tours & Travels'), 'url': site_url},
+            'itinerary': {
+                '@type': 'ItemList',
+                'itemListElement': [
+                    {'@type': 'ListItem', 'position': position, 'item': {'@type': 'City', 'name': city.name}}
+                    for position, city in enumerate(package.cities.all(), start=1)
+                ],
+            },
+            'offers': {
+                '@type': 'Offer',
+                'price': str(package.price_per_person or package.price_per_vehicle),
+                'priceCurrency': 'INR',
+                'availability': 'https://schema.org/InStock',
+            },
+        }
+        if package.image:
+            trip['image'] = absolute(package.image.url)
+        items.append({'@type': 'ListItem', 'position': len(items) + 1, 'item': trip})
+
+    document = {'@context': 'https://schema.org', '@type': 'ItemList', 'name': 'Tour Packages', 'itemListElement': items}
+    entry = {'json': json.dumps(document), 'lastmod': latest}
+    cache.set(_packages_key(), entry, get_timeout())
+    return entry
+
+
+def packages_json_ld() -> str:
+    """JSON-LD ItemList of the active tour packages, as stored by the pages shard"""
+    entry = cache.get(_packages_key()) or build_packages_json_ld()
+    return entry['json']
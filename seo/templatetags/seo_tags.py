@@ -9,6 +9,9 @@ from django.utils.safestring import mark_safe
 from django.conf import settings
 import re
 
+from seo.head import for_context
+from seo.sitemaps import packages_json_ld
+
 register = template.Library()
 
 @register.simple_tag
@@ -114,6 +117,22 @@ def page_type_to_og_type(page_type):
     }
     return type_mapping.get(page_type, 'website')
 
+@register.simple_tag(takes_context=True)
+def seo_head(context):
+    """Complete SEO meta block for the current page, served from the head cache"""
+    return mark_safe(for_context(context)['html'])
+
+@register.simple_tag(takes_context=True)
+def seo_head_title(context):
+    """Page title resolved together with the cached SEO meta block"""
+    return mark_safe(for_context(context)['title'])
+
+@register.simple_tag
+def tour_packages_json_ld():
+    """JSON-LD ItemList of active tour packages, generated with the sitemap"""
+    data = packages_json_ld().replace('<', '\\u003c')
+    return mark_safe(f'<script type="application/ld+json">{data}</script>')
+
 @register.simple_tag(takes_context=True)
 def seo_debug(context):
     """Debug SEO context - only works in DEBUG mode"""
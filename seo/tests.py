@@ -3,11 +3,24 @@ Property-based tests for SEO template tags
 Feature: website-seo-optimization
 """
 
-from django.test import TestCase, RequestFactory, Client
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory, Client, override_settings
 from django.template import Context, Template
 from django.conf import settings
 from seo.templatetags.seo_tags import seo_title, seo_description, seo_keywords, clean_text
 from seo.models import SEOConfig, PageSEO, SEORedirect
+from seo.redirects import redirect_table
+from seo.sitemaps import packages_json_ld
+from seo.crawler import discover_urls
+from blog.models import BlogPost
+from tours.models import City, TourPackage
 import string
 
 class SEOTemplateTagsUnitTests(TestCase):
@@ -435,4 +448,258 @@ class SEOIntegrationTests(TestCase):
         
         # Test OG image URL
         og_img = og_image_url(context, None)
-        self.assertIn('logo_ritham.png', og_img)
\ No newline at end of file
+        self.assertIn('logo_ritham.png', og_img)
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class FullPageCacheTests(TestCase):
+    """Tests for the anonymous full-page cache on static pages"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+    
+    def test_second_request_is_a_hit_without_queries(self):
+        first = self.client.get('/privacy-policy/')
+        self.assertEqual(first['X-Page-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/privacy-policy/', {'utm_source': 'google'})
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+    
+    def test_etag_revalidation(self):
+        etag = self.client.get('/destinations/ooty/')['ETag']
+        response = self.client.get('/destinations/ooty/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_gzip_body(self):
+        plain = self.client.get('/about-us/').content
+        response = self.client.get('/about-us/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain)
+        self.assertNotEqual(response['ETag'], self.client.get('/about-us/')['ETag'])
+    
+    def test_bypassed_for_sessions_and_other_queries(self):
+        self.client.get('/privacy-policy/')
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = 'abc'
+        self.assertNotIn('X-Page-Cache', self.client.get('/privacy-policy/'))
+        self.assertNotIn('X-Page-Cache', Client().get('/privacy-policy/', {'page': 2}))
+    
+    def test_csrf_token_is_not_shared(self):
+        first = self.client.get('/privacy-policy/')
+        self.assertNotIn(b'csrfmiddlewaretoken" value=', first.content)
+        self.assertIn(settings.CSRF_COOKIE_NAME, first.cookies)
+        second = Client().get('/privacy-policy/')
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        self.assertNotIn(b'csrfmiddlewaretoken" value=', second.content)
+    
+    def test_purged_on_page_seo_save(self):
+        self.client.get('/privacy-policy/')
+        with self.captureOnCommitCallbacks(execute=True):
+            PageSEO.objects.create(page_path='/privacy-policy/', page_name='Privacy Policy')
+            # A render before the commit is still cached under the old version
+            self.assertEqual(self.client.get('/privacy-policy/')['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.client.get('/privacy-policy/')['X-Page-Cache'], 'MISS')
+
+
+class SEORedirectMiddlewareTests(TestCase):
+    """Tests for in-memory SEO redirects"""
+    
+    def setUp(self):
+        cache.clear()
+        # Drop hits buffered by earlier tests
+        redirect_table.flush_hits()
+        self.addCleanup(redirect_table.invalidate)
+        self.exact = SEORedirect.objects.create(old_path='/old-ooty/', new_path='/ooty/')
+        SEORedirect.objects.create(old_path='/packages/*', new_path='/tour-packages/*', redirect_type='302')
+        SEORedirect.objects.create(old_path='/packages/legacy/*', new_path='/tariff/')
+        SEORedirect.objects.create(old_path='/retired/', new_path='/', is_active=False)
+        redirect_table.invalidate()
+    
+    def test_exact_and_prefix_redirects_without_queries(self):
+        self.client.get('/old-ooty/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/old-ooty', {'utm_source': 'mail'})
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], '/ooty/?utm_source=mail')
+        
+        response = self.client.get('/packages/kerala/5-days/')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], '/tour-packages/kerala/5-days/')
+        self.assertEqual(self.client.get('/packages/legacy/x/')['Location'], '/tariff/')
+        self.assertEqual(self.client.get('/retired/').status_code, 404)
+    
+    def test_changes_reload_and_hits_are_written_back(self):
+        self.assertEqual(self.client.get('/old-ooty/')['Location'], '/ooty/')
+        self.exact.new_path = '/ooty-tour/'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exact.save()
+            self.assertEqual(self.client.get('/old-ooty/')['Location'], '/ooty/')
+        self.assertEqual(self.client.get('/old-ooty/')['Location'], '/ooty-tour/')
+        
+        self.assertEqual(redirect_table.flush_hits(), 3)
+        self.exact.refresh_from_db()
+        self.assertEqual(self.exact.hit_count, 3)
+        self.assertIsNotNone(self.exact.last_hit_at)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class SEOHeadCacheTests(TestCase):
+    """Tests for the cached, pre-rendered SEO head fragment"""
+    
+    template = Template("{% load seo_tags %}<title>{% seo_head_title %}</title>{% seo_head %}")
+    
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+    
+    def render(self, path, seo=None):
+        request = self.factory.get(path)
+        return self.template.render(Context({'request': request, 'seo': seo or {}, 'site_seo': {'site_name': 'Ritham'}}))
+    
+    def test_second_render_uses_no_queries(self):
+        seo = {'title': 'Ooty Tour', 'description': 'Hills & tea gardens', 'page_type': 'tour'}
+        first = self.render('/ooty/', seo)
+        self.assertIn('<title>Ooty Tour | Ritham</title>', first)
+        self.assertIn('content="Hills &amp; tea gardens"', first)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render('/ooty/', seo), first)
+    
+    def test_query_string_shares_the_fragment(self):
+        first = self.render('/ooty/', {'title': 'Ooty Tour'})
+        self.assertIn('<link rel="canonical" href="https://rithamtravels.in/ooty/">', first)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render('/ooty/?utm_source=mail&page=2', {'title': 'Ooty Tour'}), first)
+    
+    def test_page_seo_overrides_and_config_defaults(self):
+        SEOConfig.objects.create(site_name='Ritham Travels', site_description='Config default description')
+        PageSEO.objects.create(page_path='/ooty/', page_name='Ooty', title='Ooty Override', robots='noindex, follow')
+        html = self.render('/ooty/', {'title': 'Ooty Tour', 'robots': 'index, follow'})
+        self.assertIn('<title>Ooty Override | Ritham Travels</title>', html)
+        self.assertIn('content="noindex, follow"', html)
+        self.assertIn('Config default description', self.render('/kodai/'))
+    
+    def test_invalidated_on_page_seo_save(self):
+        self.assertIn('<title>Ooty Tour | Ritham</title>', self.render('/ooty/', {'title': 'Ooty Tour'}))
+        with self.captureOnCommitCallbacks(execute=True):
+            page = PageSEO.objects.create(page_path='/ooty/', page_name='Ooty', title='Ooty Hills')
+        self.assertIn('<title>Ooty Hills | Ritham</title>', self.render('/ooty/', {'title': 'Ooty Tour'}))
+        with self.captureOnCommitCallbacks(execute=True):
+            page.delete()
+        self.assertIn('<title>Ooty Tour | Ritham</title>', self.render('/ooty/', {'title': 'Ooty Tour'}))
+
+
+class SitemapTests(TestCase):
+    """Tests for the sharded, cached sitemap and package JSON-LD"""
+    
+    def setUp(self):
+        cache.clear()
+        self.ooty = City.objects.create(name='Ooty Hills')
+        City.objects.create(name='Closed', is_active=False)
+        self.package = TourPackage.objects.create(name='Ooty Getaway', description='Two days in Ooty', days=2, price_per_vehicle=8500)
+        self.package.cities.add(self.ooty)
+        for index in range(3):
+            BlogPost.objects.create(title=f'Post {index}', slug=f'post-{index}', content='...', is_published=True)
+        BlogPost.objects.create(title='Draft', slug='draft', content='...')
+    
+    def get(self, path):
+        response = self.client.get(path)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, content.decode('utf-8')
+    
+    @override_settings(SITEMAP_SHARD_SIZE=2)
+    def test_index_lists_shards(self):
+        _, xml = self.get('/sitemap.xml')
+        self.assertIn('/sitemap-blog-1.xml', xml)
+        self.assertIn('/sitemap-blog-2.xml', xml)
+        self.assertNotIn('/sitemap-blog-3.xml', xml)
+        self.assertIn('/sitemap-pages-12.xml', xml)
+        self.assertEqual(self.client.get('/sitemap-blog-3.xml').status_code, 404)
+        
+        _, first = self.get('/sitemap-blog-1.xml')
+        _, second = self.get('/sitemap-blog-2.xml')
+        self.assertEqual(first.count('<url>') + second.count('<url>'), 3)
+        self.assertNotIn('/blog/draft/', first + second)
+        self.assertIn('<lastmod>', first)
+    
+    def test_shards_are_cached_until_rows_change(self):
+        response, xml = self.get('/sitemap-blog-1.xml')
+        self.assertTrue(response.streaming)
+        self.assertIn('https://rithamtravels.in/blog/post-0/', xml)
+        with self.assertNumQueries(0):
+            response, cached = self.get('/sitemap-blog-1.xml')
+        self.assertFalse(response.streaming)
+        self.assertEqual(cached, xml)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(title='Kodaikanal', slug='kodaikanal', content='...', is_published=True)
+        self.assertIn('/blog/kodaikanal/', self.get('/sitemap-blog-1.xml')[1])
+    
+    def test_tour_info_is_not_listed(self):
+        """The tour info page ignores its city slug, so per-city URLs would be duplicates"""
+        self.assertNotIn('tour-info', self.get('/sitemap.xml')[1])
+        self.assertEqual(self.client.get('/sitemap-tour-info-1.xml').status_code, 404)
+    
+    def test_pages_shard_builds_package_json_ld(self):
+        _, xml = self.get('/sitemap-pages-1.xml')
+        self.assertIn('https://rithamtravels.in/destinations/ooty/', xml)
+        self.assertIn('https://rithamtravels.in/tariff/local-hour/', xml)
+        with self.assertNumQueries(0):
+            data = json.loads(packages_json_ld())
+        trip = data['itemListElement'][0]['item']
+        self.assertEqual(trip['name'], 'Ooty Getaway')
+        self.assertEqual(trip['offers']['price'], '8500.00')
+        self.assertEqual(trip['itinerary']['itemListElement'][0]['item']['name'], 'Ooty Hills')
+        
+        self.package.name = 'Ooty Weekend'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.package.save()
+        self.assertIn('Ooty Weekend', packages_json_ld())
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ValidateSEOCommandTests(TestCase):
+    """Tests for the SEO crawl and render benchmark"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def run_command(self, *args, **options):
+        out = StringIO()
+        call_command('validate_seo', *args, workers=1, format='json', stdout=out, **options)
+        return json.loads(out.getvalue())
+    
+    def test_discovers_pages_from_url_conf_and_sitemaps(self):
+        BlogPost.objects.create(title='Monsoon', slug='monsoon', content='...', is_published=True)
+        urls = discover_urls()
+        self.assertIn('/destinations/ooty/', urls)
+        self.assertIn('/blog/monsoon/', urls)
+        self.assertFalse([url for url in urls if url.startswith(('/admin/', '/api/', '/logout/'))])
+    
+    def test_report_records_checks_and_timings(self):
+        report = self.run_command(url=['/privacy-policy/', '/missing-page/'], repeat=2)
+        policy, missing = report['pages']
+        self.assertIn(policy['status'], ('success', 'warning'))
+        self.assertTrue(policy['title'])
+        self.assertGreater(policy['benchmark']['bytes'], 0)
+        self.assertEqual(policy['benchmark']['status_code'], 200)
+        self.assertEqual(policy['benchmark']['page_cache'], 'MISS')
+        self.assertEqual(missing['status'], 'error')
+        self.assertEqual(report['summary']['pages'], 2)
+    
+    def test_compare_against_earlier_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'seo.json')
+            self.run_command(url=['/about-us/'], output=path)
+            report = self.run_command(url=['/about-us/'], compare=path)
+        change = report['changes'][0]
+        self.assertEqual(change['url'], '/about-us/')
+        # The second crawl is served from the full-page cache
+        self.assertLess(change['queries'], 0)
+    
+    def test_crawls_as_site_host(self):
+        with override_settings(ALLOWED_HOSTS=['rithamtravels.in']):
+            self.assertEqual(self.run_command(url=['/about-us/'])['pages'][0]['benchmark']['status_code'], 200)
+        cache.clear()
+        with override_settings(ALLOWED_HOSTS=['example.org']), self.assertRaises(CommandError):
+            self.run_command(url=['/about-us/'])
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('sitemap.xml', views.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>-<int:page>.xml', views.sitemap_section, name='sitemap_section'),
+]
@@ -1,3 +1,38 @@
-from django.shortcuts import render
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 
-# Create your views here.
+from . import sitemaps
+
+SITEMAP_CONTENT_TYPE = 'application/xml; charset=utf-8'
+
+
+def _sitemap_response(xml=None, chunks=None):
+    if xml is not None:
+        response = HttpResponse(xml, content_type=SITEMAP_CONTENT_TYPE)
+    else:
+        response = StreamingHttpResponse(chunks, content_type=SITEMAP_CONTENT_TYPE)
+    response['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
+def sitemap_index(request):
+    """Sitemap index listing every shard of every section"""
+    key = sitemaps.index_cache_key()
+    xml = cache.get(key)
+    if xml is not None:
+        return _sitemap_response(xml)
+    return _sitemap_response(chunks=sitemaps.cached_stream(sitemaps.stream_index(), key))
+
+
+def sitemap_section(request, section, page):
+    """One shard of at most SITEMAP_SHARD_SIZE URLs, streamed on a miss and cached while it is sent"""
+    sitemap = sitemaps.SECTIONS.get(section)
+    if sitemap is None:
+        raise Http404('Sitemap not found')
+    key = sitemap.cache_key(page)
+    xml = cache.get(key)
+    if xml is not None:
+        return _sitemap_response(xml)
+    if not 1 <= page <= sitemap.shards():
+        raise Http404('Sitemap not found')
+    return _sitemap_response(chunks=sitemaps.cached_stream(sitemaps.stream_shard(sitemap, page), key))
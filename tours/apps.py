@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class ToursConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tours'
+    
+    def ready(self):
+        """Import signals when the app is ready"""
+        import tours.signals
 
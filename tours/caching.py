@@ -0,0 +1,284 @@
+"""
+HTTP caching helpers for the catalog JSON APIs
+Per-model version counters kept in the shared cache, conditional GET
+support (strong ETag, Cache-Control, 304 on If-None-Match) and a response
+cache for read-only API views, both invalidated through those counters.
+"""
+
+import hashlib
+import time
+from functools import wraps
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+_tracked = set()
+
+# Views decorated with cached_api, for the hit-rate report
+_cached_views = set()
+
+
+def is_shared_cache(alias: str = 'default') -> bool:
+    """False when the cache only lives inside this process (LocMem, dummy)"""
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def model_label(model) -> str:
+    return model._meta.label_lower
+
+
+def version_key(model) -> str:
+    return f"model_version_{model_label(model)}"
+
+
+def get_model_version(model) -> int:
+    key = version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so a flushed cache never reissues an old ETag
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_model_version(model) -> None:
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        cache.set(version_key(model), int(time.time() * 1000), None)
+
+
+def _on_change(sender, **kwargs):
+    # After COMMIT: a request between the save and the commit would otherwise
+    # render the old rows under the new version and keep them as current
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(lambda: bump_model_version(sender))
+
+
+def track_models(models: Iterable) -> None:
+    """Bump a model's version on every save, delete or many-to-many change"""
+    for model in models:
+        label = model_label(model)
+        if label in _tracked:
+            continue
+        _tracked.add(label)
+        uid = f"model_version_{label}"
+        post_save.connect(_on_change, sender=model, dispatch_uid=uid, weak=False)
+        post_delete.connect(_on_change, sender=model, dispatch_uid=uid, weak=False)
+        if model._meta.auto_created:
+            m2m_changed.connect(_on_change, sender=model, dispatch_uid=uid, weak=False)
+
+
+def catalog_etag(request, models: Iterable, indexes: Iterable = ()) -> str:
+    """Strong ETag for the catalog state behind a request"""
+    versions = ','.join(
+        [f"{model_label(model)}:{get_model_version(model)}" for model in models]
+        + [f"{index.name}:{index.current_version()}" for index in indexes]
+    )
+    raw = f"{versions}|{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+    return f'"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+
+
+def _not_modified(request, etag: str) -> bool:
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    tags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in tags or etag in tags
+
+
+def _set_headers(response, etag: str, max_age: int) -> None:
+    response['ETag'] = etag
+    response['Cache-Control'] = f"public, max-age={max_age}, must-revalidate"
+
+
+def conditional_api(*models, indexes: Iterable = (), max_age: int = 0):
+    """
+    Conditional GET for function-based API views.
+
+    Apply above ``@api_view`` so a matching ``If-None-Match`` is answered
+    with 304 before DRF or the ORM run. ``models`` are the tables the
+    response is built from; ``indexes`` the in-memory indexes it reads.
+    """
+    track_models(models)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            etag = catalog_etag(request, models, indexes)
+            if _not_modified(request, etag):
+                response = HttpResponseNotModified()
+                _set_headers(response, etag, max_age)
+                return response
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                _set_headers(response, etag, max_age)
+            return response
+        return wrapped
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for DRF class-based views and viewsets.
+
+    Set ``catalog_models`` to the models the responses are built from.
+    """
+
+    catalog_models: tuple = ()
+    cache_max_age: int = 0
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        track_models(cls.catalog_models)
+        return super().as_view(*args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        etag: Optional[str] = None
+        if request.method in ('GET', 'HEAD'):
+            etag = catalog_etag(request, self.catalog_models)
+            if _not_modified(request, etag):
+                response = HttpResponseNotModified()
+                _set_headers(response, etag, self.cache_max_age)
+                return response
+        response = super().dispatch(request, *args, **kwargs)
+        if etag and response.status_code == 200:
+            _set_headers(response, etag, self.cache_max_age)
+        return response
+
+
+# ----------------------------------------------------------------------
+# Response cache
+# ----------------------------------------------------------------------
+
+STAT_NAMES = ('hits', 'misses', 'waits')
+
+
+def _record(view_name: str, stat: str) -> None:
+    key = f"api_cache_stat_{view_name}_{stat}"
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    """Hit, miss and stampede-wait counts per cached view"""
+    stats = {}
+    for view_name in sorted(_cached_views):
+        counts = cache.get_many([f"api_cache_stat_{view_name}_{stat}" for stat in STAT_NAMES])
+        row = {stat: counts.get(f"api_cache_stat_{view_name}_{stat}", 0) for stat in STAT_NAMES}
+        lookups = row['hits'] + row['misses']
+        row['hit_rate'] = round(row['hits'] / lookups, 4) if lookups else 0.0
+        stats[view_name] = row
+    return stats
+
+
+def reset_cache_stats() -> None:
+    cache.delete_many([
+        f"api_cache_stat_{view_name}_{stat}" for view_name in _cached_views for stat in STAT_NAMES
+    ])
+
+
+def response_cache_key(view_name: str, request, models: Iterable, kwargs: dict, indexes: Iterable = ()) -> str:
+    """Key on the view, its URL kwargs, normalized query params, Accept header, model and index versions"""
+    params = sorted((name, request.GET.getlist(name)) for name in request.GET)
+    versions = [get_model_version(model) for model in models] + [index.current_version() for index in indexes]
+    raw = repr((sorted(kwargs.items()), params, request.META.get('HTTP_ACCEPT', ''), versions))
+    return f"api_cache_{view_name}_{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+
+# Validator headers replayed on hits so conditional GET keeps working
+REPLAYED_HEADERS = ('ETag', 'Cache-Control')
+
+
+def _from_entry(request, entry: dict) -> HttpResponse:
+    etag = entry['headers'].get('ETag')
+    if etag and _not_modified(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry['content'], content_type=entry['content_type'], status=entry['status'])
+    for name, value in entry['headers'].items():
+        response[name] = value
+    response['X-API-Cache'] = 'HIT'
+    return response
+
+
+def cached_api(depends_on: Iterable, indexes: Iterable = (), timeout: int = 300,
+               lock_timeout: int = 10, wait: float = 2.0):
+    """
+    Cache the rendered bytes of a read-only API view.
+
+    Apply above ``@api_view``, or to a DRF view's ``dispatch``. Entries are
+    keyed on the view and normalized request parameters and include the
+    version of every model in ``depends_on``, so a save, delete or many-to-many change on any of them
+    makes old entries unreachable. Views that read an in-memory index list
+    it in ``indexes``; its version is checked on every lookup so an entry is
+    never stored under a new model version from a worker's stale index. On a miss only one request renders the
+    response; concurrent identical requests wait up to ``wait`` seconds for
+    its result instead of all hitting the database.
+    """
+    models = tuple(depends_on)
+    indexes = tuple(indexes)
+    track_models(models)
+
+    def decorator(view_func):
+        # @api_view functions carry their generated class; methods use their qualified name
+        view_class = getattr(view_func, 'view_class', None)
+        view_name = f"{view_func.__module__}.{view_class.__name__ if view_class else view_func.__qualname__}"
+        _cached_views.add(view_name)
+
+        @wraps(view_func)
+        def wrapped(*args, **kwargs):
+            # Plain views get (request, ...), dispatch methods (self, request, ...)
+            request = args[0] if hasattr(args[0], 'method') else args[1]
+            if request.method != 'GET':
+                return view_func(*args, **kwargs)
+
+            key = response_cache_key(view_name, request, models, kwargs, indexes)
+            entry = cache.get(key)
+            if entry is not None:
+                _record(view_name, 'hits')
+                return _from_entry(request, entry)
+
+            lock_key = f"{key}_lock"
+            locked = cache.add(lock_key, 1, lock_timeout)
+            if not locked:
+                # Another request is rendering the same response; wait for it
+                _record(view_name, 'waits')
+                deadline = time.monotonic() + wait
+                while time.monotonic() < deadline:
+                    time.sleep(0.025)
+                    entry = cache.get(key)
+                    if entry is not None:
+                        _record(view_name, 'hits')
+                        return _from_entry(request, entry)
+
+            _record(view_name, 'misses')
+            try:
+                response = view_func(*args, **kwargs)
+                if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                    response.render()
+                if response.status_code == 200 and not response.streaming:
+                    cache.set(key, {
+                        'content': response.content,
+                        'content_type': response['Content-Type'],
+                        'status': response.status_code,
+                        'headers': {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)},
+                    }, timeout)
+                response['X-API-Cache'] = 'MISS'
+                return response
+            finally:
+                if locked:
+                    cache.delete(lock_key)
+        return wrapped
+    return decorator
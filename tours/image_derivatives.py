@@ -0,0 +1,152 @@
+"""
+Responsive image derivatives for uploaded media
+Generates resized AVIF/WebP/JPEG copies of uploaded images at fixed widths
+under ``derivatives/`` in the media storage, records them in a small JSON
+manifest next to them and builds ``srcset`` values from that manifest.
+Generation runs in a background thread pool after the upload is committed.
+"""
+
+import hashlib
+import json
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_DIR = 'derivatives'
+
+# Widths in pixels; originals are never upscaled
+WIDTHS = (320, 640, 960, 1280, 1920)
+
+# Preferred first; AVIF needs a Pillow build with libavif (11.3+)
+FORMATS = (
+    ('avif', 'image/avif', {'quality': 55}),
+    ('webp', 'image/webp', {'quality': 78, 'method': 4}),
+    ('jpeg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def supported_formats() -> List[str]:
+    return [fmt for fmt, _, _ in FORMATS if fmt == 'jpeg' or features.check(fmt)]
+
+
+def _base(name: str) -> str:
+    stem, _ = posixpath.splitext(name)
+    return posixpath.join(DERIVATIVES_DIR, stem)
+
+
+def derivative_name(name: str, width: int, fmt: str) -> str:
+    return f"{_base(name)}.{width}w.{EXTENSIONS[fmt]}"
+
+
+def manifest_name(name: str) -> str:
+    return f"{_base(name)}.json"
+
+
+def _manifest_key(name: str) -> str:
+    return f"image_derivatives_{hashlib.md5(name.encode('utf-8')).hexdigest()}"
+
+
+def _save(path: str, content: bytes) -> None:
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(content))
+
+
+def generate(name: str) -> Dict[str, Any]:
+    """Write every derivative of the stored image ``name`` and its manifest"""
+    with default_storage.open(name, 'rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    # Flatten transparency onto white for JPEG; keep alpha for WebP/AVIF
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    widths = [width for width in WIDTHS if width < image.width] or [image.width]
+    formats = supported_formats()
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        for fmt, _, options in FORMATS:
+            if fmt not in formats:
+                continue
+            frame = resized
+            if fmt == 'jpeg' and has_alpha:
+                frame = Image.new('RGB', resized.size, 'white')
+                frame.paste(resized, mask=resized.getchannel('A'))
+            buffer = BytesIO()
+            frame.save(buffer, format=fmt.upper(), **options)
+            _save(derivative_name(name, width, fmt), buffer.getvalue())
+
+    manifest = {'name': name, 'width': image.width, 'widths': widths, 'formats': formats}
+    _save(manifest_name(name), json.dumps(manifest).encode('utf-8'))
+    cache.set(_manifest_key(name), manifest, None)
+    logger.info(f"Generated {len(widths) * len(formats)} derivatives for {name}")
+    return manifest
+
+
+def get_manifest(name: str) -> Optional[Dict[str, Any]]:
+    """Derivatives recorded for ``name``, or None until they are generated"""
+    if not name:
+        return None
+    key = _manifest_key(name)
+    manifest = cache.get(key)
+    if manifest is None:
+        try:
+            with default_storage.open(manifest_name(name), 'rb') as f:
+                manifest = json.loads(f.read())
+        except (OSError, ValueError):
+            # Remember the miss briefly so pages don't stat the storage on every render
+            cache.set(key, {}, 300)
+            return None
+        cache.set(key, manifest, None)
+    return manifest or None
+
+
+def forget(name: str) -> None:
+    """Drop the cached manifest (or remembered miss) for ``name``"""
+    cache.delete(_manifest_key(name))
+
+
+def srcset(name: str, fmt: str) -> str:
+    manifest = get_manifest(name)
+    if not manifest or fmt not in manifest['formats']:
+        return ''
+    return ', '.join(
+        f"{default_storage.url(derivative_name(name, width, fmt))} {width}w" for width in manifest['widths']
+    )
+
+
+def _run(name: str) -> None:
+    try:
+        generate(name)
+    except Exception as e:
+        logger.error(f"Failed to generate derivatives for {name}: {str(e)}")
+
+
+def schedule(name: str) -> None:
+    """Generate derivatives in the background worker pool (inline when disabled)"""
+    global _executor
+    forget(name)
+    if not getattr(settings, 'IMAGE_DERIVATIVES_BACKGROUND', True):
+        _run(name)
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-derivatives')
+    _executor.submit(_run, name)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import get_resolver
+
+from tours.caching import cache_stats, is_shared_cache, reset_cache_stats
+from tours.single_flight import single_flight_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit rates of the cached read-only API views and request coalescing counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        if not is_shared_cache():
+            # The counters are kept by the web workers; this process would only see zeros
+            raise CommandError('Cache statistics live in the web workers; configure a shared cache (REDIS_URL)')
+
+        # Importing the URLconf imports every view module, registering its cached views
+        get_resolver().url_patterns
+
+        stats = cache_stats()
+        self.stdout.write(self.style.SUCCESS('API response cache statistics'))
+        self.stdout.write(f"{'view':<55} {'hits':>8} {'misses':>8} {'waits':>7} {'hit rate':>9}")
+        for view_name, row in stats.items():
+            self.stdout.write(
+                f"{view_name:<55} {row['hits']:>8} {row['misses']:>8} {row['waits']:>7} {row['hit_rate']:>9.1%}"
+            )
+
+        # Coalescing counters are per worker; this process only sees its own
+        flights = single_flight_stats()
+        if flights:
+            self.stdout.write(self.style.SUCCESS('\nRequest coalescing (this process)'))
+            self.stdout.write(f"{'view':<55} {'leaders':>8} {'shared':>8} {'timeouts':>9} {'errors':>7}")
+            for view_name, row in flights.items():
+                self.stdout.write(
+                    f"{view_name:<55} {row['leaders']:>8} {row['followers']:>8} {row['timeouts']:>9} {row['errors']:>7}"
+                )
+
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.WARNING('\nCounters reset'))
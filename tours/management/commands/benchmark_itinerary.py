@@ -0,0 +1,71 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from tours.services.itinerary import ItineraryOptimizer
+from tours.utils import haversine_distance
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the multicity itinerary optimizer on synthetic South India trips'
+
+    # Rough bounding box of the cities we serve (lat, lon)
+    LAT_RANGE = (8.0, 13.2)
+    LON_RANGE = (75.5, 80.3)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stops', type=int, nargs='+', default=[4, 8, 10, 12, 15, 20],
+                            help='Stop counts to benchmark')
+        parser.add_argument('--runs', type=int, default=20, help='Random trips per stop count')
+        parser.add_argument('--budget-ms', type=float, default=50.0, help='Latency budget per trip')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--one-way', action='store_true', help='Do not return to the pickup city')
+
+    def handle(self, *args, **options):
+        optimizer = ItineraryOptimizer()
+        rng = random.Random(options['seed'])
+        return_to_start = not options['one_way']
+        budget = options['budget_ms']
+        over_budget = False
+
+        self.stdout.write(self.style.SUCCESS('Benchmarking itinerary optimizer...'))
+        self.stdout.write(f"{'stops':>6} {'method':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'gap %':>7}")
+
+        for stops in options['stops']:
+            timings, gaps, method = [], [], ''
+            for _ in range(options['runs']):
+                points = [
+                    (rng.uniform(*self.LAT_RANGE), rng.uniform(*self.LON_RANGE))
+                    for _ in range(stops + 1)
+                ]
+                dist = [[haversine_distance(*a, *b) for b in points] for a in points]
+
+                started = time.perf_counter()
+                result = optimizer.solve(dist, return_to_start)
+                timings.append((time.perf_counter() - started) * 1000)
+                method = result['method']
+
+                # Compare the heuristic against the exact optimum where that is affordable
+                if method == 'heuristic' and stops <= 15:
+                    exact = optimizer._held_karp(dist, return_to_start)
+                    best = optimizer.route_length(dist, exact, return_to_start)
+                    found = optimizer.route_length(dist, result['order'], return_to_start)
+                    gaps.append((found - best) / best * 100 if best else 0.0)
+
+            timings.sort()
+            p50 = statistics.median(timings)
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            gap = f"{statistics.mean(gaps):.2f}" if gaps else '-'
+            line = f"{stops:>6} {method:>10} {p50:>8.2f} {p95:>8.2f} {timings[-1]:>8.2f} {gap:>7}"
+            if p95 > budget:
+                over_budget = True
+                self.stdout.write(self.style.WARNING(line + '  over budget'))
+            else:
+                self.stdout.write(line)
+
+        if over_budget:
+            self.stdout.write(self.style.WARNING(f'\nSome stop counts exceeded the {budget:.0f} ms budget'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'\nAll stop counts within the {budget:.0f} ms budget'))
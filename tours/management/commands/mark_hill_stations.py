@@ -1,10 +1,13 @@
 from django.core.management.base import BaseCommand
 from tours.models import City
+from tours.services.catalog_bundle import catalog_bundle
 
 
 class Command(BaseCommand):
     help = 'Mark cities as hill stations and set their charges'
 
+    # One catalog bundle publish for the whole run, not one per saved row
+    @catalog_bundle.batch()
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Marking hill stations...'))
         
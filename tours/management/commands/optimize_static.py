@@ -0,0 +1,168 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from PIL import Image
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+TEXT_EXTENSIONS = {'.js', '.css'}
+
+
+def _replace_if_smaller(path: Path, content: bytes, size: int) -> int:
+    if len(content) >= size:
+        return size
+    path.write_bytes(content)
+    return len(content)
+
+
+def _optimize_png(path: Path, size: int) -> int:
+    with Image.open(path) as image:
+        image.load()
+        buffer = BytesIO()
+        # Lossless: same pixels, transparency and colour profile with better deflate settings
+        image.save(buffer, format='PNG', optimize=True)
+    return _replace_if_smaller(path, buffer.getvalue(), size)
+
+
+def _optimize_jpeg(path: Path, size: int) -> int:
+    # Only jpegtran re-encodes JPEG without touching the pixels; skip when it is missing
+    jpegtran = shutil.which('jpegtran')
+    if not jpegtran:
+        return size
+    with tempfile.NamedTemporaryFile(suffix='.jpg') as out:
+        result = subprocess.run(
+            [jpegtran, '-copy', 'none', '-optimize', '-progressive', '-outfile', out.name, str(path)],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            return size
+        return _replace_if_smaller(path, Path(out.name).read_bytes(), size)
+
+
+def _write_webp(path: Path, quality: int) -> int:
+    """Write ``<name>.<ext>.webp`` when it is smaller than the original"""
+    target = path.with_name(f"{path.name}.webp")
+    if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+        return target.stat().st_size
+    with Image.open(path) as image:
+        image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+        buffer = BytesIO()
+        image.save(buffer, format='WEBP', quality=quality, method=6)
+    if len(buffer.getvalue()) >= path.stat().st_size:
+        target.unlink(missing_ok=True)
+        return 0
+    target.write_bytes(buffer.getvalue())
+    return len(buffer.getvalue())
+
+
+def _minify(path: Path, size: int) -> int:
+    if path.name.endswith(('.min.js', '.min.css')):
+        return size
+    minifier = rjsmin.jsmin if path.suffix == '.js' and rjsmin else None
+    if path.suffix == '.css' and rcssmin:
+        minifier = rcssmin.cssmin
+    if minifier is None:
+        return size
+    text = path.read_text(encoding='utf-8')
+    return _replace_if_smaller(path, minifier(text).encode('utf-8'), size)
+
+
+def optimize_file(path: str, webp: bool, webp_quality: int):
+    """Optimize one file in a worker process; returns (path, before, after, webp bytes, error)"""
+    path = Path(path)
+    before = path.stat().st_size
+    try:
+        suffix = path.suffix.lower()
+        webp_size = 0
+        if suffix == '.png':
+            after = _optimize_png(path, before)
+        elif suffix in ('.jpg', '.jpeg'):
+            after = _optimize_jpeg(path, before)
+        else:
+            after = _minify(path, before)
+        if webp and suffix in IMAGE_EXTENSIONS:
+            webp_size = _write_webp(path, webp_quality)
+        return str(path), before, after, webp_size, None
+    except Exception as e:
+        return str(path), before, before, 0, str(e)
+
+
+class Command(BaseCommand):
+    help = (
+        'Optimize the static source tree before collectstatic: lossless image re-encoding, '
+        'WebP siblings and JS/CSS minification, in parallel. Files are rewritten in place, '
+        'so run it in the deploy build rather than on a working checkout.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+        parser.add_argument('--no-webp', action='store_true', help='Do not write .webp siblings')
+        parser.add_argument('--webp-quality', type=int, default=80)
+
+    def handle(self, *args, **options):
+        files = []
+        for directory in settings.STATICFILES_DIRS:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    suffix = Path(name).suffix.lower()
+                    if suffix in IMAGE_EXTENSIONS or suffix in TEXT_EXTENSIONS:
+                        files.append(os.path.join(root, name))
+        roots = [str(directory) for directory in settings.STATICFILES_DIRS]
+
+        self.stdout.write(self.style.SUCCESS(f'Optimizing {len(files)} static files...'))
+        if not shutil.which('jpegtran'):
+            self.stdout.write(self.style.WARNING('  jpegtran not found: JPEGs are left as they are'))
+        if rjsmin is None or rcssmin is None:
+            self.stdout.write(self.style.WARNING('  rjsmin/rcssmin not installed: JS/CSS are not minified'))
+
+        total_before = total_after = total_webp = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            results = pool.map(
+                optimize_file, sorted(files),
+                [not options['no_webp']] * len(files), [options['webp_quality']] * len(files),
+            )
+            for path, before, after, webp_size, error in results:
+                name = os.path.relpath(path, next(root for root in roots if path.startswith(root)))
+                total_before += before
+                total_after += after
+                if error:
+                    self.stdout.write(self.style.ERROR(f'  ✗ {name}: {error}'))
+                    continue
+                saved = before - after
+                line = f'  {name:<55} {before:>10,} → {after:>10,} bytes ({saved / before * 100 if before else 0:4.1f}% saved)'
+                if webp_size:
+                    total_webp += webp_size
+                    line += f', webp {webp_size:,}'
+                self.stdout.write(line)
+
+        saved = total_before - total_after
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSaved {saved:,} of {total_before:,} bytes ({saved / total_before * 100 if total_before else 0:.1f}%); '
+            f'WebP siblings total {total_webp:,} bytes'
+        ))
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('Brotli is not installed: collectstatic will only write .gz files'))
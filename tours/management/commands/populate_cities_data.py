@@ -1,10 +1,13 @@
 from django.core.management.base import BaseCommand
 from tours.models import City, LocalArea
+from tours.services.catalog_bundle import catalog_bundle
 
 
 class Command(BaseCommand):
     help = 'Populate cities with comprehensive data including local areas and sightseeing information'
 
+    # One catalog bundle publish for the whole run, not one per saved row
+    @catalog_bundle.batch()
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting cities data population...'))
         
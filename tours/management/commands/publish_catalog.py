@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from tours.services.catalog_bundle import catalog_bundle
+
+
+class Command(BaseCommand):
+    help = 'Publish the public booking catalog as a content-hashed JSON bundle under STATIC_ROOT'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Publishing catalog bundle...'))
+        current = catalog_bundle.publish()
+        self.stdout.write(f"  Hash: {current['hash']}")
+        self.stdout.write(f"  URL:  {current['url']}")
+        self.stdout.write(f"  Size: {current['size']} bytes")
+        self.stdout.write(self.style.SUCCESS('\nCatalog bundle published'))
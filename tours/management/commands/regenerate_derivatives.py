@@ -0,0 +1,60 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from enquiries.models import Promotion, Testimonial
+from tours import image_derivatives
+from tours.models import City, SightseeingSpot, TourPackage
+from vehicles.models import Vehicle
+
+IMAGE_MODELS = (Vehicle, City, SightseeingSpot, TourPackage, Testimonial, Promotion)
+
+
+def _generate(name):
+    # Runs in a worker process; only touches the media storage
+    try:
+        return name, image_derivatives.generate(name), None
+    except Exception as e:
+        return name, None, str(e)
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive image derivatives for existing uploads using a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+        parser.add_argument('--force', action='store_true', help='Regenerate images that already have derivatives')
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in IMAGE_MODELS:
+            names.update(
+                name for name in model.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True)
+            )
+        if not options['force']:
+            names = {name for name in names if image_derivatives.get_manifest(name) is None}
+
+        if not names:
+            self.stdout.write(self.style.SUCCESS('All images already have derivatives'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Generating derivatives for {len(names)} images...'))
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+
+        done, failed = 0, 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [pool.submit(_generate, name) for name in sorted(names)]
+            for future in as_completed(futures):
+                name, manifest, error = future.result()
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'  ✗ {name}: {error}'))
+                    continue
+                done += 1
+                # Workers have their own cache; drop any remembered miss in this process
+                image_derivatives.forget(name)
+                self.stdout.write(f"  ✓ {name} ({len(manifest['widths'])} widths, {', '.join(manifest['formats'])})")
+
+        self.stdout.write(self.style.SUCCESS(f'\nDerivatives generated for {done} images, {failed} failed'))
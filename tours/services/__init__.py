@@ -0,0 +1,36 @@
+"""
+Services package for tours
+Contains in-memory location indexes used by the trip planner APIs
+and cached page fragments
+"""
+
+from .gazetteer import gazetteer, Gazetteer
+from .road_graph import road_graph, RoadGraph
+from .itinerary import itinerary_optimizer, ItineraryOptimizer
+from .spatial_index import spatial_index, SpatialIndex
+from .autocomplete import location_autocomplete, LocationAutocomplete
+from .catalog import package_catalog, PackageCatalog
+from .sightseeing import sightseeing_catalog, SightseeingCatalog
+from .sidebar import tariff_sidebar, SidebarFragment
+from .catalog_bundle import catalog_bundle, CatalogBundle
+
+__all__ = [
+    'gazetteer',
+    'Gazetteer',
+    'road_graph',
+    'RoadGraph',
+    'itinerary_optimizer',
+    'ItineraryOptimizer',
+    'spatial_index',
+    'SpatialIndex',
+    'location_autocomplete',
+    'LocationAutocomplete',
+    'package_catalog',
+    'PackageCatalog',
+    'sightseeing_catalog',
+    'SightseeingCatalog',
+    'tariff_sidebar',
+    'SidebarFragment',
+    'catalog_bundle',
+    'CatalogBundle',
+]
@@ -0,0 +1,138 @@
+"""
+Location Autocomplete Service
+Sorted-array prefix index over city, local area and sightseeing spot names,
+ranked by how often each location appears in bookings.
+"""
+
+import heapq
+import logging
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .base import InMemoryIndex
+from .gazetteer import normalize
+
+logger = logging.getLogger(__name__)
+
+# Cities rank above areas, areas above spots when popularity is equal
+TYPE_RANK = {'city': 0, 'area': 1, 'spot': 2}
+
+# Prefixes this short match so many names that their answers are precomputed
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+
+class LocationAutocomplete(InMemoryIndex):
+    """Prefix search over every named location a customer can pick"""
+
+    name = 'autocomplete'
+    # Booking counts drift slowly; refresh them hourly without any signal
+    max_age = 3600.0
+
+    DEFAULT_LIMIT = 10
+
+    def _booking_counts(self) -> Counter:
+        """Count bookings per normalized location name (pickup city and multicity stops)"""
+        from django.db.models import Count
+        from bookings.models import Booking, BookingRoute
+
+        counts = Counter()
+        for row in Booking.objects.values('pickup_city').annotate(total=Count('id')):
+            counts[normalize(row['pickup_city'])] += row['total']
+        for row in BookingRoute.objects.values('to_location').annotate(total=Count('id')):
+            counts[normalize(row['to_location'])] += row['total']
+        return counts
+
+    def build(self) -> Dict[str, Any]:
+        from tours.models import City, LocalArea, SightseeingSpot
+
+        counts = self._booking_counts()
+        entries: List[Dict[str, Any]] = []
+        cities = {}
+        for city in City.objects.filter(is_active=True).only('id', 'name'):
+            cities[city.id] = city.name
+            entries.append({
+                'type': 'city', 'value': f"city_{city.id}", 'id': city.id, 'name': city.name,
+                'city_id': city.id, 'city_name': city.name,
+                'bookings': counts.get(normalize(city.name), 0),
+            })
+        for area in LocalArea.objects.filter(city_id__in=cities.keys()).only('id', 'name', 'city_id'):
+            city_name = cities[area.city_id]
+            entries.append({
+                'type': 'area', 'value': f"area_{area.id}", 'id': area.id, 'name': area.name,
+                'city_id': area.city_id, 'city_name': city_name,
+                'bookings': counts.get(normalize(f"{city_name} - {area.name}"), 0),
+            })
+        for spot in SightseeingSpot.objects.filter(city_id__in=cities.keys()).only('id', 'name', 'city_id'):
+            entries.append({
+                'type': 'spot', 'value': f"spot_{spot.id}", 'id': spot.id, 'name': spot.name,
+                'city_id': spot.city_id, 'city_name': cities[spot.city_id],
+                'bookings': 0,
+            })
+
+        # Static rank per entry: most booked first, then cities, then by name
+        ranked = sorted(
+            range(len(entries)),
+            key=lambda i: (-entries[i]['bookings'], TYPE_RANK[entries[i]['type']], entries[i]['name'].lower())
+        )
+        rank = [0] * len(entries)
+        for position, index in enumerate(ranked):
+            rank[index] = position
+
+        # One key per word start, so "puram" finds "RS Puram". Matches on the
+        # start of the name rank ahead of inner-word matches, then by popularity.
+        keys = []
+        for index, entry in enumerate(entries):
+            words = normalize(entry['name']).split()
+            for position in range(len(words)):
+                keys.append((' '.join(words[position:]), 1 if position else 0, rank[index], index))
+        keys.sort()
+        terms = [key[0] for key in keys]
+
+        state = {'entries': entries, 'keys': keys, 'terms': terms, 'short': {}}
+        short = {}
+        for term in terms:
+            for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+                prefix = term[:length]
+                if len(prefix) == length and prefix not in short:
+                    short[prefix] = self._scan(state, prefix, self.DEFAULT_LIMIT * 5)
+        state['short'] = short
+        logger.info(f"Autocomplete indexed {len(entries)} locations under {len(keys)} keys")
+        return state
+
+    @staticmethod
+    def _scan(state: Dict[str, Any], prefix: str, limit: int,
+              location_type: Optional[str] = None) -> List[int]:
+        """Entry indexes whose names have a word starting with ``prefix``, best first"""
+        keys, terms, entries = state['keys'], state['terms'], state['entries']
+        start = bisect_left(terms, prefix)
+        best: Dict[int, tuple] = {}
+        for i in range(start, len(terms)):
+            if not terms[i].startswith(prefix):
+                break
+            _, inner, rank, index = keys[i]
+            if location_type and entries[index]['type'] != location_type:
+                continue
+            order = (inner, rank)
+            if index not in best or order < best[index]:
+                best[index] = order
+        return [index for _, index in heapq.nsmallest(limit, ((order, index) for index, order in best.items()))]
+
+    def search(self, query: str, limit: Optional[int] = None,
+               location_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top matches for a typed prefix, optionally limited to one location type"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        limit = limit or self.DEFAULT_LIMIT
+        state = self.state
+
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH and not location_type and limit <= self.DEFAULT_LIMIT * 5:
+            indexes = state['short'].get(prefix, [])[:limit]
+        else:
+            indexes = self._scan(state, prefix, limit, location_type)
+        return [dict(state['entries'][index]) for index in indexes]
+
+
+# Global service instance
+location_autocomplete = LocationAutocomplete()
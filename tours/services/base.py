@@ -0,0 +1,117 @@
+"""
+Base class for in-process lookup indexes built from tour data
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryIndex:
+    """
+    Lazily built, per-process index over database rows.
+
+    Subclasses implement ``build()`` and read their data through ``state``.
+    ``invalidate()`` bumps a version counter in the shared cache so that other
+    worker processes notice the change on their next version check, which
+    happens at most once every ``check_interval`` seconds.
+    """
+
+    name = 'index'
+    check_interval = 5.0
+    # Rebuild after this many seconds even without invalidation (None = never)
+    max_age: Optional[float] = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+        self._version = None
+        self._checked_at = 0.0
+        self._built_at = 0.0
+
+    @property
+    def version_key(self) -> str:
+        return f"tours_index_version_{self.name}"
+
+    def build(self) -> Any:
+        """Build and return the index state from the database"""
+        raise NotImplementedError
+
+    def _shared_version(self) -> int:
+        version = cache.get(self.version_key)
+        if version is None:
+            version = 1
+            cache.add(self.version_key, version, None)
+        return version
+
+    @property
+    def state(self) -> Any:
+        """Return the current index state, rebuilding it when stale"""
+        now = time.monotonic()
+        if self._state is not None and now - self._checked_at < self.check_interval:
+            return self._state
+
+        version = self._shared_version()
+        self._checked_at = now
+        expired = self.max_age is not None and now - self._built_at > self.max_age
+        if self._state is not None and version == self._version and not expired:
+            return self._state
+
+        with self._lock:
+            if self._state is None or version != self._version or expired:
+                started = time.perf_counter()
+                self._state = self.build()
+                self._version = version
+                self._built_at = time.monotonic()
+                logger.info(
+                    f"Built {self.name} index (version {version}) in "
+                    f"{(time.perf_counter() - started) * 1000:.1f} ms"
+                )
+        return self._state
+
+    @property
+    def version(self) -> int:
+        """Version of the current state, usable in cache keys and ETags"""
+        self.state
+        return self._version
+
+    def current_version(self) -> int:
+        """Version after checking the shared counter now rather than at the next interval"""
+        self._checked_at = 0.0
+        return self.version
+
+    def _bump_version(self) -> int:
+        try:
+            return cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 2, None)
+            return 2
+
+    def invalidate(self, rebuild: bool = False) -> None:
+        """Mark the index stale in this process and in all other workers"""
+        self._bump_version()
+        with self._lock:
+            self._state = None
+            self._version = None
+            self._checked_at = 0.0
+        if rebuild:
+            self.state
+
+    def publish(self, state: Any) -> None:
+        """
+        Install an incrementally updated state in this process and mark
+        other workers stale so they rebuild from the database
+        """
+        with self._lock:
+            self._version = self._bump_version()
+            self._state = state
+            self._checked_at = time.monotonic()
+
+    def peek(self) -> Optional[Any]:
+        """Return the built state without triggering a rebuild"""
+        return self._state
@@ -0,0 +1,157 @@
+"""
+Tour Package Catalog Service
+In-memory snapshot of active tour packages with facet indexes by days,
+city, pickup city and price band, so package listings never touch the DB.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from .base import InMemoryIndex
+
+logger = logging.getLogger(__name__)
+
+# (key, label, min inclusive, max exclusive) on price_per_vehicle
+PRICE_BANDS = (
+    ('budget', 'Under ₹10,000', 0, 10000),
+    ('standard', '₹10,000 - ₹25,000', 10000, 25000),
+    ('premium', '₹25,000 - ₹50,000', 25000, 50000),
+    ('luxury', '₹50,000 and above', 50000, None),
+)
+
+
+def price_band(price: Optional[float]) -> Optional[str]:
+    if price is None:
+        return None
+    for key, _, low, high in PRICE_BANDS:
+        if price >= low and (high is None or price < high):
+            return key
+    return None
+
+
+class PackageCatalog(InMemoryIndex):
+    """Faceted catalog of active tour packages"""
+
+    name = 'package_catalog'
+
+    def build(self) -> Dict[str, Any]:
+        from tours.models import TourPackage
+
+        packages = TourPackage.objects.filter(is_active=True).select_related('pickup_city').prefetch_related('cities')
+
+        items: Dict[int, Dict[str, Any]] = {}
+        order: List[int] = []
+        facets: Dict[str, Dict[Any, set]] = {'days': {}, 'city': {}, 'pickup_city': {}, 'price_band': {}}
+        city_names: Dict[int, str] = {}
+
+        for package in packages:
+            cities = sorted(package.cities.all(), key=lambda city: city.name)
+            price_per_vehicle = float(package.price_per_vehicle) if package.price_per_vehicle else None
+            band = price_band(price_per_vehicle)
+            items[package.id] = {
+                'id': package.id,
+                'name': package.name,
+                'description': package.description,
+                'image': package.image.url if package.image else None,
+                'days': package.days,
+                'nights': package.nights,
+                'duration_display': package.duration_display,
+                'price_per_person': float(package.price_per_person) if package.price_per_person else None,
+                'price_per_vehicle': price_per_vehicle,
+                'price_band': band,
+                'vehicle_type': package.vehicle_type,
+                'include_hotel': package.include_hotel,
+                'pickup_city': {'id': package.pickup_city.id, 'name': package.pickup_city.name} if package.pickup_city else None,
+                'cities': [city.name for city in cities],
+                'city_ids': [city.id for city in cities],
+            }
+            order.append(package.id)
+
+            facets['days'].setdefault(package.days, set()).add(package.id)
+            if band:
+                facets['price_band'].setdefault(band, set()).add(package.id)
+            if package.pickup_city:
+                facets['pickup_city'].setdefault(package.pickup_city.id, set()).add(package.id)
+                city_names[package.pickup_city.id] = package.pickup_city.name
+            for city in cities:
+                facets['city'].setdefault(city.id, set()).add(package.id)
+                city_names[city.id] = city.name
+
+        logger.info(f"Package catalog built with {len(items)} packages")
+        return {'items': items, 'order': order, 'facets': facets, 'city_names': city_names}
+
+    def search(self, days: Optional[Iterable[int]] = None, city_ids: Optional[Iterable[int]] = None,
+               pickup_city_id: Optional[int] = None, price_bands: Optional[Iterable[str]] = None,
+               min_price: Optional[float] = None, max_price: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Filter packages by any combination of facets.
+
+        Values within one facet are OR-ed (days=2 or 3); different facets are
+        AND-ed. Several city IDs match packages covering all of them.
+        Facet counts describe the filtered result.
+        """
+        state = self.state
+        items, facets = state['items'], state['facets']
+
+        def union(facet: str, values: Iterable) -> set:
+            matched = set()
+            for value in values:
+                matched |= facets[facet].get(value, set())
+            return matched
+
+        selected: Optional[set] = None
+
+        def narrow(ids: set) -> None:
+            nonlocal selected
+            selected = ids if selected is None else selected & ids
+
+        if days:
+            narrow(union('days', days))
+        if price_bands:
+            narrow(union('price_band', price_bands))
+        if pickup_city_id is not None:
+            narrow(facets['pickup_city'].get(pickup_city_id, set()))
+        for city_id in city_ids or ():
+            narrow(facets['city'].get(city_id, set()))
+
+        results = []
+        for package_id in state['order']:
+            if selected is not None and package_id not in selected:
+                continue
+            item = items[package_id]
+            price = item['price_per_vehicle']
+            if min_price is not None and (price is None or price < min_price):
+                continue
+            if max_price is not None and (price is None or price > max_price):
+                continue
+            results.append(item)
+
+        return {'packages': results, 'facets': self._facet_counts(state, results)}
+
+    @staticmethod
+    def _facet_counts(state: Dict[str, Any], results: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        days, cities, bands = {}, {}, {}
+        for item in results:
+            days[item['days']] = days.get(item['days'], 0) + 1
+            for city_id in item['city_ids']:
+                cities[city_id] = cities.get(city_id, 0) + 1
+            if item['price_band']:
+                bands[item['price_band']] = bands.get(item['price_band'], 0) + 1
+        return {
+            'days': [{'value': value, 'count': count} for value, count in sorted(days.items())],
+            'cities': sorted(
+                ({'id': city_id, 'name': state['city_names'][city_id], 'count': count} for city_id, count in cities.items()),
+                key=lambda facet: (-facet['count'], facet['name'])
+            ),
+            'price_bands': [
+                {'value': key, 'label': label, 'count': bands[key]}
+                for key, label, _, _ in PRICE_BANDS if key in bands
+            ],
+        }
+
+    def get(self, package_id: int) -> Optional[Dict[str, Any]]:
+        return self.state['items'].get(package_id)
+
+
+# Global service instance
+package_catalog = PackageCatalog()
@@ -0,0 +1,171 @@
+"""
+Catalog Bundle Service
+Publishes the public booking catalog (cities, local areas, vehicles and tour
+packages) as one content-hashed JSON file under STATIC_ROOT, so the booking
+widget loads it with a single immutable, CDN-cacheable request.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .catalog import package_catalog
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_DIR = 'catalog'
+BUNDLE_NAME = re.compile(r'^catalog\.([0-9a-f]{12})\.json$')
+POINTER_NAME = 'current.json'
+
+
+class CatalogBundle:
+    """Builds, writes and locates the hashed catalog JSON bundle"""
+
+    # Older bundles kept for pages rendered before the last publish
+    KEEP = 5
+
+    # Pointer last read by this process, with the file identity it was read from
+    _current: Optional[tuple] = None
+
+    # Nesting depth of batch() blocks and whether a publish was requested inside them
+    _batch_depth = 0
+    _stale = False
+
+    @property
+    def directory(self) -> Path:
+        return Path(settings.STATIC_ROOT) / BUNDLE_DIR
+
+    def build(self) -> Dict[str, Any]:
+        from tours.models import City, LocalArea
+        from vehicles.models import Vehicle
+
+        cities = list(City.objects.filter(is_active=True).order_by('name').values('id', 'name'))
+        local_areas: Dict[str, list] = {}
+        areas = LocalArea.objects.filter(city__is_active=True).order_by('name').values('id', 'name', 'city_id')
+        for area in areas:
+            local_areas.setdefault(str(area.pop('city_id')), []).append(area)
+
+        vehicles = []
+        for vehicle in Vehicle.objects.filter(is_available=True, is_active=True).order_by('fare_per_km'):
+            vehicles.append({
+                'id': vehicle.id,
+                'name': vehicle.name,
+                'image': vehicle.image.url if vehicle.image else None,
+                'max_seats': vehicle.max_seats,
+                'luggage_capacity': vehicle.luggage_capacity,
+                'fuel_type': vehicle.fuel_type,
+                'ac_type': vehicle.ac_type,
+                'fare_per_km': float(vehicle.fare_per_km),
+                'driver_charge_per_day': float(vehicle.driver_charge_per_day),
+                'per_day_fee': float(vehicle.per_day_fee),
+                'min_km_per_day': vehicle.min_km_per_day,
+            })
+
+        return {
+            'cities': cities,
+            'local_areas': local_areas,
+            'vehicles': vehicles,
+            'packages': package_catalog.search()['packages'],
+        }
+
+    def publish(self) -> Dict[str, Any]:
+        """Write the bundle if its content changed and make it current"""
+        payload = self.build()
+        content = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        filename = f"catalog.{digest}.json"
+
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / filename
+        if not path.exists():
+            path.write_bytes(content)
+            # WhiteNoise serves the precompressed copy to gzip-capable clients
+            (directory / f"{filename}.gz").write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+
+        current = {
+            'hash': digest,
+            'url': f"{settings.STATIC_URL}{BUNDLE_DIR}/{filename}",
+            'published_at': timezone.now().isoformat(),
+            'size': len(content),
+        }
+        # Replaced atomically so other processes never read a partial pointer
+        pointer = directory / f"{POINTER_NAME}.tmp"
+        pointer.write_text(json.dumps(current))
+        os.replace(pointer, directory / POINTER_NAME)
+        self._prune(keep=filename)
+        logger.info(f"Published catalog bundle {filename} ({len(content)} bytes)")
+        return current
+
+    def publish_soon(self) -> None:
+        """Publish now, or once when the enclosing ``batch()`` ends"""
+        if self._batch_depth:
+            self._stale = True
+        else:
+            self.publish()
+
+    @contextmanager
+    def batch(self):
+        """Coalesce the publishes of many catalog saves (data loading commands) into one"""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth and self._stale:
+            self._stale = False
+            self.publish()
+
+    def _prune(self, keep: str) -> None:
+        bundles = sorted(
+            (path for path in self.directory.iterdir() if BUNDLE_NAME.match(path.name) and path.name != keep),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for path in bundles[self.KEEP - 1:]:
+            path.unlink(missing_ok=True)
+            Path(f"{path}.gz").unlink(missing_ok=True)
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """
+        The published bundle (hash and URL), or None when nothing is published.
+        Re-read whenever current.json was replaced, so a publish from any
+        process (build step, shell, another worker) is picked up at once.
+        """
+        pointer = self.directory / POINTER_NAME
+        try:
+            stat = pointer.stat()
+        except OSError:
+            return None
+        identity = (str(pointer), stat.st_ino, stat.st_mtime_ns)
+        if self._current is None or self._current[0] != identity:
+            try:
+                self._current = (identity, json.loads(pointer.read_text()))
+            except (OSError, ValueError):
+                return None
+        return self._current[1]
+
+    def current_url(self) -> Optional[str]:
+        current = self.current()
+        return current['url'] if current else None
+
+    def file_path(self, filename: str) -> Optional[Path]:
+        """Path of a published bundle file, or None for anything else"""
+        if not BUNDLE_NAME.match(filename):
+            return None
+        path = self.directory / filename
+        return path if path.exists() else None
+
+
+# Global service instance
+catalog_bundle = CatalogBundle()
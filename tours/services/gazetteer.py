@@ -0,0 +1,236 @@
+"""
+Gazetteer Service
+Resolves free-text pickup/drop addresses to known cities, local areas and
+sightseeing spots using trigram fuzzy matching, without any geocoding API.
+"""
+
+import logging
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import InMemoryIndex
+
+logger = logging.getLogger(__name__)
+
+
+# Reference coordinates (latitude, longitude) for cities we serve. Used to seed
+# City rows (see the add_city_coordinates command) and as a fallback when a row
+# has no coordinates of its own.
+KNOWN_CITY_COORDINATES = {
+    'Coimbatore': (11.0168, 76.9558),
+    'Ooty': (11.4064, 76.6932),
+    'Kodaikanal': (10.2381, 77.4892),
+    'Munnar': (10.0889, 77.0595),
+    'Yercaud': (11.7753, 78.2186),
+    'Chennai': (13.0827, 80.2707),
+    'Madurai': (9.9252, 78.1198),
+    'Mysore': (12.2958, 76.6394),
+    'Kanyakumari': (8.0883, 77.5385),
+    'Rameshwaram': (9.2876, 79.3129),
+    'Tanjore': (10.7870, 79.1378),
+    'Thanjavur': (10.7870, 79.1378),  # Same as Tanjore
+    'Ariyalur': (11.1401, 79.0747),
+    'Salem': (11.6643, 78.1460),
+    'Trichy': (10.7905, 78.7047),
+    'Tirunelveli': (8.7139, 77.7567),
+    'Coorg': (12.3375, 75.8069),  # Madikeri
+    'Wayanad': (11.6854, 76.1320),  # Kalpetta
+    'Pondicherry': (11.9416, 79.8083),
+    'Vellore': (12.9165, 79.1325),
+    'Kumbakonam': (10.9601, 79.3788),
+    'Tirupur': (11.1085, 77.3411),
+}
+
+# Used when nothing better is known - Coimbatore, our base of operations
+DEFAULT_COORDINATES = KNOWN_CITY_COORDINATES['Coimbatore']
+
+# More specific matches win ties against broader ones
+TYPE_PRIORITY = {'spot': 2, 'area': 2, 'city': 1}
+
+_non_word = re.compile(r'[^a-z0-9]+')
+_initials = re.compile(r'\b([a-z]) (?=[a-z]\b)')
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, join initials ("R.S." -> "rs")"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    text = _non_word.sub(' ', text.lower()).strip()
+    return _initials.sub(r'\1', text)
+
+
+def trigrams(text: str) -> set:
+    """Return the set of word-padded character trigrams of ``text``"""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class Gazetteer(InMemoryIndex):
+    """Trigram index over every named location we know coordinates for"""
+
+    name = 'gazetteer'
+
+    # Minimum share of a location name's trigrams that must appear in the query
+    MIN_SCORE = 0.6
+
+    def build(self) -> Dict[str, Any]:
+        from tours.models import City, LocalArea, SightseeingSpot
+
+        entries: List[Dict[str, Any]] = []
+        postings: Dict[str, List[int]] = {}
+        city_entry: Dict[int, int] = {}
+
+        known = {normalize(name): coords for name, coords in KNOWN_CITY_COORDINATES.items()}
+
+        def add(entry: Dict[str, Any]) -> int:
+            grams = trigrams(entry['name'])
+            if not grams:
+                return -1
+            index = len(entries)
+            entry['size'] = len(grams)
+            entries.append(entry)
+            for gram in grams:
+                postings.setdefault(gram, []).append(index)
+            return index
+
+        cities = {}
+        for city in City.objects.filter(is_active=True).only('id', 'name', 'latitude', 'longitude'):
+            if city.latitude is not None and city.longitude is not None:
+                coords = (float(city.latitude), float(city.longitude))
+                source = 'database'
+            else:
+                coords = known.get(normalize(city.name))
+                source = 'reference' if coords else None
+            cities[city.id] = (city.name, coords, source)
+            city_entry[city.id] = add({
+                'type': 'city',
+                'id': city.id,
+                'name': city.name,
+                'city_id': city.id,
+                'city_name': city.name,
+                'coordinates': coords,
+                'source': source,
+            })
+
+        areas = LocalArea.objects.filter(city_id__in=cities.keys()).only(
+            'id', 'name', 'city_id', 'latitude', 'longitude'
+        )
+        for area in areas:
+            city_name, city_coords, city_source = cities[area.city_id]
+            if area.latitude is not None and area.longitude is not None:
+                coords, source = (float(area.latitude), float(area.longitude)), 'database'
+            else:
+                coords, source = city_coords, city_source
+            add({
+                'type': 'area',
+                'id': area.id,
+                'name': area.name,
+                'city_id': area.city_id,
+                'city_name': city_name,
+                'coordinates': coords,
+                'source': source,
+            })
+
+        spots = SightseeingSpot.objects.filter(city_id__in=cities.keys()).only('id', 'name', 'city_id')
+        for spot in spots:
+            city_name, city_coords, city_source = cities[spot.city_id]
+            add({
+                'type': 'spot',
+                'id': spot.id,
+                'name': spot.name,
+                'city_id': spot.city_id,
+                'city_name': city_name,
+                'coordinates': city_coords,
+                'source': city_source,
+            })
+
+        logger.info(f"Gazetteer indexed {len(entries)} locations")
+        return {'entries': entries, 'postings': postings, 'city_entry': city_entry, 'known': known}
+
+    def search(self, text: str, limit: int = 5, min_score: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Rank locations whose names appear (fuzzily) inside ``text``.
+
+        The score is the share of a location name's trigrams found in the
+        query, so "12, RS Puram Main Rd, Coimbatore" scores 1.0 for both
+        "RS Puram" and "Coimbatore". A location whose parent city is also
+        mentioned gets a small boost so the area beats a same-named area
+        elsewhere.
+        """
+        query = trigrams(text)
+        if not query:
+            return []
+        state = self.state
+        entries = state['entries']
+        postings = state['postings']
+        threshold = self.MIN_SCORE if min_score is None else min_score
+
+        hits = Counter()
+        for gram in query:
+            for index in postings.get(gram, ()):
+                hits[index] += 1
+
+        scores = {index: count / entries[index]['size'] for index, count in hits.items()}
+        mentioned_cities = {
+            entries[index]['city_id']
+            for index, score in scores.items()
+            if score >= threshold and entries[index]['type'] == 'city'
+        }
+
+        ranked: List[Tuple[float, int, int, int]] = []
+        for index, score in scores.items():
+            if score < threshold:
+                continue
+            entry = entries[index]
+            boost = 0.05 if entry['type'] != 'city' and entry['city_id'] in mentioned_cities else 0.0
+            ranked.append((score + boost, TYPE_PRIORITY[entry['type']], entry['size'], index))
+        ranked.sort(reverse=True)
+
+        results = []
+        for score, _, _, index in ranked[:limit]:
+            entry = entries[index]
+            coords = entry['coordinates']
+            results.append({
+                'type': entry['type'],
+                'id': entry['id'],
+                'name': entry['name'],
+                'city_id': entry['city_id'],
+                'city_name': entry['city_name'],
+                'latitude': coords[0] if coords else None,
+                'longitude': coords[1] if coords else None,
+                'coordinates_source': entry['source'],
+                'score': round(min(score, 1.0), 3),
+            })
+        return results
+
+    def resolve(self, text: str, min_score: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the single best location for a free-text address, if any"""
+        results = self.search(text, limit=1, min_score=min_score)
+        return results[0] if results else None
+
+    def city_coordinates(self, city) -> Optional[Tuple[float, float]]:
+        """
+        Coordinates for a City row: its own, else the reference table, else
+        the best fuzzy match on its name among located cities.
+        """
+        if city.latitude is not None and city.longitude is not None:
+            return float(city.latitude), float(city.longitude)
+        state = self.state
+        coords = state['known'].get(normalize(city.name))
+        if coords:
+            return coords
+        index = state['city_entry'].get(city.id)
+        if index is not None and state['entries'][index]['coordinates']:
+            return state['entries'][index]['coordinates']
+        for match in self.search(city.name, limit=3):
+            if match['type'] == 'city' and match['latitude'] is not None:
+                return match['latitude'], match['longitude']
+        return None
+
+
+# Global service instance
+gazetteer = Gazetteer()
@@ -0,0 +1,286 @@
+"""
+Itinerary Optimizer Service
+Orders the stops of a multicity trip to minimise total driving distance.
+Uses an exact Held-Karp dynamic programme for small trips and 2-opt/Or-opt
+local search beyond that, over a distance matrix built from the road graph
+and location coordinates.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from .gazetteer import gazetteer
+from .road_graph import road_graph
+from ..utils import haversine_distance
+
+logger = logging.getLogger(__name__)
+
+INF = float('inf')
+
+
+class ItineraryOptimizer:
+    """Shortest visiting order for a pickup city plus a set of stops"""
+
+    # Largest number of stops solved exactly (O(2^n * n^2) work)
+    EXACT_LIMIT = 12
+
+    # Upper bound on local search time for larger trips
+    TIME_BUDGET = 0.04
+
+    # ------------------------------------------------------------------
+    # Locations and distances
+    # ------------------------------------------------------------------
+
+    def resolve_locations(self, values: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Resolve planner values ("city_X", "area_X" or a bare city ID) with one
+        query per model. Unknown values resolve to None.
+        """
+        from tours.models import City, LocalArea
+
+        parsed = []
+        city_ids, area_ids = set(), set()
+        for value in values:
+            value = str(value).strip()
+            kind, _, raw_id = value.rpartition('_') if '_' in value else ('city', '', value)
+            try:
+                pk = int(raw_id)
+            except ValueError:
+                parsed.append((value, None, None))
+                continue
+            if kind == 'area':
+                area_ids.add(pk)
+            else:
+                kind = 'city'
+                city_ids.add(pk)
+            parsed.append((value, kind, pk))
+
+        areas = {area.id: area for area in LocalArea.objects.filter(id__in=area_ids).select_related('city')}
+        city_ids.update(area.city_id for area in areas.values())
+        cities = {city.id: city for city in City.objects.filter(id__in=city_ids)}
+
+        locations = []
+        for value, kind, pk in parsed:
+            if kind == 'area' and pk in areas:
+                area = areas[pk]
+                if area.latitude is not None and area.longitude is not None:
+                    coords = (float(area.latitude), float(area.longitude))
+                else:
+                    coords = gazetteer.city_coordinates(area.city)
+                locations.append({
+                    'value': value,
+                    'name': f"{area.city.name} - {area.name}",
+                    'city_id': area.city_id,
+                    'coordinates': coords,
+                    'precise': area.latitude is not None and area.longitude is not None,
+                })
+            elif kind == 'city' and pk in cities:
+                city = cities[pk]
+                locations.append({
+                    'value': value,
+                    'name': city.name,
+                    'city_id': city.id,
+                    'coordinates': gazetteer.city_coordinates(city),
+                    'precise': False,
+                })
+            else:
+                locations.append(None)
+        return locations
+
+    def leg_distance(self, a: Dict[str, Any], b: Dict[str, Any]) -> float:
+        """Road distance between two resolved locations, in km"""
+        if a['city_id'] == b['city_id']:
+            if a['precise'] and b['precise']:
+                return haversine_distance(*a['coordinates'], *b['coordinates'])
+            return 0.0
+        road = road_graph.distance(a['city_id'], b['city_id'])
+        if road is not None:
+            return road
+        if a['coordinates'] and b['coordinates']:
+            return haversine_distance(*a['coordinates'], *b['coordinates'])
+        return INF
+
+    def distance_matrix(self, locations: List[Dict[str, Any]]) -> List[List[float]]:
+        size = len(locations)
+        matrix = [[0.0] * size for _ in range(size)]
+        for i in range(size):
+            for j in range(i + 1, size):
+                matrix[i][j] = matrix[j][i] = self.leg_distance(locations[i], locations[j])
+        return matrix
+
+    # ------------------------------------------------------------------
+    # Solvers. Node 0 is the fixed start, nodes 1..n are the stops.
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def route_length(dist: List[List[float]], order: Sequence[int], return_to_start: bool) -> float:
+        total, previous = 0.0, 0
+        for node in order:
+            total += dist[previous][node]
+            previous = node
+        if return_to_start:
+            total += dist[previous][0]
+        return total
+
+    def solve(self, dist: List[List[float]], return_to_start: bool = True) -> Dict[str, Any]:
+        """Return the best stop order (node indices) for a distance matrix"""
+        stops = len(dist) - 1
+        if stops <= 1:
+            return {'order': list(range(1, stops + 1)), 'method': 'trivial'}
+        if stops <= self.EXACT_LIMIT:
+            return {'order': self._held_karp(dist, return_to_start), 'method': 'exact'}
+        return {'order': self._local_search(dist, return_to_start), 'method': 'heuristic'}
+
+    @staticmethod
+    def _held_karp(dist: List[List[float]], return_to_start: bool) -> List[int]:
+        n = len(dist) - 1
+        size = 1 << n
+        # Flat tables indexed by mask * n + last keep allocation (and GC) low
+        cost = [INF] * (size * n)
+        parent = [-1] * (size * n)
+        for k in range(n):
+            cost[(1 << k) * n + k] = dist[0][k + 1]
+
+        for mask in range(1, size):
+            missing = [(k, 1 << k) for k in range(n) if not mask & (1 << k)]
+            if not missing:
+                continue
+            base = mask * n
+            for last in range(n):
+                current = cost[base + last]
+                if current == INF:
+                    continue
+                leg = dist[last + 1]
+                for nxt, bit in missing:
+                    candidate = current + leg[nxt + 1]
+                    target = (mask | bit) * n + nxt
+                    if candidate < cost[target]:
+                        cost[target] = candidate
+                        parent[target] = last
+
+        full = size - 1
+        closing = [dist[k + 1][0] if return_to_start else 0.0 for k in range(n)]
+        last = min(range(n), key=lambda k: cost[full * n + k] + closing[k])
+
+        order, mask = [], full
+        while last != -1:
+            order.append(last + 1)
+            last, mask = parent[mask * n + last], mask & ~(1 << last)
+        order.reverse()
+        return order
+
+    def _local_search(self, dist: List[List[float]], return_to_start: bool) -> List[int]:
+        deadline = time.perf_counter() + self.TIME_BUDGET
+        n = len(dist) - 1
+
+        # Nearest-neighbour construction
+        order, remaining, current = [], set(range(1, n + 1)), 0
+        while remaining:
+            current = min(remaining, key=lambda node: dist[current][node])
+            order.append(current)
+            remaining.remove(current)
+
+        best = self._improve(dist, order, return_to_start, deadline)
+        given = self._improve(dist, list(range(1, n + 1)), return_to_start, deadline)
+        if self.route_length(dist, given, return_to_start) < self.route_length(dist, best, return_to_start):
+            best = given
+        return best
+
+    def _improve(self, dist, order: List[int], return_to_start: bool, deadline: float) -> List[int]:
+        """Alternate 2-opt and Or-opt moves until neither improves the route"""
+        route = [0] + order + ([0] if return_to_start else [])
+        last = len(order)  # index of the last movable position
+
+        def d(a: int, b: Optional[int]) -> float:
+            return 0.0 if b is None else dist[a][b]
+
+        def after(i: int) -> Optional[int]:
+            return route[i + 1] if i + 1 < len(route) else None
+
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+
+            # 2-opt: reverse route[i..j]
+            for i in range(1, last):
+                for j in range(i + 1, last + 1):
+                    delta = (d(route[i - 1], route[j]) + d(route[i], after(j))
+                             - d(route[i - 1], route[i]) - d(route[j], after(j)))
+                    if delta < -1e-9:
+                        route[i:j + 1] = route[i:j + 1][::-1]
+                        improved = True
+
+            # Or-opt: move a chain of 1-3 stops elsewhere, optionally reversed
+            for length in (1, 2, 3):
+                i = 1
+                while i + length - 1 <= last:
+                    segment = route[i:i + length]
+                    prev, nxt = route[i - 1], after(i + length - 1)
+                    removal = d(prev, segment[0]) + d(segment[-1], nxt) - d(prev, nxt)
+                    rest = route[:i] + route[i + length:]
+                    best_delta, best_move = -1e-9, None
+                    for p in range(1, last - length + 2):
+                        a, b = rest[p - 1], rest[p] if p < len(rest) else None
+                        for chain in (segment, segment[::-1]):
+                            delta = d(a, chain[0]) + d(chain[-1], b) - d(a, b) - removal
+                            if delta < best_delta:
+                                best_delta, best_move = delta, (p, chain)
+                    if best_move:
+                        p, chain = best_move
+                        route[:] = rest[:p] + chain + rest[p:]
+                        improved = True
+                    i += 1
+        return route[1:last + 1]
+
+    # ------------------------------------------------------------------
+    # Public entry point
+    # ------------------------------------------------------------------
+
+    def optimize(self, pickup: str, stops: Sequence[str], return_to_start: bool = True) -> Dict[str, Any]:
+        """
+        Order ``stops`` to minimise the distance travelled from ``pickup``.
+
+        Raises ValueError for unknown locations or unreachable stops.
+        """
+        started = time.perf_counter()
+        locations = self.resolve_locations([pickup] + list(stops))
+        unknown = [value for value, location in zip([pickup] + list(stops), locations) if location is None]
+        if unknown:
+            raise ValueError(f"Unknown locations: {', '.join(map(str, unknown))}")
+
+        dist = self.distance_matrix(locations)
+        if any(INF in row for row in dist):
+            raise ValueError('Some stops have no known road or coordinates')
+
+        result = self.solve(dist, return_to_start)
+        order = result['order']
+        sequence = [0] + order + ([0] if return_to_start else [])
+        legs = [
+            {
+                'from': locations[a]['value'],
+                'from_name': locations[a]['name'],
+                'to': locations[b]['value'],
+                'to_name': locations[b]['name'],
+                'distance': round(dist[a][b], 2),
+            }
+            for a, b in zip(sequence, sequence[1:])
+        ]
+        total = self.route_length(dist, order, return_to_start)
+        original = self.route_length(dist, range(1, len(locations)), return_to_start)
+
+        return {
+            'pickup': locations[0]['value'],
+            'stops': [locations[node]['value'] for node in order],
+            'legs': legs,
+            'total_distance': round(total, 2),
+            'original_distance': round(original, 2),
+            'distance_saved': round(original - total, 2),
+            'return_to_pickup': return_to_start,
+            'method': result['method'],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+
+
+# Global service instance
+itinerary_optimizer = ItineraryOptimizer()
@@ -0,0 +1,145 @@
+"""
+Road Graph Service
+Treats Route rows as weighted road edges and precomputes all-pairs shortest
+road distances, so city pairs without a direct Route still get a realistic
+multi-hop road distance instead of a straight-line estimate.
+"""
+
+import heapq
+import logging
+from array import array
+from typing import Any, Dict, List, Optional
+
+from .base import InMemoryIndex
+
+logger = logging.getLogger(__name__)
+
+INF = float('inf')
+
+
+class RoadGraph(InMemoryIndex):
+    """All-pairs shortest paths over the Route table"""
+
+    name = 'road_graph'
+
+    def build(self) -> Dict[str, Any]:
+        from tours.models import Route
+
+        edges: Dict[tuple, float] = {}
+        for from_id, to_id, distance in Route.objects.values_list('from_city_id', 'to_city_id', 'distance'):
+            if from_id == to_id:
+                continue
+            key = (min(from_id, to_id), max(from_id, to_id))
+            # Routes are stored one-way but driven both ways; keep the shorter
+            weight = float(distance)
+            if weight < edges.get(key, INF):
+                edges[key] = weight
+
+        ids = sorted({city_id for key in edges for city_id in key})
+        index = {city_id: i for i, city_id in enumerate(ids)}
+        adjacency: List[List[tuple]] = [[] for _ in ids]
+        for (a, b), weight in edges.items():
+            adjacency[index[a]].append((index[b], weight))
+            adjacency[index[b]].append((index[a], weight))
+
+        dist = [self._dijkstra(adjacency, source) for source in range(len(ids))]
+        logger.info(f"Road graph: {len(ids)} cities, {len(edges)} roads")
+        return {'ids': ids, 'index': index, 'adjacency': adjacency, 'dist': dist}
+
+    @staticmethod
+    def _dijkstra(adjacency: List[List[tuple]], source: int) -> array:
+        dist = array('d', [INF]) * len(adjacency)
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for neighbour, weight in adjacency[node]:
+                candidate = d + weight
+                if candidate < dist[neighbour]:
+                    dist[neighbour] = candidate
+                    heapq.heappush(heap, (candidate, neighbour))
+        return dist
+
+    def distance(self, from_city_id, to_city_id) -> Optional[float]:
+        """Shortest road distance in km, or None if the cities are not connected"""
+        state = self.state
+        try:
+            i = state['index'][int(from_city_id)]
+            j = state['index'][int(to_city_id)]
+        except (KeyError, TypeError, ValueError):
+            return None
+        d = state['dist'][i][j]
+        return None if d == INF else d
+
+    def path(self, from_city_id, to_city_id) -> List[int]:
+        """City IDs along the shortest road path, endpoints included"""
+        state = self.state
+        try:
+            i = state['index'][int(from_city_id)]
+            target = state['index'][int(to_city_id)]
+        except (KeyError, TypeError, ValueError):
+            return []
+        dist = state['dist']
+        if dist[i][target] == INF:
+            return []
+
+        nodes = [i]
+        while i != target:
+            # Step to the neighbour that lies on a shortest path to the target
+            i = min(state['adjacency'][i], key=lambda edge: edge[1] + dist[edge[0]][target])[0]
+            nodes.append(i)
+        return [state['ids'][node] for node in nodes]
+
+    def route_saved(self, from_city_id: int, to_city_id: int, distance: float) -> None:
+        """
+        Apply a new or shortened road in O(n^2) instead of rebuilding.
+
+        A single shorter edge (a, b) can only improve a pair (i, j) by being
+        used once, so d(i, j) = min(d(i, j), d(i, a) + w + d(b, j),
+        d(i, b) + w + d(a, j)). Anything else falls back to a full rebuild.
+        """
+        state = self.peek()
+        index = state['index'] if state else {}
+        if from_city_id not in index or to_city_id not in index or from_city_id == to_city_id:
+            self.invalidate()
+            return
+
+        a, b, weight = index[from_city_id], index[to_city_id], float(distance)
+        old = state['dist']
+        if weight >= old[a][b]:
+            # Not a shortcut - only the adjacency needs the new edge
+            self._set_edge(state['adjacency'], a, b, weight)
+            self.publish(state)
+            return
+
+        row_a, row_b = old[a], old[b]
+        dist = []
+        for row in old:
+            via_a = row[a] + weight
+            via_b = row[b] + weight
+            new_row = array('d', row)
+            if via_a < INF or via_b < INF:
+                for j in range(len(row)):
+                    candidate = min(via_a + row_b[j], via_b + row_a[j])
+                    if candidate < new_row[j]:
+                        new_row[j] = candidate
+            dist.append(new_row)
+
+        adjacency = [list(edges) for edges in state['adjacency']]
+        self._set_edge(adjacency, a, b, weight)
+        self.publish({'ids': state['ids'], 'index': index, 'adjacency': adjacency, 'dist': dist})
+        logger.info(f"Road graph updated incrementally for route {from_city_id} -> {to_city_id}")
+
+    @staticmethod
+    def _set_edge(adjacency: List[List[tuple]], a: int, b: int, weight: float) -> None:
+        for node, other in ((a, b), (b, a)):
+            edges = [edge for edge in adjacency[node] if edge[0] != other]
+            current = min((edge[1] for edge in adjacency[node] if edge[0] == other), default=INF)
+            edges.append((other, min(weight, current)))
+            adjacency[node] = edges
+
+
+# Global service instance
+road_graph = RoadGraph()
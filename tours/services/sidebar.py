@@ -0,0 +1,84 @@
+"""
+Sidebar Fragment Service
+Renders the tariff page sidebar (popular packages, featured testimonials and
+current promotions) once per content version and keeps the HTML in the
+shared cache.
+"""
+
+import logging
+import math
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+
+class SidebarFragment:
+    """Cached HTML fragment shared by the tariff pages"""
+
+    name = 'tariff_sidebar'
+    template_name = 'includes/tariff_sidebar.html'
+    # Upper bound on how long a rendered fragment is kept
+    timeout = 3600
+
+    @property
+    def version_key(self) -> str:
+        return f"tours_fragment_version_{self.name}"
+
+    def _version(self) -> int:
+        version = cache.get(self.version_key)
+        if version is None:
+            version = 1
+            cache.add(self.version_key, version, None)
+        return version
+
+    def get_context(self) -> Tuple[Dict[str, Any], Optional[Any]]:
+        """Return the template context and the earliest promotion expiry shown"""
+        from tours.models import TourPackage
+        from enquiries.models import Promotion, Testimonial
+
+        now = timezone.now()
+        promotions = list(
+            Promotion.objects.filter(is_active=True).filter(
+                Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+            )[:3]
+        )
+        expiries = [promotion.expires_at for promotion in promotions if promotion.expires_at]
+        context = {
+            'popular_plans': list(TourPackage.objects.filter(is_active=True).order_by('-created_at')[:5]),
+            'testimonials': list(Testimonial.objects.filter(is_approved=True, is_featured=True)[:3]),
+            'promotions': promotions,
+        }
+        return context, min(expiries) if expiries else None
+
+    def render(self) -> str:
+        """Return the sidebar HTML, rendering it only on a cache miss"""
+        key = f"tours_fragment_{self.name}_{self._version()}"
+        html = cache.get(key)
+        if html is None:
+            context, expires_at = self.get_context()
+            html = render_to_string(self.template_name, context)
+            timeout = self.timeout
+            if expires_at is not None:
+                # Drop the fragment the moment a promotion on it expires
+                remaining = (expires_at - timezone.now()).total_seconds()
+                timeout = max(1, min(timeout, math.ceil(remaining)))
+            cache.set(key, html, timeout)
+            logger.debug(f"Rendered {self.name} fragment (cached for {timeout}s)")
+        return mark_safe(html)
+
+    def invalidate(self) -> None:
+        """Make every worker render the fragment again on its next request"""
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 2, None)
+
+
+# Global service instance
+tariff_sidebar = SidebarFragment()
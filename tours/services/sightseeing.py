@@ -0,0 +1,76 @@
+"""
+Sightseeing Catalog Service
+Per-city sightseeing data (parsed tourist places, sightseeing distance,
+spots and hill-station charges) materialized once per catalog version.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from .base import InMemoryIndex
+
+logger = logging.getLogger(__name__)
+
+
+def parse_tourist_places(text: Optional[str]) -> List[str]:
+    """Split the comma separated ``City.tourist_places`` text"""
+    if not text:
+        return []
+    return [place.strip() for place in text.split(',') if place.strip()]
+
+
+class SightseeingCatalog(InMemoryIndex):
+    """Normalized sightseeing data for every city"""
+
+    name = 'sightseeing'
+
+    def build(self) -> Dict[str, Any]:
+        from tours.models import City, SightseeingSpot
+
+        cities: Dict[int, Dict[str, Any]] = {}
+        # Inactive cities are kept so existing bookings can still be summarised
+        fields = ('id', 'name', 'tourist_places', 'sightseeing_kilometers',
+                  'is_hill_station', 'hill_station_charge', 'is_active')
+        for city in City.objects.only(*fields):
+            cities[city.id] = {
+                'city_id': city.id,
+                'city_name': city.name,
+                'tourist_places': parse_tourist_places(city.tourist_places),
+                'tourist_places_text': city.tourist_places or '',
+                'sightseeing_kilometers': float(city.sightseeing_kilometers or 0),
+                'is_hill_station': city.is_hill_station,
+                'hill_station_charge': float(city.hill_station_charge or 0),
+                'is_active': city.is_active,
+                'spots': [],
+            }
+
+        spots = SightseeingSpot.objects.filter(city_id__in=cities.keys()).order_by('name')
+        for spot in spots:
+            cities[spot.city_id]['spots'].append({
+                'id': spot.id,
+                'name': spot.name,
+                'description': spot.description,
+                'image': spot.image.url if spot.image else None,
+            })
+
+        logger.info(f"Sightseeing catalog built for {len(cities)} cities")
+        return {'cities': cities}
+
+    def get(self, city_id: int, active_only: bool = False) -> Optional[Dict[str, Any]]:
+        """Sightseeing data for one city, or None"""
+        city = self.state['cities'].get(city_id)
+        if city is None or (active_only and not city['is_active']):
+            return None
+        return city
+
+    def get_many(self, city_ids: Iterable[int], active_only: bool = False) -> Dict[int, Dict[str, Any]]:
+        """Sightseeing data for several cities in one lookup; unknown IDs are skipped"""
+        cities = self.state['cities']
+        return {
+            city_id: cities[city_id] for city_id in city_ids
+            if city_id in cities and (cities[city_id]['is_active'] or not active_only)
+        }
+
+
+# Global service instance
+sightseeing_catalog = SightseeingCatalog()
@@ -0,0 +1,133 @@
+"""
+Spatial Index Service
+KD-tree over City and LocalArea coordinates for nearest serviced location
+lookups from a GPS fix or map click.
+"""
+
+import heapq
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+from .base import InMemoryIndex
+from .gazetteer import gazetteer
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def to_unit_vector(latitude: float, longitude: float) -> tuple:
+    """Point on the unit sphere; chord length orders points like great-circle distance"""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class SpatialIndex(InMemoryIndex):
+    """Exact k-nearest-neighbour search over serviced locations"""
+
+    name = 'spatial'
+
+    def build(self) -> Dict[str, Any]:
+        from tours.models import City, LocalArea
+
+        points: List[Dict[str, Any]] = []
+        cities = {}
+        for city in City.objects.filter(is_active=True).only('id', 'name', 'latitude', 'longitude'):
+            cities[city.id] = city.name
+            coords = gazetteer.city_coordinates(city)
+            if coords:
+                points.append({
+                    'type': 'city',
+                    'value': f"city_{city.id}",
+                    'id': city.id,
+                    'name': city.name,
+                    'city_id': city.id,
+                    'city_name': city.name,
+                    'latitude': coords[0],
+                    'longitude': coords[1],
+                })
+
+        areas = LocalArea.objects.filter(
+            city_id__in=cities.keys(), latitude__isnull=False, longitude__isnull=False
+        ).only('id', 'name', 'city_id', 'latitude', 'longitude')
+        for area in areas:
+            points.append({
+                'type': 'area',
+                'value': f"area_{area.id}",
+                'id': area.id,
+                'name': area.name,
+                'city_id': area.city_id,
+                'city_name': cities[area.city_id],
+                'latitude': float(area.latitude),
+                'longitude': float(area.longitude),
+            })
+
+        vectors = [to_unit_vector(p['latitude'], p['longitude']) for p in points]
+        # Tree stored as parallel arrays: node -> (point, axis, left, right)
+        tree: List[tuple] = []
+
+        def grow(indices: List[int], depth: int) -> int:
+            if not indices:
+                return -1
+            axis = depth % 3
+            indices.sort(key=lambda i: vectors[i][axis])
+            middle = len(indices) // 2
+            node = len(tree)
+            tree.append(None)
+            left = grow(indices[:middle], depth + 1)
+            right = grow(indices[middle + 1:], depth + 1)
+            tree[node] = (indices[middle], axis, left, right)
+            return node
+
+        root = grow(list(range(len(points))), 0)
+        logger.info(f"Spatial index built over {len(points)} locations")
+        return {'points': points, 'vectors': vectors, 'tree': tree, 'root': root}
+
+    def nearest(self, latitude: float, longitude: float, k: int = 5,
+                location_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the ``k`` nearest locations with their great-circle distance in km"""
+        state = self.state
+        points, vectors, tree = state['points'], state['vectors'], state['tree']
+        if state['root'] == -1 or k <= 0:
+            return []
+        target = to_unit_vector(latitude, longitude)
+
+        # Max-heap of (-squared chord, point index) holding the best k so far
+        best: List[tuple] = []
+
+        def visit(node: int) -> None:
+            if node == -1:
+                return
+            index, axis, left, right = tree[node]
+            vector = vectors[index]
+            if location_type is None or points[index]['type'] == location_type:
+                squared = sum((a - b) ** 2 for a, b in zip(vector, target))
+                if len(best) < k:
+                    heapq.heappush(best, (-squared, index))
+                elif squared < -best[0][0]:
+                    heapq.heapreplace(best, (-squared, index))
+            offset = target[axis] - vector[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if len(best) < k or offset * offset < -best[0][0]:
+                visit(far)
+
+        visit(state['root'])
+
+        results = []
+        for negative, index in sorted(best, reverse=True):
+            results.append({
+                **points[index],
+                'distance_km': round(chord_to_km(math.sqrt(-negative)), 3),
+            })
+        return results
+
+
+# Global service instance
+spatial_index = SpatialIndex()
@@ -0,0 +1,152 @@
+"""
+Django Signals for Tour Data
+Keeps the in-memory location indexes and cached fragments in step with admin edits.
+Invalidations run once the edit is committed: a worker that rebuilt before
+the commit would otherwise store the old rows under the new version.
+"""
+
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
+from django.dispatch import receiver
+from enquiries.models import Promotion, Testimonial
+from vehicles.models import Vehicle
+from . import image_derivatives
+from .models import City, LocalArea, Route, SightseeingSpot, TourPackage
+from .services import (
+    catalog_bundle, gazetteer, location_autocomplete, package_catalog, road_graph, sightseeing_catalog,
+    spatial_index, tariff_sidebar
+)
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=LocalArea)
+@receiver(post_delete, sender=LocalArea)
+@receiver(post_save, sender=SightseeingSpot)
+@receiver(post_delete, sender=SightseeingSpot)
+def invalidate_location_names(sender, instance, **kwargs):
+    """Rebuild the name-based indexes (gazetteer, autocomplete) after any location change"""
+    transaction.on_commit(gazetteer.invalidate)
+    transaction.on_commit(location_autocomplete.invalidate)
+    logger.debug(f"Location name indexes invalidated by {sender.__name__} {instance.pk}")
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=LocalArea)
+@receiver(post_delete, sender=LocalArea)
+def invalidate_spatial_index(sender, instance, **kwargs):
+    """Rebuild the nearest-location index when coordinates may have changed"""
+    transaction.on_commit(spatial_index.invalidate)
+
+
+@receiver(pre_save, sender=Route)
+def track_route_changes(sender, instance, **kwargs):
+    """Remember the stored route so post_save can tell shortcuts from detours"""
+    instance._previous_route = None
+    if instance.pk:
+        instance._previous_route = Route.objects.filter(pk=instance.pk).values(
+            'from_city_id', 'to_city_id', 'distance'
+        ).first()
+
+
+@receiver(post_save, sender=Route)
+def update_road_graph(sender, instance, created, **kwargs):
+    """Apply new or shortened routes incrementally, rebuild on anything else"""
+    previous = getattr(instance, '_previous_route', None)
+    shortened = (
+        previous is not None
+        and previous['from_city_id'] == instance.from_city_id
+        and previous['to_city_id'] == instance.to_city_id
+        and instance.distance <= previous['distance']
+    )
+    if created or shortened:
+        # A rolled back save must never reach the published graph
+        from_city_id, to_city_id, distance = instance.from_city_id, instance.to_city_id, instance.distance
+        transaction.on_commit(lambda: road_graph.route_saved(from_city_id, to_city_id, distance))
+    else:
+        transaction.on_commit(road_graph.invalidate)
+
+
+@receiver(post_delete, sender=Route)
+def invalidate_road_graph(sender, instance, **kwargs):
+    """Removing a road can lengthen many paths, so rebuild from scratch"""
+    transaction.on_commit(road_graph.invalidate)
+
+
+@receiver(post_save, sender=TourPackage)
+@receiver(post_delete, sender=TourPackage)
+@receiver(m2m_changed, sender=TourPackage.cities.through)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def invalidate_package_catalog(sender, **kwargs):
+    """Rebuild the package catalog after package, package city or city name changes"""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(package_catalog.invalidate)
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=SightseeingSpot)
+@receiver(post_delete, sender=SightseeingSpot)
+def invalidate_sightseeing_catalog(sender, instance, **kwargs):
+    """Rebuild the sightseeing catalog after city or spot edits"""
+    transaction.on_commit(sightseeing_catalog.invalidate)
+
+
+@receiver(post_save, sender=TourPackage)
+@receiver(post_delete, sender=TourPackage)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+def invalidate_tariff_sidebar(sender, instance, **kwargs):
+    """Re-render the tariff sidebar after package, testimonial or promotion edits"""
+    transaction.on_commit(tariff_sidebar.invalidate)
+
+
+def _publish_catalog_bundle():
+    try:
+        catalog_bundle.publish_soon()
+    except OSError as e:
+        logger.error(f"Could not publish catalog bundle: {e}")
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=LocalArea)
+@receiver(post_delete, sender=LocalArea)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_save, sender=TourPackage)
+@receiver(post_delete, sender=TourPackage)
+@receiver(m2m_changed, sender=TourPackage.cities.through)
+def republish_catalog_bundle(sender, **kwargs):
+    """Publish a fresh catalog bundle once the admin edit is committed"""
+    if not getattr(settings, 'CATALOG_BUNDLE_AUTO_PUBLISH', True):
+        return
+    # Fixtures (loaddata) are published once by the build's publish_catalog
+    if kwargs.get('raw'):
+        return
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(_publish_catalog_bundle)
+
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=SightseeingSpot)
+@receiver(post_save, sender=TourPackage)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_save, sender=Promotion)
+def generate_image_derivatives(sender, instance, **kwargs):
+    """Queue resized copies of a newly uploaded image once the save is committed"""
+    # Fixture rows point at files that were never uploaded through this site
+    if kwargs.get('raw'):
+        return
+    name = instance.image.name if instance.image else ''
+    if name and image_derivatives.get_manifest(name) is None:
+        transaction.on_commit(lambda: image_derivatives.schedule(name))
@@ -0,0 +1,176 @@
+"""
+Request coalescing (single-flight) for expensive API views
+Concurrent identical requests share one computation: within a worker they
+wait on the in-flight call, and with ``shared=True`` requests in other
+workers wait on a cache lock and read the result the leader publishes.
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Any, Callable, Dict, Tuple
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+STAT_NAMES = ('leaders', 'followers', 'timeouts', 'errors')
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run a function once per key while identical calls are in flight"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats: Dict[str, Counter] = {}
+
+    def record(self, name: str, stat: str) -> None:
+        with self._lock:
+            self._stats.setdefault(name, Counter())[stat] += 1
+
+    def do(self, name: str, key: str, fn: Callable[[], Any], timeout: float) -> Tuple[Any, bool]:
+        """
+        Return ``(result, shared)``. Followers wait up to ``timeout`` seconds
+        for the leader and then compute on their own.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.event.wait(timeout):
+                self.record(name, 'followers')
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            self.record(name, 'timeouts')
+            return fn(), False
+
+        self.record(name, 'leaders')
+        try:
+            call.result = fn()
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            self.record(name, 'errors')
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {stat: counts.get(stat, 0) for stat in STAT_NAMES}
+                for name, counts in sorted(self._stats.items())
+            }
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Global group shared by all decorated views in this worker
+single_flight_group = SingleFlight()
+
+
+def request_key(name: str, request) -> str:
+    """Identical requests: same view, method, path, query params and body"""
+    params = sorted((param, request.GET.getlist(param)) for param in request.GET)
+    body = hashlib.md5(request.body).hexdigest() if request.method == 'POST' else ''
+    raw = repr((request.method, request.path, params, body))
+    return f"single_flight_{name}_{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+
+def _snapshot(response) -> Dict[str, Any]:
+    if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+        response.render()
+    return {'content': response.content, 'status': response.status_code, 'headers': dict(response.items())}
+
+
+def _response(snapshot: Dict[str, Any], status: str) -> HttpResponse:
+    # Each waiting request gets its own response object built from the shared bytes
+    response = HttpResponse(snapshot['content'], status=snapshot['status'])
+    for name, value in snapshot['headers'].items():
+        response[name] = value
+    response['X-Single-Flight'] = status
+    return response
+
+
+def single_flight(timeout: float = 10.0, shared: bool = False, share_for: float = 2.0):
+    """
+    Coalesce concurrent identical GET/POST requests to a view.
+
+    Apply above ``@api_view``. ``timeout`` bounds how long a follower waits
+    for the leader. With ``shared=True`` a cache lock extends coalescing to
+    other workers, which read the leader's result from the cache for
+    ``share_for`` seconds.
+    """
+    def decorator(view_func):
+        view_class = getattr(view_func, 'view_class', None)
+        name = f"{view_func.__module__}.{view_class.__name__ if view_class else view_func.__name__}"
+
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'POST'):
+                return view_func(request, *args, **kwargs)
+            key = request_key(name, request)
+
+            def compute():
+                if not shared:
+                    return _snapshot(view_func(request, *args, **kwargs))
+                return _compute_shared(key, name, lambda: _snapshot(view_func(request, *args, **kwargs)),
+                                       timeout, share_for)
+
+            snapshot, was_shared = single_flight_group.do(name, key, compute, timeout)
+            return _response(snapshot, 'SHARED' if was_shared else 'LEADER')
+        return wrapped
+    return decorator
+
+
+def _compute_shared(key: str, name: str, fn: Callable[[], Dict[str, Any]],
+                    timeout: float, share_for: float) -> Dict[str, Any]:
+    result_key = f"{key}_result"
+    snapshot = cache.get(result_key)
+    if snapshot is not None:
+        single_flight_group.record(name, 'followers')
+        return snapshot
+
+    lock_key = f"{key}_lock"
+    if not cache.add(lock_key, 1, max(1, int(timeout))):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.025)
+            snapshot = cache.get(result_key)
+            if snapshot is not None:
+                single_flight_group.record(name, 'followers')
+                return snapshot
+        single_flight_group.record(name, 'timeouts')
+        return fn()
+
+    try:
+        snapshot = fn()
+        if snapshot['status'] == 200:
+            cache.set(result_key, snapshot, share_for)
+        return snapshot
+    finally:
+        cache.delete(lock_key)
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Leader, follower, timeout and error counts per view in this worker"""
+    return single_flight_group.stats()
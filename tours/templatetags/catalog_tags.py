@@ -0,0 +1,16 @@
+"""
+Catalog Template Tags for Ritham Tours & Travels
+Expose the published catalog bundle to page scripts
+"""
+
+from django import template
+
+from tours.services.catalog_bundle import catalog_bundle
+
+register = template.Library()
+
+
+@register.simple_tag
+def catalog_bundle_url():
+    """URL of the current hashed catalog bundle, or an empty string when none is published"""
+    return catalog_bundle.current_url() or ''
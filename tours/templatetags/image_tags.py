@@ -0,0 +1,83 @@
+"""
+Image Template Tags for Ritham Tours & Travels
+Responsive <picture> markup for uploaded images with generated derivatives
+and for static images with WebP siblings written by optimize_static
+"""
+
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from tours import image_derivatives
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(image, fmt='jpeg'):
+    """``srcset`` value for one derivative format, or an empty string"""
+    return image_derivatives.srcset(getattr(image, 'name', image) or '', fmt)
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', src=None, css_class='', loading='lazy'):
+    """
+    <picture> with AVIF/WebP sources and a JPEG ``srcset`` for ``image``.
+    Falls back to a plain <img> of the original (or ``src``) until the
+    derivatives have been generated.
+    """
+    name = getattr(image, 'name', '') or ''
+    fallback = src or (image.url if name else '')
+    manifest = image_derivatives.get_manifest(name)
+    if not manifest:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">', fallback, alt, css_class, loading
+        )
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime, image_derivatives.srcset(name, fmt), sizes)
+            for fmt, mime, _ in image_derivatives.FORMATS
+            if fmt != 'jpeg' and fmt in manifest['formats']
+        ),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}" decoding="async"></picture>',
+        sources, fallback, image_derivatives.srcset(name, 'jpeg'), sizes, alt, css_class, loading,
+    )
+
+
+@lru_cache(maxsize=None)
+def _webp_sibling(path):
+    name = f"{path}.webp"
+    if not staticfiles_storage.exists(name) and not finders.find(name):
+        return None
+    try:
+        return static(name)
+    except ValueError:
+        # Not in the manifest of the last collectstatic
+        return None
+
+
+@register.simple_tag
+def static_picture(path, alt='', css_class='', style='', loading='lazy'):
+    """Static image as a <picture> with its WebP sibling, or a plain <img> without one"""
+    try:
+        src = static(path)
+    except ValueError:
+        # Not in the manifest of the last collectstatic (e.g. an uploaded blog image name)
+        src = f"{settings.STATIC_URL}{path}"
+    img = format_html(
+        '<img src="{}" alt="{}" class="{}" style="{}" loading="{}" decoding="async">',
+        src, alt, css_class, style, loading,
+    )
+    webp = _webp_sibling(path)
+    if not webp:
+        return img
+    return format_html('<picture><source type="image/webp" srcset="{}">{}</picture>', webp, img)
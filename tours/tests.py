@@ -0,0 +1,755 @@
+"""
+Tests for the tour location services and planner APIs
+"""
+
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.http import HttpResponse
+from django.test import TestCase, SimpleTestCase, Client, RequestFactory, override_settings
+from tours.models import City, LocalArea, Route, SightseeingSpot, TourPackage
+from tours.services import (
+    gazetteer, location_autocomplete, package_catalog, road_graph, sightseeing_catalog, spatial_index,
+    tariff_sidebar, catalog_bundle, ItineraryOptimizer
+)
+from io import BytesIO, StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template import Context, Template
+from PIL import Image
+from tours import image_derivatives
+from tours.caching import cache_stats, cached_api, response_cache_key
+from tours.single_flight import single_flight, single_flight_group
+from tours.utils import haversine_distance
+from blog.models import BlogPost
+from bookings.models import Booking
+from enquiries.models import Promotion, Testimonial
+
+
+class GazetteerTests(TestCase):
+    """Tests for free-text address resolution"""
+
+    def setUp(self):
+        self.coimbatore = City.objects.create(name='Coimbatore', latitude=11.0168, longitude=76.9558)
+        self.ooty = City.objects.create(name='Ooty')
+        self.rs_puram = LocalArea.objects.create(
+            city=self.coimbatore, name='RS Puram', latitude=11.0089, longitude=76.9507
+        )
+        SightseeingSpot.objects.create(city=self.ooty, name='Doddabetta Peak')
+        gazetteer.invalidate()
+
+    def test_resolves_area_inside_full_address(self):
+        """An area named inside a longer postal address is the best match"""
+        match = gazetteer.resolve('No 12, R.S. Puram Main Road, Coimbatore 641002')
+        self.assertEqual(match['type'], 'area')
+        self.assertEqual(match['id'], self.rs_puram.id)
+        self.assertAlmostEqual(match['latitude'], 11.0089, places=4)
+
+    def test_tolerates_misspelling(self):
+        """Small typos still resolve to the right city"""
+        match = gazetteer.resolve('Coimbatre bus stand')
+        self.assertEqual(match['city_id'], self.coimbatore.id)
+
+    def test_uses_reference_coordinates_when_missing(self):
+        """Cities without stored coordinates fall back to the reference table"""
+        match = gazetteer.resolve('Doddabetta Peak')
+        self.assertEqual(match['type'], 'spot')
+        self.assertEqual(match['city_id'], self.ooty.id)
+        self.assertEqual((match['latitude'], match['longitude']), (11.4064, 76.6932))
+        self.assertEqual(match['coordinates_source'], 'reference')
+
+    def test_version_moves_only_when_the_edit_commits(self):
+        """A rebuild between save and commit must not be recorded as the new version"""
+        version = gazetteer.version
+        with self.captureOnCommitCallbacks(execute=True):
+            City.objects.create(name='Salem')
+            self.assertEqual(gazetteer._shared_version(), version)
+        self.assertGreater(gazetteer._shared_version(), version)
+        self.assertEqual(gazetteer.resolve('Salem junction')['name'], 'Salem')
+
+    def test_unrelated_text_has_no_match(self):
+        """Nonsense input does not resolve to anything"""
+        self.assertIsNone(gazetteer.resolve('xyzzy qwerty'))
+
+    def test_index_refreshes_after_save(self):
+        """New rows are searchable right after they are saved"""
+        LocalArea.objects.create(city=self.coimbatore, name='Gandhipuram')
+        match = gazetteer.resolve('Gandhipuram')
+        self.assertEqual(match['name'], 'Gandhipuram')
+
+    def test_route_distance_accepts_addresses(self):
+        """The route distance API resolves free-text addresses"""
+        client = Client()
+        response = client.get('/api/route-distance/', {
+            'from_address': 'RS Puram, Coimbatore',
+            'to_address': 'Ooty',
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['resolved']['to']['city_id'], self.ooty.id)
+        self.assertGreater(data['distance'], 40)
+
+
+class RoadGraphTests(TestCase):
+    """Tests for multi-hop road distance inference"""
+
+    def setUp(self):
+        self.cbe = City.objects.create(name='Coimbatore')
+        self.ooty = City.objects.create(name='Ooty')
+        self.mysore = City.objects.create(name='Mysore')
+        self.coorg = City.objects.create(name='Coorg')
+        Route.objects.create(from_city=self.cbe, to_city=self.ooty, distance=86)
+        Route.objects.create(from_city=self.mysore, to_city=self.ooty, distance=125)
+        Route.objects.create(from_city=self.mysore, to_city=self.coorg, distance=118)
+        road_graph.invalidate()
+
+    def test_multi_hop_distance(self):
+        """Pairs without a direct route chain through intermediate cities"""
+        self.assertEqual(road_graph.distance(self.cbe.id, self.coorg.id), 86 + 125 + 118)
+        self.assertEqual(
+            road_graph.path(self.cbe.id, self.coorg.id),
+            [self.cbe.id, self.ooty.id, self.mysore.id, self.coorg.id]
+        )
+
+    def test_unconnected_city(self):
+        """Cities with no routes have no road distance"""
+        kodai = City.objects.create(name='Kodaikanal')
+        self.assertIsNone(road_graph.distance(self.cbe.id, kodai.id))
+
+    def test_new_shortcut_applied_incrementally(self):
+        """A new shorter road updates every affected pair without a rebuild"""
+        road_graph.state
+        with self.captureOnCommitCallbacks(execute=True):
+            Route.objects.create(from_city=self.cbe, to_city=self.mysore, distance=160)
+        self.assertIsNotNone(road_graph.peek())
+        self.assertEqual(road_graph.distance(self.coorg.id, self.cbe.id), 160 + 118)
+        self.assertEqual(road_graph.distance(self.ooty.id, self.mysore.id), 125)
+
+    def test_rolled_back_shortcut_is_not_published(self):
+        """The incremental update waits for the commit"""
+        road_graph.state
+        try:
+            with transaction.atomic():
+                Route.objects.create(from_city=self.cbe, to_city=self.mysore, distance=160)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(road_graph.distance(self.cbe.id, self.mysore.id), 86 + 125)
+
+    def test_longer_route_triggers_rebuild(self):
+        """Lengthening a road is reflected after the rebuild"""
+        road_graph.state
+        route = Route.objects.get(from_city=self.mysore, to_city=self.ooty)
+        route.distance = 200
+        with self.captureOnCommitCallbacks(execute=True):
+            route.save()
+        self.assertEqual(road_graph.distance(self.cbe.id, self.mysore.id), 286)
+
+    def test_route_distance_api_uses_road_network(self):
+        """The route distance API reports multi-hop road distance"""
+        response = Client().get('/api/route-distance/', {
+            'from_city_id': self.cbe.id, 'to_city_id': self.coorg.id
+        })
+        data = response.json()
+        self.assertEqual(data['source'], 'road_network')
+        self.assertEqual(data['distance'], 329)
+        self.assertEqual(data['via_city_ids'], [self.ooty.id, self.mysore.id])
+
+
+class ItineraryOptimizerTests(SimpleTestCase):
+    """Tests for the multicity stop ordering solvers"""
+
+    def setUp(self):
+        self.optimizer = ItineraryOptimizer()
+        self.rng = random.Random(7)
+
+    def random_matrix(self, stops):
+        points = [(self.rng.uniform(0, 100), self.rng.uniform(0, 100)) for _ in range(stops + 1)]
+        return [[((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5 for bx, by in points] for ax, ay in points]
+
+    def brute_force(self, dist, return_to_start):
+        return min(
+            self.optimizer.route_length(dist, order, return_to_start)
+            for order in itertools.permutations(range(1, len(dist)))
+        )
+
+    def test_exact_matches_brute_force(self):
+        """Held-Karp finds the optimum for round and one-way trips"""
+        for return_to_start in (True, False):
+            dist = self.random_matrix(7)
+            result = self.optimizer.solve(dist, return_to_start)
+            self.assertEqual(result['method'], 'exact')
+            self.assertEqual(sorted(result['order']), list(range(1, 8)))
+            self.assertAlmostEqual(
+                self.optimizer.route_length(dist, result['order'], return_to_start),
+                self.brute_force(dist, return_to_start)
+            )
+
+    def test_heuristic_close_to_optimum(self):
+        """Local search on larger trips stays within a few percent of optimal"""
+        dist = self.random_matrix(13)
+        result = self.optimizer.solve(dist, True)
+        self.assertEqual(result['method'], 'heuristic')
+        self.assertEqual(sorted(result['order']), list(range(1, 14)))
+        found = self.optimizer.route_length(dist, result['order'], True)
+        best = self.optimizer.route_length(dist, self.optimizer._held_karp(dist, True), True)
+        self.assertLessEqual(found, best * 1.05)
+
+
+class OptimizeItineraryAPITests(TestCase):
+    """Tests for the itinerary optimizer endpoint"""
+
+    def test_reorders_stops(self):
+        """Stops given out of order come back in driving order"""
+        cbe = City.objects.create(name='Coimbatore', latitude=11.0168, longitude=76.9558)
+        salem = City.objects.create(name='Salem', latitude=11.6643, longitude=78.1460)
+        chennai = City.objects.create(name='Chennai', latitude=13.0827, longitude=80.2707)
+        madurai = City.objects.create(name='Madurai', latitude=9.9252, longitude=78.1198)
+        road_graph.invalidate()
+
+        response = Client().get('/api/optimize-itinerary/', {
+            'pickup_city': f'city_{cbe.id}',
+            'stops': f'city_{chennai.id},city_{madurai.id},city_{salem.id}',
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn(data['stops'], [
+            [f'city_{salem.id}', f'city_{chennai.id}', f'city_{madurai.id}'],
+            [f'city_{madurai.id}', f'city_{chennai.id}', f'city_{salem.id}'],
+        ])
+        self.assertLess(data['total_distance'], data['original_distance'])
+        self.assertEqual(len(data['legs']), 4)
+
+    def test_unknown_stop(self):
+        """Unknown locations are rejected"""
+        cbe = City.objects.create(name='Coimbatore')
+        response = Client().get('/api/optimize-itinerary/', {
+            'pickup_city': cbe.id, 'stops': 'city_9999'
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_json_stops_are_validated(self):
+        """JSON stops may be a comma separated string; other shapes are a 400, not a 500"""
+        cbe = City.objects.create(name='Coimbatore', latitude=11.0168, longitude=76.9558)
+        salem = City.objects.create(name='Salem', latitude=11.6643, longitude=78.1460)
+        road_graph.invalidate()
+
+        response = Client().post('/api/optimize-itinerary/', {
+            'pickup_city': f'city_{cbe.id}', 'stops': f'city_{salem.id}',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['stops'], [f'city_{salem.id}'])
+
+        for stops in (3, {'id': 1}, [[1]], [None]):
+            response = Client().post('/api/optimize-itinerary/', {
+                'pickup_city': f'city_{cbe.id}', 'stops': stops,
+            }, content_type='application/json')
+            self.assertEqual(response.status_code, 400, stops)
+
+
+class SpatialIndexTests(TestCase):
+    """Tests for nearest serviced location lookups"""
+
+    def setUp(self):
+        self.rng = random.Random(11)
+        self.cities = [
+            City.objects.create(
+                name=f'City {i}',
+                latitude=round(self.rng.uniform(8, 13), 6),
+                longitude=round(self.rng.uniform(75, 80), 6),
+            )
+            for i in range(40)
+        ]
+        spatial_index.invalidate()
+
+    def test_matches_linear_scan(self):
+        """KD-tree results equal a brute-force haversine scan"""
+        for _ in range(20):
+            lat, lon = self.rng.uniform(8, 13), self.rng.uniform(75, 80)
+            expected = sorted(
+                self.cities,
+                key=lambda c: haversine_distance(lat, lon, float(c.latitude), float(c.longitude))
+            )[:5]
+            found = spatial_index.nearest(lat, lon, k=5)
+            self.assertEqual([r['id'] for r in found], [c.id for c in expected])
+
+    def test_new_area_is_found_after_save(self):
+        """Saving an area rebuilds the index"""
+        area = LocalArea.objects.create(city=self.cities[0], name='Gandhipuram', latitude=11.0, longitude=77.0)
+        response = Client().get('/api/nearest-locations/', {'lat': 11.0, 'lon': 77.0, 'k': 1})
+        location = response.json()['locations'][0]
+        self.assertEqual(location['value'], f'area_{area.id}')
+        self.assertEqual(location['distance_km'], 0)
+
+    def test_invalid_coordinates(self):
+        """Missing or out-of-range coordinates are rejected"""
+        self.assertEqual(Client().get('/api/nearest-locations/', {'lat': 'x'}).status_code, 400)
+        self.assertEqual(Client().get('/api/nearest-locations/', {'lat': 91, 'lon': 0}).status_code, 400)
+
+
+class LocationAutocompleteTests(TestCase):
+    """Tests for the prefix location search"""
+
+    def setUp(self):
+        self.coimbatore = City.objects.create(name='Coimbatore')
+        self.coonoor = City.objects.create(name='Coonoor')
+        self.coorg = City.objects.create(name='Coorg')
+        self.rs_puram = LocalArea.objects.create(city=self.coimbatore, name='RS Puram')
+        SightseeingSpot.objects.create(city=self.coimbatore, name='Coimbatore Zoo')
+        for number in range(3):
+            Booking.objects.create(
+                booking_number=f'1000000{number}', name='Guest', email='guest@example.com',
+                phone='+919876543210', pickup_address='x', drop_address='y', pickup_city='Coorg',
+                pickup_date='2026-01-01', trip_type='outstation', payment_type='upi', total_amount=1000
+            )
+        location_autocomplete.invalidate()
+
+    def test_ranked_by_booking_frequency(self):
+        """The most booked match comes first"""
+        names = [r['name'] for r in location_autocomplete.search('co')]
+        self.assertEqual(names[0], 'Coorg')
+        self.assertEqual(set(names), {'Coorg', 'Coimbatore', 'Coonoor', 'Coimbatore Zoo'})
+
+    def test_inner_word_prefix(self):
+        """Prefixes match the start of any word in a name"""
+        results = location_autocomplete.search('pur')
+        self.assertEqual(results[0]['value'], f'area_{self.rs_puram.id}')
+
+    def test_type_filter_and_endpoint(self):
+        """The search endpoint filters by location type"""
+        response = Client().get('/api/locations/search/', {'q': 'coim', 'type': 'spot'})
+        results = response.json()['results']
+        self.assertEqual([r['name'] for r in results], ['Coimbatore Zoo'])
+
+
+class PackageCatalogTests(TestCase):
+    """Tests for the faceted tour package catalog"""
+
+    def setUp(self):
+        self.ooty = City.objects.create(name='Ooty')
+        self.mysore = City.objects.create(name='Mysore')
+        self.short = TourPackage.objects.create(name='Ooty Getaway', description='x', days=2, price_per_vehicle=8000)
+        self.short.cities.set([self.ooty])
+        self.long = TourPackage.objects.create(name='Hills Circuit', description='x', days=4, price_per_vehicle=30000)
+        self.long.cities.set([self.ooty, self.mysore])
+        package_catalog.invalidate()
+
+    def test_combined_facets(self):
+        """Facets combine with AND across filters"""
+        result = package_catalog.search(city_ids=[self.ooty.id], price_bands=['premium'])
+        self.assertEqual([p['id'] for p in result['packages']], [self.long.id])
+        self.assertEqual(result['facets']['days'], [{'value': 4, 'count': 1}])
+
+    def test_search_runs_without_queries(self):
+        """A warm catalog answers searches without touching the database"""
+        package_catalog.state
+        with self.assertNumQueries(0):
+            response = Client().get('/api/tour-packages/search/', {'days': '2,4', 'city_id': self.mysore.id})
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_city_change_invalidates(self):
+        """Editing a package's cities is reflected in the by-days API"""
+        self.short.cities.add(self.mysore)
+        response = Client().get('/api/tour-packages-by-days/', {'days': 2})
+        self.assertEqual(response.json()['packages'][0]['cities'], ['Mysore', 'Ooty'])
+
+
+class SightseeingCatalogTests(TestCase):
+    """Tests for the pre-parsed sightseeing catalog"""
+
+    def setUp(self):
+        self.ooty = City.objects.create(
+            name='Ooty', tourist_places='Botanical Garden, ,Ooty Lake ', sightseeing_kilometers=45,
+            is_hill_station=True, hill_station_charge=750
+        )
+        self.mysore = City.objects.create(name='Mysore', tourist_places='Palace')
+        self.closed = City.objects.create(name='Closed', tourist_places='Fort', is_active=False)
+        SightseeingSpot.objects.create(city=self.ooty, name='Doddabetta Peak')
+        sightseeing_catalog.invalidate()
+
+    def test_places_are_parsed_once(self):
+        city = sightseeing_catalog.get(self.ooty.id)
+        self.assertEqual(city['tourist_places'], ['Botanical Garden', 'Ooty Lake'])
+        self.assertEqual(city['sightseeing_kilometers'], 45.0)
+        self.assertTrue(city['is_hill_station'])
+        self.assertEqual([spot['name'] for spot in city['spots']], ['Doddabetta Peak'])
+
+    def test_bulk_api_without_queries(self):
+        """A warm catalog serves several cities in one request without touching the database"""
+        sightseeing_catalog.state
+        with self.assertNumQueries(0):
+            response = Client().get('/api/sightseeing/', {'cities': f'{self.mysore.id},{self.ooty.id},{self.closed.id}'})
+        data = response.json()
+        self.assertEqual([city['city_name'] for city in data['cities']], ['Mysore', 'Ooty'])
+        self.assertEqual(data['missing'], [self.closed.id])
+
+    def test_bulk_api_rejects_bad_ids(self):
+        self.assertEqual(Client().get('/api/sightseeing/', {'cities': 'a,b'}).status_code, 400)
+        self.assertEqual(Client().get('/api/sightseeing/').status_code, 400)
+
+    def test_city_edit_invalidates(self):
+        self.ooty.tourist_places = 'Rose Garden'
+        self.ooty.save()
+        response = Client().get(f'/api/cities/{self.ooty.id}/sightseeing/')
+        self.assertEqual(response.json()['tourist_places'], ['Rose Garden'])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class TariffSidebarTests(TestCase):
+    """Tests for the cached tariff page sidebar"""
+
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(email='guest@example.com', username='guest', password='x')
+        Testimonial.objects.create(user=user, name='Anita', review='Lovely drive to Ooty', is_featured=True)
+        TourPackage.objects.create(name='Ooty Getaway', description='x', days=2, price_per_vehicle=8000)
+        Promotion.objects.create(title='Monsoon Offer', description='x')
+        Promotion.objects.create(title='Expired Offer', description='x', expires_at=timezone.now() - timedelta(days=1))
+
+    def test_rendered_once_per_version(self):
+        html = tariff_sidebar.render()
+        self.assertIn('Ooty Getaway', html)
+        self.assertIn('Lovely drive to Ooty', html)
+        self.assertNotIn('Expired Offer', html)
+        with self.assertNumQueries(0):
+            self.assertEqual(tariff_sidebar.render(), html)
+        self.assertContains(Client().get('/tariff/outstation-day/'), 'Monsoon Offer')
+
+    def test_promotion_save_invalidates(self):
+        tariff_sidebar.render()
+        with self.captureOnCommitCallbacks(execute=True):
+            Promotion.objects.create(title='Diwali Special', description='x')
+        self.assertIn('Diwali Special', tariff_sidebar.render())
+
+    def test_expiring_promotion_bounds_timeout(self):
+        Promotion.objects.create(title='Flash Sale', description='x', expires_at=timezone.now() + timedelta(seconds=90))
+        with mock.patch('tours.services.sidebar.cache.set') as cache_set:
+            tariff_sidebar.render()
+        self.assertLessEqual(cache_set.call_args[0][2], 90)
+
+
+class ConditionalGetTests(TestCase):
+    """Tests for ETag revalidation on the catalog APIs"""
+
+    def setUp(self):
+        cache.clear()
+        self.city = City.objects.create(name='Ooty')
+
+    def test_not_modified_without_queries(self):
+        etag = Client().get('/api/cities/')['ETag']
+        with self.assertNumQueries(0):
+            response = Client().get('/api/cities/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_edit_changes_etag(self):
+        etag = Client().get(f'/api/cities/{self.city.id}/sightseeing/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            SightseeingSpot.objects.create(city=self.city, name='Doddabetta Peak')
+        response = Client().get(f'/api/cities/{self.city.id}/sightseeing/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_query_string_is_part_of_etag(self):
+        first = Client().get('/api/local-areas/', {'city_id': self.city.id})['ETag']
+        self.assertNotEqual(Client().get('/api/local-areas/', {'city_id': 999})['ETag'], first)
+
+    def test_vehicle_viewset(self):
+        from vehicles.models import Vehicle
+        Vehicle.objects.create(name='Innova', per_day_fee=2500)
+        etag = Client().get('/api/vehicles/')['ETag']
+        self.assertEqual(Client().get('/api/vehicles/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Vehicle.objects.create(name='Tempo Traveller', per_day_fee=4500)
+            # Not committed yet: the current ETag still describes the committed rows
+            self.assertEqual(Client().get('/api/vehicles/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(Client().get('/api/vehicles/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CatalogBundleTests(TestCase):
+    """Tests for the hashed static catalog bundle"""
+
+    def setUp(self):
+        cache.clear()
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+        settings_override = override_settings(STATIC_ROOT=self.static_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.city = City.objects.create(name='Ooty')
+        LocalArea.objects.create(city=self.city, name='Charring Cross')
+
+    def test_publish_is_content_addressed(self):
+        first = catalog_bundle.publish()
+        self.assertEqual(catalog_bundle.publish()['hash'], first['hash'])
+        self.assertEqual(catalog_bundle.current_url(), f"/static/catalog/catalog.{first['hash']}.json")
+
+        response = Client().get(first['url'])
+        self.assertIn('immutable', response['Cache-Control'])
+        bundle = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(bundle['local_areas'][str(self.city.id)][0]['name'], 'Charring Cross')
+
+    def test_admin_edit_republishes_on_commit(self):
+        first = catalog_bundle.publish()
+        with self.captureOnCommitCallbacks(execute=True):
+            City.objects.create(name='Mysore')
+        self.assertNotEqual(catalog_bundle.current()['hash'], first['hash'])
+
+    def test_current_follows_publish_from_another_process(self):
+        catalog_bundle.publish()
+        pointer = os.path.join(self.static_root, 'catalog', 'current.json')
+        with open(pointer, 'w') as f:
+            json.dump({'hash': 'abcdef012345', 'url': '/static/catalog/catalog.abcdef012345.json'}, f)
+        self.assertEqual(catalog_bundle.current()['hash'], 'abcdef012345')
+
+    def test_batch_and_fixtures_publish_once(self):
+        with mock.patch.object(catalog_bundle, 'publish') as publish:
+            with catalog_bundle.batch():
+                for name in ('Mysore', 'Coorg', 'Munnar'):
+                    with self.captureOnCommitCallbacks(execute=True):
+                        City.objects.create(name=name)
+            self.assertEqual(publish.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                City(name='Wayanad').save_base(raw=True)
+            self.assertEqual(publish.call_count, 1)
+
+    def test_rejects_other_files(self):
+        self.assertEqual(Client().get('/static/catalog/current.json').status_code, 404)
+
+
+class CachedAPITests(TestCase):
+    """Tests for the dependency-tracked API response cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.city = City.objects.create(name='Ooty')
+
+    def test_hit_skips_database_and_counts(self):
+        first = Client().get('/api/local-areas/', {'city_id': self.city.id})
+        self.assertEqual(first['X-API-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = Client().get('/api/local-areas/', {'city_id': self.city.id})
+        self.assertEqual(second['X-API-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        stats = cache_stats()['tours.views.get_local_areas']
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+    def test_stats_command_needs_shared_cache(self):
+        Client().get('/api/local-areas/', {'city_id': self.city.id})
+        with self.assertRaises(CommandError):
+            call_command('api_cache_stats', stdout=StringIO())
+
+        out = StringIO()
+        with mock.patch('tours.management.commands.api_cache_stats.is_shared_cache', return_value=True):
+            call_command('api_cache_stats', stdout=out)
+        self.assertRegex(out.getvalue(), r'tours\.views\.get_local_areas\s+0\s+1')
+
+    def test_dependency_save_invalidates(self):
+        Client().get('/api/local-areas/', {'city_id': self.city.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            LocalArea.objects.create(city=self.city, name='Charring Cross')
+        response = Client().get('/api/local-areas/', {'city_id': self.city.id})
+        self.assertEqual(response['X-API-Cache'], 'MISS')
+        self.assertEqual(response.json()['local_areas'][0]['name'], 'Charring Cross')
+
+    def test_index_version_is_part_of_the_key(self):
+        """Another worker's invalidation is picked up before the check interval runs out"""
+        url = f'/api/cities/{self.city.id}/sightseeing/'
+        sightseeing_catalog.invalidate()
+        first = Client().get(url)
+        self.assertEqual(first.json()['spots'], [])
+
+        # Another worker commits a spot: the rows and the shared index version change, this process's index does not
+        SightseeingSpot.objects.create(city=self.city, name='Doddabetta Peak')
+        sightseeing_catalog._bump_version()
+
+        response = Client().get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-API-Cache'], 'MISS')
+        self.assertEqual([spot['name'] for spot in response.json()['spots']], ['Doddabetta Peak'])
+
+    def test_concurrent_miss_waits_for_the_renderer(self):
+        """A request that finds the render lock taken waits for the other request's bytes"""
+        rendered = []
+
+        @cached_api(depends_on=[City])
+        def view(request):
+            rendered.append(request)
+            return HttpResponse(b'fresh')
+
+        request = RequestFactory().get('/api/example/')
+        key = response_cache_key(f"{__name__}.{view.__wrapped__.__qualname__}", request, [City], {})
+        cache.add(f"{key}_lock", 1)
+
+        def other_request_finishes(seconds):
+            cache.set(key, {'content': b'shared', 'content_type': 'text/plain', 'status': 200, 'headers': {}})
+
+        with mock.patch('tours.caching.time.sleep', side_effect=other_request_finishes):
+            response = view(request)
+        self.assertEqual(response.content, b'shared')
+        self.assertEqual(rendered, [])
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Tests for request coalescing"""
+
+    def test_concurrent_identical_requests_share_one_call(self):
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        @single_flight(timeout=5)
+        def view(request):
+            calls.append(request)
+            started.set()
+            release.wait(5)
+            return HttpResponse(b'quote')
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(view(RequestFactory().get('/quote/', {'km': 40}))))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(view(RequestFactory().get('/quote/', {'km': 40}))))
+        follower.start()
+        while single_flight_group.stats().get(f"{__name__}.view", {}).get('leaders') != 1 or not follower.is_alive():
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(r['X-Single-Flight'] for r in results), ['LEADER', 'SHARED'])
+        self.assertTrue(all(r.content == b'quote' for r in results))
+
+    def test_different_params_are_not_coalesced(self):
+        calls = []
+
+        @single_flight(timeout=5)
+        def view(request):
+            calls.append(request)
+            return HttpResponse(b'quote')
+
+        view(RequestFactory().get('/quote/', {'km': 40}))
+        view(RequestFactory().get('/quote/', {'km': 50}))
+        self.assertEqual(len(calls), 2)
+
+    def test_headers_are_replayed(self):
+        @single_flight(timeout=5, shared=True)
+        def view(request):
+            response = HttpResponse(b'{}', content_type='application/json')
+            response['Cache-Control'] = 'public, max-age=60'
+            response['ETag'] = '"quote"'
+            return response
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for _ in range(2):
+            response = view(RequestFactory().get('/quote/', {'km': 60}))
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+            self.assertEqual(response['ETag'], '"quote"')
+
+
+class ImageDerivativeTests(TestCase):
+    """Tests for the responsive image derivative pipeline"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root, IMAGE_DERIVATIVES_BACKGROUND=False)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def upload(self, width=1500, height=1000):
+        buffer = BytesIO()
+        Image.new('RGB', (width, height), 'teal').save(buffer, format='JPEG')
+        return ContentFile(buffer.getvalue(), name='offer.jpg')
+
+    def test_upload_generates_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            promotion = Promotion.objects.create(title='Monsoon offer', description='10% off', image=self.upload())
+
+        manifest = image_derivatives.get_manifest(promotion.image.name)
+        self.assertEqual(manifest['widths'], [320, 640, 960, 1280])
+        self.assertIn('webp', manifest['formats'])
+        with default_storage.open(image_derivatives.derivative_name(promotion.image.name, 640, 'webp')) as f:
+            self.assertEqual(Image.open(f).size, (640, 427))
+
+        html = Template('{% load image_tags %}{% responsive_image image alt="Offer" %}').render(
+            Context({'image': promotion.image})
+        )
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('.1280w.jpg 1280w', html)
+
+    def test_small_images_are_not_upscaled(self):
+        name = default_storage.save('cities/tiny.jpg', self.upload(200, 100))
+        self.assertEqual(image_derivatives.generate(name)['widths'], [200])
+
+    def test_plain_img_until_generated(self):
+        # On-commit callbacks don't run here, so nothing is generated
+        promotion = Promotion.objects.create(title='Pending', description='...', image=self.upload())
+        html = Template('{% load image_tags %}{% responsive_image image alt="Offer" %}').render(
+            Context({'image': promotion.image})
+        )
+        self.assertNotIn('<picture>', html)
+        self.assertIn(f'src="{promotion.image.url}"', html)
+
+    def test_blog_images_are_skipped(self):
+        """Blog templates serve post images from static, so no derivatives are generated for them"""
+        with mock.patch.object(image_derivatives, 'schedule') as schedule, self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(title='Ooty', slug='ooty', content='...', image='promenade.jpg')
+        schedule.assert_not_called()
+
+
+class OptimizeStaticTests(SimpleTestCase):
+    """Tests for the optimize_static build step"""
+
+    def setUp(self):
+        self.static_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_dir, ignore_errors=True)
+        image = Image.new('RGB', (400, 300))
+        for x in range(400):
+            image.putpixel((x, x % 300), (x % 256, 90, 200))
+        image.save(f"{self.static_dir}/photo.png", optimize=False, compress_level=1)
+        self.pixels = list(Image.open(f"{self.static_dir}/photo.png").getdata())
+
+    def test_recompresses_losslessly_and_writes_webp(self):
+        before = os.path.getsize(f"{self.static_dir}/photo.png")
+        with override_settings(STATICFILES_DIRS=[self.static_dir]):
+            call_command('optimize_static', workers=1, stdout=StringIO())
+
+        self.assertLess(os.path.getsize(f"{self.static_dir}/photo.png"), before)
+        self.assertEqual(list(Image.open(f"{self.static_dir}/photo.png").getdata()), self.pixels)
+        self.assertEqual(Image.open(f"{self.static_dir}/photo.png.webp").format, 'WEBP')
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_static_picture_uses_webp_sibling(self):
+        with override_settings(STATICFILES_DIRS=[self.static_dir]):
+            Image.new('RGB', (10, 10)).save(f"{self.static_dir}/photo.png.webp", format='WEBP')
+            html = Template("{% load image_tags %}{% static_picture 'photo.png' alt='Photo' %}").render(Context())
+        self.assertIn('<source type="image/webp" srcset="/static/photo.png.webp">', html)
+
+    def test_static_picture_outside_the_manifest(self):
+        """A path collectstatic never saw renders unhashed instead of failing the page"""
+        with override_settings(
+            STATIC_ROOT=self.static_dir,
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+        ):
+            html = Template("{% load image_tags %}{% static_picture 'bolgs_images/missing.jpg' %}").render(Context())
+        self.assertIn('src="/static/bolgs_images/missing.jpg"', html)
+        self.assertNotIn('<picture>', html)
@@ -25,14 +25,23 @@ urlpatterns = [
     # About Us Page
     path('about-us/', views.AboutUsView.as_view(), name='about_us'),
     
+    # Catalog bundles published since startup (see tours.services.catalog_bundle)
+    path('static/catalog/<str:filename>', views.catalog_bundle_file, name='catalog_bundle_file'),
+    
     # API endpoints
     path('api/cities/', views.cities_api, name='cities_api'),
     path('api/cities/<int:city_id>/sightseeing/', views.city_sightseeing_api, name='city_sightseeing_api'),
+    path('api/sightseeing/', views.sightseeing_api, name='sightseeing_api'),
     path('api/vehicles/', views.vehicles_api, name='vehicles_api'),
     path('api/tour-packages/', views.tour_packages_api, name='tour_packages_api'),
     path('api/tour-packages-by-days/', views.tour_packages_by_days_api, name='tour_packages_by_days_api'),
+    path('api/tour-packages/search/', views.tour_packages_search_api, name='tour_packages_search_api'),
     path('api/local-areas/', views.get_local_areas, name='get_local_areas'),
     path('api/route-distance/', views.get_route_distance, name='get_route_distance'),
+    path('api/resolve-address/', views.resolve_address_api, name='resolve_address_api'),
+    path('api/optimize-itinerary/', views.optimize_itinerary_api, name='optimize_itinerary_api'),
+    path('api/nearest-locations/', views.nearest_locations_api, name='nearest_locations_api'),
+    path('api/locations/search/', views.location_search_api, name='location_search_api'),
     path('api/calculate-amount/', views.calculate_booking_amount, name='calculate_booking_amount'),
 ]
 
@@ -1,16 +1,38 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, JsonResponse
 from rest_framework import viewsets
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from .models import City, LocalArea, Route, SightseeingSpot, TourPackage, Tariff
+from .services import (
+    gazetteer, itinerary_optimizer, location_autocomplete, package_catalog, road_graph,
+    catalog_bundle, sightseeing_catalog, spatial_index, tariff_sidebar
+)
+from .services.gazetteer import DEFAULT_COORDINATES
+from .caching import cached_api, conditional_api
+from .utils import haversine_distance
 from vehicles.models import Vehicle
 import json
 import datetime as dt
 
 
+def catalog_bundle_file(request, filename):
+    """
+    Serve a catalog bundle published after this worker started; WhiteNoise
+    only knows the files present at startup and serves those itself
+    """
+    path = catalog_bundle.file_path(filename)
+    if path is None:
+        raise Http404('Catalog bundle not found')
+    response = FileResponse(open(path, 'rb'), content_type='application/json')
+    response['Cache-Control'] = 'public, max-age=315360000, immutable'
+    return response
+
+
+@conditional_api(City)
+@cached_api(depends_on=[City])
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def cities_api(request):
@@ -19,22 +41,43 @@ def cities_api(request):
     return Response(list(cities))
 
 
+@conditional_api(City, SightseeingSpot, indexes=[sightseeing_catalog])
+@cached_api(depends_on=[City, SightseeingSpot], indexes=[sightseeing_catalog])
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def city_sightseeing_api(request, city_id):
     """API endpoint to get city sightseeing data"""
-    try:
-        city = City.objects.get(id=city_id, is_active=True)
-        return Response({
-            'city_id': city.id,
-            'city_name': city.name,
-            'tourist_places': city.get_tourist_places_list(),
-            'sightseeing_kilometers': float(city.sightseeing_kilometers)
-        })
-    except City.DoesNotExist:
+    city = sightseeing_catalog.get(city_id, active_only=True)
+    if city is None:
         return Response({'error': 'City not found'}, status=404)
+    return Response(city)
+
+
+@conditional_api(City, SightseeingSpot, indexes=[sightseeing_catalog])
+@cached_api(depends_on=[City, SightseeingSpot], indexes=[sightseeing_catalog])
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def sightseeing_api(request):
+    """API endpoint to get sightseeing data for several cities: ?cities=1,2,3"""
+    values = request.GET.getlist('cities') or request.GET.getlist('cities[]')
+    try:
+        city_ids = list(dict.fromkeys(int(v) for value in values for v in value.split(',') if v.strip()))
+    except ValueError:
+        return Response({'error': 'cities must be a comma separated list of IDs'}, status=400)
+    if not city_ids:
+        return Response({'error': 'cities parameter is required'}, status=400)
+    if len(city_ids) > 50:
+        return Response({'error': 'At most 50 cities per request'}, status=400)
+    
+    found = sightseeing_catalog.get_many(city_ids, active_only=True)
+    return Response({
+        'version': sightseeing_catalog.version,
+        'cities': [found[city_id] for city_id in city_ids if city_id in found],
+        'missing': [city_id for city_id in city_ids if city_id not in found]
+    })
 
 
+@cached_api(depends_on=[Vehicle])
 @api_view(['GET', 'POST'])
 @permission_classes([AllowAny])
 def vehicles_api(request):
@@ -225,26 +268,24 @@ def vehicles_api(request):
     })
 
 
+@conditional_api(TourPackage, TourPackage.cities.through, City, indexes=[package_catalog])
+@cached_api(depends_on=[TourPackage, TourPackage.cities.through, City], indexes=[package_catalog])
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def tour_packages_api(request):
     """API endpoint to get tour packages available for a given city"""
     city_id = request.GET.get('city_id')
     try:
-        if city_id:
-            packages = TourPackage.objects.filter(is_active=True, cities__id=city_id).distinct()
-        else:
-            packages = TourPackage.objects.filter(is_active=True)
-
+        result = package_catalog.search(city_ids=[int(city_id)] if city_id else None)
         package_list = [
             {
-                'id': p.id,
-                'name': p.name,
-                'days': p.days,
-                'price_per_person': float(p.price_per_person) if p.price_per_person else None,
-                'price_per_vehicle': float(p.price_per_vehicle) if p.price_per_vehicle else None,
+                'id': p['id'],
+                'name': p['name'],
+                'days': p['days'],
+                'price_per_person': p['price_per_person'],
+                'price_per_vehicle': p['price_per_vehicle'],
             }
-            for p in packages
+            for p in result['packages']
         ]
 
         return Response({'packages': package_list})
@@ -252,6 +293,7 @@ def tour_packages_api(request):
         return Response({'error': str(e)}, status=400)
 
 
+@cached_api(depends_on=[TourPackage, TourPackage.cities.through, City], indexes=[package_catalog])
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def tour_packages_by_days_api(request):
@@ -262,18 +304,18 @@ def tour_packages_by_days_api(request):
             return Response({'error': 'Days parameter is required'}, status=400)
         
         days = int(days)
-        packages = TourPackage.objects.filter(is_active=True, days=days)
+        result = package_catalog.search(days=[days])
 
         package_list = [
             {
-                'id': p.id,
-                'name': p.name,
-                'days': p.days,
-                'price_per_person': float(p.price_per_person) if p.price_per_person else None,
-                'price_per_vehicle': float(p.price_per_vehicle) if p.price_per_vehicle else None,
-                'cities': [city.name for city in p.cities.all()]
+                'id': p['id'],
+                'name': p['name'],
+                'days': p['days'],
+                'price_per_person': p['price_per_person'],
+                'price_per_vehicle': p['price_per_vehicle'],
+                'cities': p['cities']
             }
-            for p in packages
+            for p in result['packages']
         ]
 
         return Response({'packages': package_list})
@@ -283,7 +325,43 @@ def tour_packages_by_days_api(request):
         return Response({'error': str(e)}, status=400)
 
 
-from seo.mixins import HomeSEOMixin
+@cached_api(depends_on=[TourPackage, TourPackage.cities.through, City], indexes=[package_catalog])
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def tour_packages_search_api(request):
+    """
+    API endpoint to filter tour packages by any combination of facets:
+    days, city_id (repeatable), pickup_city, price_band, min_price, max_price
+    """
+    def int_list(name):
+        values = request.GET.getlist(name) or request.GET.getlist(f'{name}[]')
+        return [int(v) for value in values for v in value.split(',') if v.strip()]
+    
+    try:
+        days = int_list('days')
+        city_ids = int_list('city_id')
+        pickup_city = request.GET.get('pickup_city')
+        min_price = request.GET.get('min_price')
+        max_price = request.GET.get('max_price')
+        result = package_catalog.search(
+            days=days,
+            city_ids=city_ids,
+            pickup_city_id=int(pickup_city) if pickup_city else None,
+            price_bands=[band for value in request.GET.getlist('price_band') for band in value.split(',') if band],
+            min_price=float(min_price) if min_price else None,
+            max_price=float(max_price) if max_price else None,
+        )
+    except ValueError:
+        return Response({'error': 'Invalid filter parameter'}, status=400)
+    
+    return Response({
+        'count': len(result['packages']),
+        'packages': result['packages'],
+        'facets': result['facets']
+    })
+
+
+from seo.mixins import FullPageCacheMixin, HomeSEOMixin
 
 
 class HomeView(HomeSEOMixin, TemplateView):
@@ -610,23 +688,8 @@ class TariffLocalHourView(TemplateView):
             is_active=True
         ).select_related('vehicle').order_by('base_price')
         
-        # Load popular tour packages for sidebar
-        context['popular_plans'] = TourPackage.objects.filter(
-            is_active=True
-        ).order_by('-created_at')[:5]
-        
-        # Load testimonials for sidebar
-        from enquiries.models import Testimonial
-        context['testimonials'] = Testimonial.objects.filter(
-            is_approved=True, 
-            is_featured=True
-        )[:3]
-        
-        # Load promotions for sidebar
-        from enquiries.models import Promotion
-        context['promotions'] = Promotion.objects.filter(
-            is_active=True
-        )[:3]
+        # Sidebar (packages, testimonials, promotions) is a shared cached fragment
+        context['sidebar'] = tariff_sidebar.render()
         
         return context
 
@@ -643,23 +706,8 @@ class TariffOutstationDayView(TemplateView):
             is_active=True
         ).select_related('vehicle').order_by('base_price')
         
-        # Load popular tour packages for sidebar
-        context['popular_plans'] = TourPackage.objects.filter(
-            is_active=True
-        ).order_by('-created_at')[:5]
-        
-        # Load testimonials for sidebar
-        from enquiries.models import Testimonial
-        context['testimonials'] = Testimonial.objects.filter(
-            is_approved=True, 
-            is_featured=True
-        )[:3]
-        
-        # Load promotions for sidebar
-        from enquiries.models import Promotion
-        context['promotions'] = Promotion.objects.filter(
-            is_active=True
-        )[:3]
+        # Sidebar (packages, testimonials, promotions) is a shared cached fragment
+        context['sidebar'] = tariff_sidebar.render()
         
         return context
 
@@ -676,23 +724,8 @@ class TariffOutstationKmView(TemplateView):
             is_active=True
         ).select_related('vehicle').order_by('base_price')
         
-        # Load popular tour packages for sidebar
-        context['popular_plans'] = TourPackage.objects.filter(
-            is_active=True
-        ).order_by('-created_at')[:5]
-        
-        # Load testimonials for sidebar
-        from enquiries.models import Testimonial
-        context['testimonials'] = Testimonial.objects.filter(
-            is_approved=True, 
-            is_featured=True
-        )[:3]
-        
-        # Load promotions for sidebar
-        from enquiries.models import Promotion
-        context['promotions'] = Promotion.objects.filter(
-            is_active=True
-        )[:3]
+        # Sidebar (packages, testimonials, promotions) is a shared cached fragment
+        context['sidebar'] = tariff_sidebar.render()
         
         return context
 
@@ -705,6 +738,8 @@ class TariffOnewayKmView(TemplateView):
     template_name = 'tours/tariff_oneway_km.html'
 
 
+@conditional_api(LocalArea)
+@cached_api(depends_on=[LocalArea])
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_local_areas(request):
@@ -718,28 +753,7 @@ def get_local_areas(request):
     return Response({'local_areas': [], 'city_id': None})
 
 
-import math
-
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """
-    Calculate the great circle distance between two points 
-    on the earth (specified in decimal degrees)
-    Returns distance in kilometers
-    """
-    # Convert decimal degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    # Radius of earth in kilometers
-    r = 6371
-    
-    return c * r
-
+@cached_api(depends_on=[Route, City, LocalArea], indexes=[gazetteer, road_graph])
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_route_distance(request):
@@ -748,6 +762,24 @@ def get_route_distance(request):
     from_area_id = request.GET.get('from_area_id')
     to_area_id = request.GET.get('to_area_id')
     
+    # Resolve free-text addresses when no explicit IDs were given
+    resolved = {}
+    for side in ('from', 'to'):
+        address = request.GET.get(f'{side}_address')
+        if address and not (request.GET.get(f'{side}_city_id') or request.GET.get(f'{side}_area_id')):
+            match = gazetteer.resolve(address)
+            resolved[side] = match
+            if match and match['type'] == 'area':
+                if side == 'from':
+                    from_area_id = match['id']
+                else:
+                    to_area_id = match['id']
+            elif match:
+                if side == 'from':
+                    from_city_id = match['city_id']
+                else:
+                    to_city_id = match['city_id']
+    
     # Get actual city IDs if areas are provided
     if from_area_id:
         try:
@@ -781,12 +813,26 @@ def get_route_distance(request):
                 return Response({
                     'distance': float(route.distance),
                     'one_way_fixed_rate': float(route.one_way_fixed_rate) if route.one_way_fixed_rate else None,
-                    'source': 'database'
+                    'source': 'database',
+                    **({'resolved': resolved} if resolved else {})
                 })
         except Exception as e:
             # If there's any error with database lookup, fall through to calculation
             pass
         
+        # Chain known routes through intermediate cities before estimating
+        road_distance = road_graph.distance(from_city_id, to_city_id)
+        if road_distance is not None and road_distance > 0:
+            via = road_graph.path(from_city_id, to_city_id)[1:-1]
+            return Response({
+                'distance': round(road_distance, 2),
+                'one_way_fixed_rate': None,
+                'source': 'road_network',
+                'via_city_ids': via,
+                'message': f'Distance via road network: {round(road_distance, 2)} km',
+                **({'resolved': resolved} if resolved else {})
+            })
+        
         # Calculate using Haversine formula if no database route found
         try:
             from_city = City.objects.get(id=from_city_id)
@@ -807,28 +853,8 @@ def get_route_distance(request):
                 """Get coordinates with fallbacks for missing data"""
                 if area and area.latitude and area.longitude:
                     return float(area.latitude), float(area.longitude)
-                elif city.latitude and city.longitude:
-                    return float(city.latitude), float(city.longitude)
-                else:
-                    # Default coordinates for major Tamil Nadu cities if missing
-                    city_defaults = {
-                        'coimbatore': (11.0168, 76.9558),
-                        'chennai': (13.0827, 80.2707),
-                        'madurai': (9.9252, 78.1198),
-                        'salem': (11.6643, 78.1460),
-                        'trichy': (10.7905, 78.7047),
-                        'ooty': (11.4064, 76.6932),
-                        'kodaikanal': (10.2381, 77.4892),
-                        'munnar': (10.0889, 77.0595),
-                        'yercaud': (11.7753, 78.2186),
-                        'rameshwaram': (9.2876, 79.3129),
-                        'kanyakumari': (8.0883, 77.5385),
-                        'tanjore': (10.7870, 79.1378),
-                        'mysore': (12.2958, 76.6394),
-                        'ariyalur': (11.1401, 79.0747)
-                    }
-                    city_name_lower = city.name.lower()
-                    return city_defaults.get(city_name_lower, (11.0168, 76.9558))  # Default to Coimbatore
+                # Reference coordinates from the gazetteer, defaulting to Coimbatore
+                return gazetteer.city_coordinates(city) or DEFAULT_COORDINATES
             
             # Get coordinates with fallbacks
             from_lat, from_lon = get_fallback_coordinates(from_city, from_area if from_area_id else None)
@@ -857,7 +883,8 @@ def get_route_distance(request):
                 'distance': distance,
                 'one_way_fixed_rate': None,
                 'source': source,
-                'message': f'Distance {source}: {distance} km'
+                'message': f'Distance {source}: {distance} km',
+                **({'resolved': resolved} if resolved else {})
             })
                 
         except (City.DoesNotExist, LocalArea.DoesNotExist) as e:
@@ -879,6 +906,106 @@ def get_route_distance(request):
     }, status=400)
 
 
+@cached_api(depends_on=[City, LocalArea, SightseeingSpot], indexes=[gazetteer])
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def resolve_address_api(request):
+    """API endpoint to resolve a free-text address to known locations"""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Query parameter q is required'}, status=400)
+    try:
+        limit = min(max(int(request.GET.get('limit', 5)), 1), 20)
+    except ValueError:
+        return Response({'error': 'Invalid limit parameter'}, status=400)
+    
+    matches = gazetteer.search(query, limit=limit)
+    return Response({
+        'query': query,
+        'best_match': matches[0] if matches else None,
+        'matches': matches
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def location_search_api(request):
+    """API endpoint for city/area/sightseeing spot autocomplete"""
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        return Response({'error': 'Invalid limit parameter'}, status=400)
+    
+    location_type = request.GET.get('type')
+    if location_type not in (None, 'city', 'area', 'spot'):
+        return Response({'error': 'type must be city, area or spot'}, status=400)
+    
+    return Response({
+        'query': query,
+        'results': location_autocomplete.search(query, limit, location_type) if query else []
+    })
+
+
+@cached_api(depends_on=[City, LocalArea], indexes=[spatial_index])
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def nearest_locations_api(request):
+    """API endpoint to get the serviced cities/areas nearest to a coordinate"""
+    try:
+        latitude = float(request.GET.get('lat'))
+        longitude = float(request.GET.get('lon'))
+        k = min(max(int(request.GET.get('k', 5)), 1), 50)
+    except (TypeError, ValueError):
+        return Response({'error': 'Valid lat, lon and k parameters are required'}, status=400)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return Response({'error': 'Coordinates out of range'}, status=400)
+    
+    location_type = request.GET.get('type')
+    if location_type not in (None, 'city', 'area'):
+        return Response({'error': 'type must be city or area'}, status=400)
+    
+    return Response({
+        'latitude': latitude,
+        'longitude': longitude,
+        'locations': spatial_index.nearest(latitude, longitude, k, location_type)
+    })
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+def optimize_itinerary_api(request):
+    """API endpoint to order multicity stops for the shortest total distance"""
+    params = request.data if request.method == 'POST' else request.GET
+    pickup = params.get('pickup_city')
+    if hasattr(params, 'getlist'):
+        stops = params.getlist('stops[]') or params.getlist('stops')
+    else:
+        stops = params.get('stops', [])
+    # Comma separated ids arrive as one string, on their own or as a one-item list
+    if isinstance(stops, str):
+        stops = [stops]
+    if isinstance(stops, list) and len(stops) == 1 and ',' in str(stops[0]):
+        stops = [stop.strip() for stop in str(stops[0]).split(',') if stop.strip()]
+    if not isinstance(stops, list) or not all(
+        isinstance(stop, (str, int)) and not isinstance(stop, bool) for stop in stops
+    ):
+        return Response({'error': 'stops must be a list of location ids'}, status=400)
+    if pickup is not None and (not isinstance(pickup, (str, int)) or isinstance(pickup, bool)):
+        return Response({'error': 'pickup_city must be a location id'}, status=400)
+    return_to_pickup = str(params.get('return_to_pickup', 'true')).lower() not in ('false', '0', 'no')
+    
+    if not pickup or not stops:
+        return Response({'error': 'pickup_city and stops are required'}, status=400)
+    if len(stops) > 25:
+        return Response({'error': 'A maximum of 25 stops is supported'}, status=400)
+    
+    try:
+        return Response(itinerary_optimizer.optimize(pickup, stops, return_to_pickup))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def calculate_booking_amount(request):
@@ -953,34 +1080,34 @@ def calculate_booking_amount(request):
 
 
 # Destination Views
-class OotyView(TemplateView):
+class OotyView(FullPageCacheMixin, TemplateView):
     template_name = 'tours/ooty.html'
 
 
-class KodaikanalView(TemplateView):
+class KodaikanalView(FullPageCacheMixin, TemplateView):
     template_name = 'tours/kodaikanal.html'
 
 
-class MunnarView(TemplateView):
+class MunnarView(FullPageCacheMixin, TemplateView):
     template_name = 'tours/munnar.html'
 
 
-class CoorgView(TemplateView):
+class CoorgView(FullPageCacheMixin, TemplateView):
     template_name = 'tours/coorg.html'
 
 
-class MysoreView(TemplateView):
+class MysoreView(FullPageCacheMixin, TemplateView):
     template_name = 'tours/mysore.html'
 
 
-class YercaudView(TemplateView):
+class YercaudView(FullPageCacheMixin, TemplateView):
     template_name = 'tours/yercaud.html'
 
 
-class WayanadView(TemplateView):
+class WayanadView(FullPageCacheMixin, TemplateView):
     template_name = 'tours/wayanad.html'
 
 
-class AboutUsView(TemplateView):
+class AboutUsView(FullPageCacheMixin, TemplateView):
     template_name = 'about_us.html'
 
@@ -1,10 +1,13 @@
 from django.core.management.base import BaseCommand
 from vehicles.models import Vehicle
+from tours.services.catalog_bundle import catalog_bundle
 
 
 class Command(BaseCommand):
     help = 'Add premium vehicles including BMW and Audi'
 
+    # One catalog bundle publish for the whole run, not one per saved row
+    @catalog_bundle.batch()
     def handle(self, *args, **options):
         vehicles_data = [
             # BMW Vehicles
@@ -3,12 +3,18 @@ from rest_framework.response import Response
 from django.db.models import Q
 from .models import Vehicle
 from .serializers import VehicleSerializer
+from tours.caching import ConditionalGetMixin, cached_api
 
 
-class VehicleViewSet(viewsets.ReadOnlyModelViewSet):
+class VehicleViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Vehicle.objects.filter(is_available=True, is_active=True)
     serializer_class = VehicleSerializer
     permission_classes = [permissions.AllowAny]
+    catalog_models = (Vehicle,)
+    
+    @cached_api(depends_on=[Vehicle])
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
     
     def get_queryset(self):
         """